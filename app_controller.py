@@ -5,15 +5,21 @@
 #   • Folder creation
 #   • File picker
 #   • Recent file tracking
+#   • Thumbnail cache
 #   • Banner notifications
 # ==========================================================
 
 import os
-import json
 import subprocess
+from kivy.clock import Clock
 from kivy.utils import platform
-from plyer import filechooser
 from ui.components.banner_message import BannerMessage
+from pdf_engine.thumbnail_cache import ThumbnailCache
+from pdf_engine.recent_files import RecentFilesStore
+
+# Seconds to wait after a change before writing recent.json,
+# so a burst of opens results in a single write
+RECENT_FLUSH_DELAY = 2
 
 
 class AppController:
@@ -23,6 +29,9 @@ class AppController:
         self.app = app
         self.user_pdf_dir = None
         self.recent_file_path = None
+        self.recent = None
+        self.thumbnails = None
+        self._flush_recent_trigger = Clock.create_trigger(self._flush_recent, RECENT_FLUSH_DELAY)
 
     # ------------------------------------------------------
     # Folder Setup
@@ -40,11 +49,12 @@ class AppController:
             self.user_pdf_dir = os.path.join(base, "PDFHub")
             os.makedirs(self.user_pdf_dir, exist_ok=True)
 
-            # Create recent.json if missing
+            # Recent files are kept in memory and flushed to recent.json
             self.recent_file_path = os.path.join(self.user_pdf_dir, "recent.json")
-            if not os.path.exists(self.recent_file_path):
-                with open(self.recent_file_path, "w") as f:
-                    json.dump([], f)
+            self.recent = RecentFilesStore(self.recent_file_path)
+
+            # Page thumbnails live next to recent.json
+            self.thumbnails = ThumbnailCache(os.path.join(self.user_pdf_dir, "thumbnails"))
 
             BannerMessage.show(self.app.root, "📁 PDFHub folder ready", msg_type="info")
 
@@ -57,6 +67,8 @@ class AppController:
     def on_open_pdf_file(self):
         """Open system file picker for PDF files."""
         try:
+            from plyer import filechooser  # imported on first use to keep start-up fast
+
             paths = filechooser.open_file(title="Select a PDF", filters=[("PDF files", "*.pdf")])
             if not paths:
                 BannerMessage.show(self.app.root, "No file selected.", msg_type="info")
@@ -88,29 +100,35 @@ class AppController:
     # Recent Files Management
     # ------------------------------------------------------
     def load_recent_files(self):
-        """Return up to 5 most recent files."""
-        try:
-            if not os.path.exists(self.recent_file_path):
-                return []
-            with open(self.recent_file_path, "r") as f:
-                data = json.load(f)
-            return data[-5:]
-        except Exception as e:
-            BannerMessage.show(self.app.root, f"Error loading recent files: {e}", msg_type="error")
+        """Return up to 5 most recent files, newest first (served from memory)."""
+        if self.recent is None:
             return []
+        return self.recent.view(limit=5)
 
     def update_recent_list(self, file_path):
-        """Add a new file to recent.json."""
+        """Record an opened file; the write to recent.json is batched."""
+        if self.recent is None:
+            return
         try:
-            with open(self.recent_file_path, "r") as f:
-                data = json.load(f)
-
-            if file_path not in data:
-                data.append(file_path)
-                data = data[-5:]
-                with open(self.recent_file_path, "w") as f:
-                    json.dump(data, f, indent=2)
-
+            self.recent.record(file_path)
+            self._flush_recent_trigger()
+            # Home may be visible already, so on_pre_enter will not refresh it
+            screen_manager = self.app.root.ids.screen_manager
+            if screen_manager.current == "home":
+                screen_manager.current_screen.refresh_recent()
             BannerMessage.show(self.app.root, "✅ Recent list updated", msg_type="success")
         except Exception as e:
             BannerMessage.show(self.app.root, f"Error updating recent list: {e}", msg_type="error")
+
+    def flush_recent(self):
+        """Write pending recent-file changes now (e.g. when the app stops)."""
+        self._flush_recent_trigger.cancel()
+        self._flush_recent()
+
+    def _flush_recent(self, *args):
+        if self.recent is None:
+            return
+        try:
+            self.recent.flush()
+        except OSError as e:
+            BannerMessage.show(self.app.root, f"Error saving recent list: {e}", msg_type="error")
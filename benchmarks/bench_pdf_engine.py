@@ -0,0 +1,318 @@
+# ==========================================================
+#  pdf_engine Benchmark Suite
+#  --------------------------
+#  Generates synthetic PDFs locally and measures how merge
+#  and split scale with input size.
+#
+#  Documents:
+#    • text        – pages of plain text
+#    • images      – one large embedded bitmap per page
+#    • small_pages – many tiny pages with little content
+#    • huge_pages  – a few pages with very large content streams
+#
+#  Each case runs in a fresh process, so peak RSS is not
+#  polluted by earlier runs. Results (wall time, pages/s,
+#  peak RSS, output size) are written to JSON and can be
+#  compared against a committed baseline. Merges are also
+#  run with each output profile ("compact", "max-compress")
+#  to show the CPU time / output size trade-off.
+#
+#  benchmarks/baseline.json is recorded with the PyMuPDF and
+#  Pillow versions pinned in requirements.txt; --compare warns
+#  when the current run uses other versions. Absolute times
+#  depend on the machine, so compare against a baseline
+#  regenerated locally when in doubt.
+#
+#  Usage (from the repository root):
+#    python -m benchmarks.bench_pdf_engine --out results.json
+#    python -m benchmarks.bench_pdf_engine --compare benchmarks/baseline.json
+# ==========================================================
+
+import argparse
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from pdf_engine.pdf_backend import OUTPUT_PROFILES
+
+
+# Pages per document at scale 1; each --scale multiplies these
+BASE_PAGES = {
+    "text": 50,
+    "images": 10,
+    "small_pages": 500,
+    "huge_pages": 2,
+}
+
+DEFAULT_SCALES = [1, 2, 4]
+DEFAULT_BACKENDS = ["pypdf2", "pymupdf"]
+BENCH_PACKAGES = ["PyPDF2", "PyMuPDF", "Pillow"]  # recorded in the result metadata
+SEED = 1234
+
+
+# ==========================================================
+#  Synthetic document generation
+# ==========================================================
+def _font_resources():
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    return DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+    })
+
+
+def _new_page(writer, width, height):
+    # add_page() copies the page into the writer; edit the returned copy
+    return writer.add_page(PageObject.create_blank_page(None, width, height))
+
+
+def _set_content(writer, page, data: bytes, resources):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    page[NameObject("/Contents")] = writer._add_object(stream)
+    page[NameObject("/Resources")] = resources
+
+
+def _text_page_content(rng, lines, font_size=10, top=780):
+    ops = ["BT", f"/F1 {font_size} Tf", f"40 {top} Td", f"{font_size + 2} TL"]
+    for _ in range(lines):
+        words = " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet", "merge", "split"))
+                         for _ in range(12))
+        ops.append(f"({words}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode()
+
+
+def generate_pdf(kind: str, pages: int, path: str):
+    """Write a synthetic PDF of the given kind with `pages` pages to `path`."""
+    rng = random.Random(f"{SEED}-{kind}-{pages}")
+    writer = PdfWriter()
+    fonts = _font_resources()
+
+    for index in range(pages):
+        if kind == "text":
+            page = _new_page(writer, 612, 792)
+            _set_content(writer, page, _text_page_content(rng, 60), fonts)
+
+        elif kind == "images":
+            size = 600
+            # Noise with every row doubled: compresses only about 2:1, like a scan
+            raw = b"".join(row * 2 for row in
+                           (rng.randbytes(size * 3) for _ in range(size // 2)))
+            image = DecodedStreamObject()
+            image._data = zlib.compress(raw, 6)
+            image.update({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(size),
+                NameObject("/Height"): NumberObject(size),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+                NameObject("/Filter"): NameObject("/FlateDecode"),
+            })
+            resources = DictionaryObject({
+                NameObject("/XObject"): DictionaryObject({
+                    NameObject(f"/Im{index}"): writer._add_object(image),
+                }),
+            })
+            page = _new_page(writer, 612, 792)
+            _set_content(writer, page, f"q 540 0 0 540 36 126 cm /Im{index} Do Q".encode(), resources)
+
+        elif kind == "small_pages":
+            page = _new_page(writer, 210, 298)
+            _set_content(writer, page, _text_page_content(rng, 2, font_size=8, top=270), fonts)
+
+        elif kind == "huge_pages":
+            page = _new_page(writer, 2384, 3370)  # A0
+            ops = ["0.5 w"]
+            for _ in range(40000):
+                x, y = rng.uniform(0, 2384), rng.uniform(0, 3370)
+                ops.append(f"{x:.1f} {y:.1f} m {x + rng.uniform(-50, 50):.1f} "
+                           f"{y + rng.uniform(-50, 50):.1f} l S")
+            _set_content(writer, page, "\n".join(ops).encode(), fonts)
+
+        else:
+            raise ValueError(f"Unknown document kind: {kind}")
+
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+# ==========================================================
+#  Single measurement (runs in a child process)
+# ==========================================================
+def _run_case(case: dict, workdir: str) -> dict:
+    """Run one merge or split and return its metrics."""
+    # Imported here so the parent's memory does not count against the child
+    from pdf_engine.pdf_merger import PDFMerger
+    from pdf_engine.pdf_splitter import PDFSplitter
+    from pdf_engine.utils.memory_utils import peak_rss
+
+    os.chdir(workdir)  # PDFMerger writes to ./assets/output
+    inputs = case["inputs"]
+    backend = case["backend"]
+
+    # Construct first so backend imports (e.g. fitz) are not timed
+    profile = case.get("profile")
+    if case["op"] == "merge":
+        merger = PDFMerger(inputs, backend=backend, profile=profile)
+        start = time.perf_counter()
+        outputs = [merger.merge(streaming=case.get("streaming", False))]
+    else:
+        splitter = PDFSplitter(inputs[0], backend=backend, profile=profile)
+        start = time.perf_counter()
+        outputs = list(splitter.split(max(1, case["pages"] // 2)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "wall_s": round(elapsed, 4),
+        "pages_per_s": round(case["pages"] / elapsed, 1) if elapsed else None,
+        "peak_rss_bytes": peak_rss(),
+        "output_bytes": sum(os.path.getsize(path) for path in outputs),
+    }
+
+
+def _run_isolated(case: dict, workdir: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_case, (case, workdir))
+
+
+# ==========================================================
+#  Suite
+# ==========================================================
+def _available_backends(requested):
+    from pdf_engine.pdf_backend import get_backend
+
+    available = []
+    for name in requested:
+        try:
+            get_backend(name)
+            available.append(name)
+        except ImportError:
+            print(f"Skipping backend '{name}' (not installed)")
+    return available
+
+
+def build_cases(workdir, kinds, scales, backends, profiles=()):
+    """Generate the input documents and describe every measurement."""
+    cases = []
+    for kind in kinds:
+        for scale in scales:
+            pages = BASE_PAGES[kind] * scale
+            doc = os.path.join(workdir, f"{kind}_x{scale}.pdf")
+            generate_pdf(kind, pages, doc)
+            input_bytes = os.path.getsize(doc)
+
+            for backend in backends:
+                common = {"kind": kind, "scale": scale, "backend": backend, "input_bytes": input_bytes}
+                cases.append(dict(common, op="merge", inputs=[doc, doc], pages=pages * 2))
+                cases.append(dict(common, op="split", inputs=[doc], pages=pages))
+                # Size / time trade-off of the non-default output profiles
+                for profile in profiles:
+                    if profile != "fast":
+                        cases.append(dict(common, op="merge", profile=profile,
+                                          inputs=[doc, doc], pages=pages * 2))
+            # Streaming merge only exists for PyPDF2
+            if "pypdf2" in backends:
+                cases.append({"kind": kind, "scale": scale, "backend": "pypdf2", "op": "merge",
+                              "streaming": True, "inputs": [doc, doc], "pages": pages * 2,
+                              "input_bytes": input_bytes})
+    return cases
+
+
+def case_key(result: dict) -> str:
+    op = result["op"] + ("-streaming" if result.get("streaming") else "")
+    if result.get("profile"):
+        op += f"@{result['profile']}"
+    return f"{result['kind']}/x{result['scale']}/{result['backend']}/{op}"
+
+
+def run_suite(kinds, scales, backends, profiles=()) -> dict:
+    backends = _available_backends(backends)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pdfhub-bench-") as workdir:
+        cases = build_cases(workdir, kinds, scales, backends, profiles)
+        for case in cases:
+            metrics = _run_isolated(case, workdir)
+            result = {k: v for k, v in case.items() if k != "inputs"}
+            result.update(metrics)
+            results.append(result)
+            print(f"{case_key(result):45s} {metrics['wall_s']:8.3f}s "
+                  f"{metrics['pages_per_s'] or 0:10.1f} p/s "
+                  f"{metrics['peak_rss_bytes'] / 2**20:8.1f} MB RSS "
+                  f"{metrics['output_bytes'] / 2**20:8.2f} MB out")
+
+    return {"meta": _environment(), "results": results}
+
+
+def _environment() -> dict:
+    # Package versions only: nothing identifying the host goes into a
+    # result file that may be committed as the baseline
+    versions = {}
+    for package in BENCH_PACKAGES:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "versions": versions,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """Print wall-time and peak-RSS ratios of `current` versus `baseline`."""
+    if current["meta"]["versions"] != baseline["meta"].get("versions"):
+        print(f"warning: baseline was recorded with {baseline['meta'].get('versions')}, "
+              f"this run uses {current['meta']['versions']}")
+    base = {case_key(r): r for r in baseline["results"]}
+    print(f"\n{'case':45s} {'time':>8s} {'rss':>8s}  (current / baseline)")
+    for result in current["results"]:
+        old = base.get(case_key(result))
+        if not old:
+            print(f"{case_key(result):45s} {'new':>8s}")
+            continue
+        time_ratio = result["wall_s"] / old["wall_s"] if old["wall_s"] else float("nan")
+        rss_ratio = (result["peak_rss_bytes"] / old["peak_rss_bytes"]
+                     if old["peak_rss_bytes"] else float("nan"))
+        print(f"{case_key(result):45s} {time_ratio:8.2f} {rss_ratio:8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pdf_engine merge and split.")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--kinds", nargs="+", default=list(BASE_PAGES), choices=list(BASE_PAGES))
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES)
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS)
+    parser.add_argument("--profiles", nargs="+", default=list(OUTPUT_PROFILES),
+                        choices=list(OUTPUT_PROFILES), help="output profiles to measure for merge")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.kinds, args.scales, args.backends, args.profiles)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,24 @@
-
 # ==========================================================
 # main.py
 # ==========================================================
 # Entry point for PDFhub
 # Handles:
-#   • App initialization
-#   • ScreenManager setup
-#   • Loads KV and controller
+#   • Starting the cold-start clock
+#   • Running the app (see pdfhub_app.py)
+#
+# Nothing else may run at import time: worker processes
+# started with "spawn" (batch split, image optimizer) re-run
+# this file as __mp_main__, and must not load Kivy.
 # ==========================================================
 
-from kivy.app import App
-from kivy.lang import Builder
-from kivy.uix.boxlayout import BoxLayout
-
-# Import controller and screens
-from app_controller import AppController
-from ui.screens.home_screen import HomeScreen
-from ui.screens.split_screen import SplitScreen
-from ui.screens.merge_screen import MergeScreen
-from ui.screens.edit_screen import EditScreen
-from ui.screens.settings_screen import SettingsScreen
-
-# Load KV layout
-Builder.load_file("ui/main.kv")
-
-
-class PDFhubRoot(BoxLayout):
-    """
-    Root container with bottom navigation and ScreenManager.
-    Screen switching handled by controller methods.
-    """
-
-    def switch_tab(self, tab_name):
-        """Switch to a specific tab."""
-        self.ids.screen_manager.current = tab_name
-
-
-class PDFhubApp(App):
-    """Main application controller for PDFhub."""
-
-    def build(self):
-        self.title = "PDFhub"
-        self.controller = AppController(app=self)
-        root = PDFhubRoot()
-        # Return first — so self.root exists
-        self.root = root
-        # Now safe to create folder and show banner
-        self.controller.ensure_pdfhub_folder()
-        return root
-
-
+import time
+_START = time.perf_counter()  # taken before Kivy is imported, so imports are timed too
 
 
 if __name__ == "__main__":
-    PDFhubApp().run()
+    from pdfhub_app import run
+
+    run(_START)
 
 # # ==========================================================
 # #                    PDFhub: Main Application
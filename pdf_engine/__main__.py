@@ -0,0 +1,7 @@
+# Allows `python -m pdf_engine ...`; see pdf_engine/cli.py
+import sys
+
+from pdf_engine.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
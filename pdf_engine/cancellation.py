@@ -0,0 +1,33 @@
+# ==========================================================
+#  Cancellation
+#  ------------
+#  Cooperative cancellation for long merge / split jobs.
+#  The UI keeps a CancelToken and calls cancel(); the engine
+#  checks the token between pages and stops with
+#  OperationCancelled at the next check.
+# ==========================================================
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised inside a merge or split once its token has been cancelled."""
+
+
+class CancelToken:
+    """Thread-safe flag shared between the caller and a running job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop at its next check."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled("Operation cancelled")
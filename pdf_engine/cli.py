@@ -0,0 +1,329 @@
+# ==========================================================
+#  pdf_engine Command Line
+#  -----------------------
+#  Headless entry point for servers and cron jobs:
+#
+#    python -m pdf_engine merge -o out.pdf a.pdf b.pdf
+#    python -m pdf_engine merge --append -o binder.pdf today.pdf
+#    python -m pdf_engine split report.pdf --ranges 1-3,4-end
+#    python -m pdf_engine assemble -o out.pdf a.pdf:3-5 b.pdf c.pdf:10:90
+#    python -m pdf_engine optimize scan.pdf --dpi 150 --quality 70
+#    python -m pdf_engine info a.pdf b.pdf
+#    python -m pdf_engine run jobs.yaml --jobs 4
+#
+#  Only pdf_engine modules are imported here (never Kivy or
+#  plyer), so a run starts without loading the GUI stack.
+# ==========================================================
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# ==========================================================
+#  Jobs
+# ==========================================================
+def run_job(job: dict) -> dict:
+    """
+    Run one merge / split / assemble / optimize / info job described by a dict.
+
+    Job keys:
+        op: "merge", "split", "assemble", "optimize" or "info".
+        merge: inputs (list), output (optional), streaming, dedup, append
+               (add the inputs to the existing output as an incremental update).
+        split: input, and one of at (int), ranges (str), every (int)
+               or burst (true); output_dir (optional).
+        assemble: entries (list of {"source", "pages", "rotate"}, see
+                  pdf_assembler.parse_entry), output (optional).
+        optimize: input, output (optional), dpi, quality (optional).
+        info: inputs (list).
+        backend, profile, metrics: optional for merge, split and assemble;
+        metrics=true adds per-stage timings and counters to the result.
+        merge and split also take optimize (true or {"dpi", "quality"});
+        the bytes saved are reported in "info".
+
+    Returns:
+        dict: {"op", "outputs", "info", "metrics", "error"}; "error" is
+              None on success.
+    """
+    op = job.get("op")
+    result = {"op": op, "outputs": [], "info": None, "metrics": None, "error": None}
+    worker = None
+    try:
+        if op == "merge":
+            from pdf_engine.pdf_merger import PDFMerger
+
+            merger = worker = PDFMerger(job["inputs"], backend=job.get("backend"),
+                                        profile=job.get("profile"),
+                                        collect_metrics=job.get("metrics", False),
+                                        optimize=job.get("optimize"))
+            result["outputs"] = [merger.merge(
+                streaming=job.get("streaming", False),
+                dedup=job.get("dedup", False),
+                output_path=job.get("output"),
+                append=job.get("append", False),
+            )]
+            result["info"] = merger.optimization
+        elif op == "split":
+            from pdf_engine.pdf_splitter import PDFSplitter
+
+            splitter = worker = PDFSplitter(job["input"], backend=job.get("backend"),
+                                            profile=job.get("profile"),
+                                            output_dir=job.get("output_dir"),
+                                            collect_metrics=job.get("metrics", False),
+                                            optimize=job.get("optimize"))
+            if "at" in job:
+                result["outputs"] = list(splitter.split(int(job["at"])))
+            elif "ranges" in job:
+                result["outputs"] = splitter.split_ranges(str(job["ranges"]))
+            elif "every" in job:
+                result["outputs"] = splitter.split_every(int(job["every"]))
+            elif job.get("burst"):
+                result["outputs"] = splitter.burst()
+            else:
+                raise ValueError("split needs one of: at, ranges, every, burst")
+            result["info"] = splitter.optimization
+        elif op == "assemble":
+            from pdf_engine.pdf_assembler import PDFAssembler
+
+            assembler = worker = PDFAssembler(job["entries"], backend=job.get("backend"),
+                                              profile=job.get("profile"),
+                                              collect_metrics=job.get("metrics", False))
+            result["outputs"] = [assembler.assemble(output_path=job.get("output"))]
+        elif op == "optimize":
+            from pdf_engine.pdf_optimizer import optimize_pdf
+
+            options = {key: job[key] for key in ("dpi", "quality", "profile") if key in job}
+            report = optimize_pdf(job["input"], job.get("output"), **options)
+            result["outputs"] = [report["output_path"]]
+            result["info"] = report
+        elif op == "info":
+            from pdf_engine.pdf_loader import get_loader
+
+            loader = get_loader()
+            result["info"] = {path: loader.get_info(path) for path in job["inputs"]}
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    if worker is not None:
+        result["metrics"] = worker.metrics
+    return result
+
+
+def run_jobs(jobs: list[dict], workers: int | None = None) -> list[dict]:
+    """
+    Run jobs on a process pool and return their results in job order.
+
+    Args:
+        jobs (list[dict]): Job descriptions (see run_job).
+        workers (int, optional): Pool size; defaults to the CPU count.
+                                 1 runs everything in this process.
+    """
+    results = [None] * len(jobs)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    pool = None
+    if workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, ImportError, NotImplementedError):
+            pool = None  # no process support: run serially
+
+    if pool is None:
+        return [run_job(job) for job in jobs]
+
+    with pool:
+        futures = {pool.submit(run_job, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:  # worker crashed (e.g. BrokenProcessPool)
+                results[index] = {"op": jobs[index].get("op"), "outputs": [],
+                                  "info": None, "metrics": None, "error": str(e)}
+    return results
+
+
+# ==========================================================
+#  Manifest
+# ==========================================================
+def load_manifest(path: str) -> list[dict]:
+    """
+    Read a JSON or YAML manifest and return its jobs.
+
+    The manifest is {"defaults": {...}, "jobs": [...]} (or just the list
+    of jobs). Defaults are applied to every job, and relative paths are
+    resolved against the manifest's folder.
+    """
+    with open(path, "r") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("YAML manifests need PyYAML (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, list):
+        data = {"jobs": data}
+    defaults = data.get("defaults") or {}
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        return value if os.path.isabs(value) else os.path.join(base, value)
+
+    jobs = []
+    for entry in data.get("jobs") or []:
+        job = dict(defaults, **entry)
+        for key in ("input", "output", "output_dir"):
+            if job.get(key):
+                job[key] = resolve(job[key])
+        if job.get("inputs"):
+            job["inputs"] = [resolve(p) for p in job["inputs"]]
+        if job.get("entries"):
+            job["entries"] = [_resolve_entry(e, resolve) for e in job["entries"]]
+        jobs.append(job)
+    return jobs
+
+
+def _resolve_entry(entry, resolve):
+    """Resolve the source path of an assembly entry (string, list or dict)."""
+    if isinstance(entry, str):
+        return resolve(entry)
+    if isinstance(entry, dict):
+        return dict(entry, source=resolve(entry["source"]))
+    return [resolve(entry[0]), *entry[1:]]
+
+
+# ==========================================================
+#  Argument parsing
+# ==========================================================
+# Trailing ":pages" and ":rotation" of an assemble argument
+_PAGES_RE = re.compile(r"^(all|[0-9end,\- ]*)$", re.IGNORECASE)
+_ROTATION_RE = re.compile(r"^-?[0-9]+$")
+
+
+def parse_entry_arg(text: str) -> dict:
+    """
+    Parse "path[:pages[:rotation]]", e.g. "a.pdf:3-5", "c.pdf:10:90", "b.pdf::180".
+
+    Only trailing segments that look like pages / rotation are split off,
+    so Windows paths such as C:\\docs\\a.pdf are left intact.
+    """
+    parts = text.rsplit(":", 2)
+    if len(parts) == 3 and _PAGES_RE.match(parts[1]) and _ROTATION_RE.match(parts[2]):
+        return {"source": parts[0], "pages": parts[1] or None, "rotate": int(parts[2])}
+    parts = text.rsplit(":", 1)
+    if len(parts) == 2 and _PAGES_RE.match(parts[1]) and not os.path.exists(text):
+        return {"source": parts[0], "pages": parts[1] or None, "rotate": 0}
+    return {"source": text, "pages": None, "rotate": 0}
+
+
+def _add_engine_options(parser):
+    parser.add_argument("--backend", choices=["auto", "pypdf2", "pymupdf"],
+                        help="PDF engine (default: auto)")
+    parser.add_argument("--profile", choices=["fast", "compact", "max-compress"],
+                        help="output profile (default: fast)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="print per-stage timings and counters to stderr")
+
+
+def _add_optimize_options(parser, flag=True):
+    if flag:
+        parser.add_argument("--optimize", action="store_true",
+                            help="downsample and recompress page images of the output")
+    parser.add_argument("--dpi", type=int, help="target image resolution (default: 150)")
+    parser.add_argument("--quality", type=int, help="JPEG quality, 1-95 (default: 75)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m pdf_engine",
+                                     description="Merge, split and inspect PDFs without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser("merge", help="merge PDFs in the given order")
+    merge.add_argument("inputs", nargs="+")
+    merge.add_argument("-o", "--output", help="output file (default: assets/output/merged_<time>.pdf)")
+    merge.add_argument("--streaming", action="store_true", help="bounded-memory merge (PyPDF2)")
+    merge.add_argument("--dedup", action="store_true", help="write identical resources once")
+    merge.add_argument("--append", action="store_true",
+                       help="add the inputs to the end of an existing --output (incremental update)")
+    _add_engine_options(merge)
+    _add_optimize_options(merge)
+
+    split = commands.add_parser("split", help="split one PDF into parts")
+    split.add_argument("input")
+    mode = split.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--at", type=int, help="two parts: pages 1..AT and the rest")
+    mode.add_argument("--ranges", help='one part per range, e.g. "1-3,4-10,11-end"')
+    mode.add_argument("--every", type=int, help="parts of EVERY pages")
+    mode.add_argument("--burst", action="store_true", help="one file per page")
+    split.add_argument("--output-dir", help="folder for the parts (default: split_output/ next to the input)")
+    _add_engine_options(split)
+    _add_optimize_options(split)
+
+    assemble = commands.add_parser("assemble", help="build one PDF from pages of several PDFs")
+    assemble.add_argument("entries", nargs="+", type=parse_entry_arg, metavar="PATH[:PAGES[:ROTATION]]",
+                          help='e.g. a.pdf:3-5 b.pdf c.pdf:10:90 (pages as in split --ranges)')
+    assemble.add_argument("-o", "--output", help="output file (default: assets/output/assembled_<time>.pdf)")
+    _add_engine_options(assemble)
+
+    optimize = commands.add_parser("optimize", help="shrink the page images of a (scanned) PDF")
+    optimize.add_argument("input")
+    optimize.add_argument("-o", "--output", help="output file (default: <name>_optimized.pdf)")
+    optimize.add_argument("--profile", choices=["fast", "compact", "max-compress"],
+                          help="output profile (default: fast)")
+    _add_optimize_options(optimize, flag=False)
+
+    info = commands.add_parser("info", help="print page count, version and encryption as JSON")
+    info.add_argument("inputs", nargs="+")
+
+    run = commands.add_parser("run", help="run every job of a JSON/YAML manifest")
+    run.add_argument("manifest")
+    run.add_argument("-j", "--jobs", type=int, help="parallel worker processes (default: CPU count)")
+    return parser
+
+
+def _job_from_args(args) -> dict:
+    """Turn merge / split / assemble / optimize / info arguments into a job dict."""
+    job = {key: value for key, value in vars(args).items() if value is not None and value is not False}
+    job["op"] = job.pop("command")
+    if job["op"] in ("merge", "split"):
+        # --dpi / --quality imply --optimize
+        options = {key: job.pop(key) for key in ("dpi", "quality") if key in job}
+        if job.pop("optimize", False) or options:
+            job["optimize"] = options or True
+    return job
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        jobs = load_manifest(args.manifest)
+        results = run_jobs(jobs, args.jobs)
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        results = [run_job(_job_from_args(args))]
+        result = results[0]
+        if result["info"] is not None:
+            json.dump(result["info"], sys.stdout, indent=2)
+            print()
+        for path in result["outputs"]:
+            print(path)
+        if result["metrics"]:
+            json.dump(result["metrics"], sys.stderr, indent=2)
+            print(file=sys.stderr)
+
+    failed = [r for r in results if r["error"]]
+    for result in failed:
+        print(f"error ({result['op']}): {result['error']}", file=sys.stderr)
+    return 1 if failed else 0
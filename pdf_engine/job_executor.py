@@ -0,0 +1,128 @@
+# ==========================================================
+#  Job Executor Module
+#  -------------------
+#  Runs long PDF operations (merge, split, ...) on a
+#  background worker pool so the Kivy main thread keeps
+#  repainting. Progress, results and errors are handed back
+#  to the UI thread through Clock.schedule_once.
+# ==========================================================
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+def kivy_dispatch(callback, *args):
+    """
+    Run `callback(*args)` on the Kivy main thread.
+
+    Falls back to a direct call when Kivy is not available
+    (e.g. when pdf_engine is used from a script).
+    """
+    try:
+        from kivy.clock import Clock
+    except ImportError:
+        callback(*args)
+        return
+    Clock.schedule_once(lambda dt: callback(*args), 0)
+
+
+class JobExecutor:
+    """Thread pool for PDF jobs with main-thread callbacks."""
+
+    def __init__(self, max_workers: int = 2, dispatch=kivy_dispatch, name: str = "pdf-job"):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers (int): Number of jobs that may run at the same time.
+            dispatch (callable): dispatch(callback, *args) used to deliver
+                                 callbacks on the UI thread.
+            name (str): Prefix of the worker thread names.
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._dispatch = dispatch
+
+    def submit(self, func, *args, on_progress=None, on_done=None, on_error=None, **kwargs):
+        """
+        Run `func(*args, **kwargs)` in the background.
+
+        When `on_progress` is given, `func` is also passed a `progress_callback`
+        keyword; PDFMerger.merge and PDFSplitter.split both accept one.
+        Progress updates are coalesced: while one update is waiting for the
+        UI thread, newer ones replace it instead of queueing up behind it.
+
+        Args:
+            func (callable): The job to run.
+            on_progress (callable): on_progress(file_index, file_count, page_index, page_count).
+            on_done (callable): on_done(result) when the job succeeds.
+            on_error (callable): on_error(exception) when the job fails.
+
+        Returns:
+            concurrent.futures.Future: Future for the job result.
+        """
+        if on_progress:
+            kwargs["progress_callback"] = self._make_reporter(on_progress)
+
+        def run():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if on_error:
+                    self._dispatch(on_error, e)
+                raise
+            if on_done:
+                self._dispatch(on_done, result)
+            return result
+
+        return self._pool.submit(run)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self._pool.shutdown(wait=wait)
+
+    def _make_reporter(self, on_progress):
+        """Build a thread-safe progress callback that keeps only the latest update."""
+        lock = threading.Lock()
+        state = {"latest": None, "pending": False}
+
+        def deliver():
+            with lock:
+                progress = state["latest"]
+                state["pending"] = False
+            on_progress(*progress)
+
+        def report(*progress):
+            with lock:
+                state["latest"] = progress
+                if state["pending"]:
+                    return
+                state["pending"] = True
+            self._dispatch(deliver)
+
+        return report
+
+
+# Shared executors used by the screens
+_default_executor = None
+_background_executor = None
+
+
+def get_executor() -> JobExecutor:
+    """Return the process-wide JobExecutor instance."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = JobExecutor()
+    return _default_executor
+
+
+def get_background_executor() -> JobExecutor:
+    """
+    Return the executor for low-priority work (thumbnails, prefetching).
+
+    It has a single worker of its own, so a burst of background jobs never
+    queues ahead of a merge or split the user started.
+    """
+    global _background_executor
+    if _background_executor is None:
+        _background_executor = JobExecutor(max_workers=1, name="pdf-background")
+    return _background_executor
@@ -0,0 +1,121 @@
+# ==========================================================
+#  Operation Metrics
+#  -----------------
+#  Optional instrumentation for merge and split: time spent
+#  per stage (parse / copy / write), pages and files
+#  processed, bytes read and written, and peak memory.
+#
+#  Enable it per operation (collect_metrics=True) or for the
+#  whole process with set_metrics_sink(); the sink receives
+#  one metrics dict per finished operation. When neither is
+#  used, a no-op recorder keeps the overhead at zero.
+# ==========================================================
+
+from contextlib import contextmanager, nullcontext
+import os
+import time
+
+from pdf_engine.utils.memory_utils import current_rss
+
+
+# Process-wide receiver of finished metrics (None = disabled)
+_sink = None
+
+
+def set_metrics_sink(sink):
+    """
+    Send the metrics of every merge / split to `sink(metrics)`.
+
+    Args:
+        sink (callable | None): Receives one dict per operation
+                                (see MetricsRecorder.finish); None disables.
+    """
+    global _sink
+    _sink = sink
+
+
+def new_recorder(operation: str, enabled: bool = False, **labels):
+    """Return a MetricsRecorder, or the no-op recorder when metrics are off."""
+    if enabled or _sink is not None:
+        return MetricsRecorder(operation, **labels)
+    return NULL_RECORDER
+
+
+class MetricsRecorder:
+    """Collects stage timings and counters for one operation."""
+
+    def __init__(self, operation: str, **labels):
+        """
+        Args:
+            operation (str): "merge" or "split".
+            **labels: Extra fields copied into the result (e.g. backend).
+        """
+        self.operation = operation
+        self.labels = labels
+        self.stages = {}       # stage name -> seconds
+        self.counters = {}     # counter name -> int
+        self.peak_rss = current_rss()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the time spent inside the block to stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self, inputs=(), outputs=(), error=None) -> dict:
+        """
+        Build the metrics dict and hand it to the sink, if any.
+
+        Returns:
+            dict: {"operation", "total_s", "stages_s", "counters",
+                   "bytes_read", "bytes_written", "peak_rss_bytes",
+                   "error", **labels}.
+        """
+        metrics = {
+            "operation": self.operation,
+            **self.labels,
+            "total_s": round(time.perf_counter() - self._start, 6),
+            "stages_s": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "bytes_read": _total_size(inputs),
+            "bytes_written": _total_size(outputs),
+            "peak_rss_bytes": max(self.peak_rss, current_rss()),
+            "error": str(error) if error else None,
+        }
+        if _sink is not None:
+            _sink(metrics)
+        return metrics
+
+
+class _NullRecorder:
+    """Stand-in used when metrics are disabled; every call does nothing."""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+    def finish(self, inputs=(), outputs=(), error=None):
+        return None
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def _total_size(paths) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass  # e.g. output removed after a failed run
+    return total
@@ -0,0 +1,153 @@
+# ==========================================================
+#  PDF Assembler Module
+#  --------------------
+#  Builds one PDF from arbitrary pages of many inputs, e.g.
+#  "pages 3-5 of A, all of B, page 10 of C rotated 90°",
+#  in a single pass: no intermediate split or merge files.
+#
+#  Every distinct source is opened once, however many
+#  entries refer to it, and stays open until the output
+#  has been written.
+# ==========================================================
+
+import os
+import time
+
+from pdf_engine.pdf_backend import get_backend, get_output_profile
+from pdf_engine.pdf_splitter import parse_page_ranges
+from pdf_engine.metrics import new_recorder
+from pdf_engine.cancellation import CancelToken
+
+
+def parse_entry(entry) -> tuple:
+    """
+    Normalize one assembly entry to (source, pages, rotation).
+
+    Accepted forms:
+        "a.pdf"                         every page
+        ("a.pdf", "3-5,10")             pages in range-spec form (see parse_page_ranges)
+        ("a.pdf", 7, 90)                one 1-based page, rotated 90° clockwise
+        {"source": "a.pdf", "pages": "2-end", "rotate": 180}
+
+    `pages` is None (every page), a 1-based page number or a range spec;
+    `rotation` must be a multiple of 90 and is added to the page's own.
+    """
+    if isinstance(entry, str):
+        entry = (entry,)
+    if isinstance(entry, dict):
+        entry = (entry["source"], entry.get("pages"), entry.get("rotate", 0))
+    if not 1 <= len(entry) <= 3:
+        raise ValueError(f"Invalid assembly entry: {entry!r}")
+
+    source, pages, rotation = (tuple(entry) + (None, 0))[:3]
+    rotation = int(rotation or 0)
+    if rotation % 90:
+        raise ValueError(f"Rotation must be a multiple of 90, got {rotation}")
+    return source, pages, rotation % 360
+
+
+def resolve_pages(pages, total_pages: int) -> list[int]:
+    """Turn an entry's `pages` into 0-based page indices."""
+    if pages is None or (isinstance(pages, str) and pages.strip().lower() == "all"):
+        return list(range(total_pages))
+    if isinstance(pages, int):
+        pages = str(pages)
+    return [index for part in parse_page_ranges(pages, total_pages) for index in part]
+
+
+class PDFAssembler:
+    """Builds one PDF from page ranges of several source PDFs."""
+
+    def __init__(self, entries, backend: str | None = None, profile: str | None = None,
+                 collect_metrics: bool = False, cancel_token: CancelToken | None = None):
+        """
+        Initialize with the assembly plan.
+
+        Args:
+            entries (list): (source, pages, rotation) entries in output order
+                            (see parse_entry for the accepted forms).
+            backend (str, optional): "pypdf2", "pymupdf" or "auto"; defaults
+                                     to the backend chosen in Settings.
+            profile (str, optional): Output profile, "fast" (default),
+                                     "compact" or "max-compress".
+            collect_metrics (bool): Record per-stage timings and counters
+                                    in self.metrics.
+            cancel_token (CancelToken, optional): Cancelling it stops the
+                                    assembly with OperationCancelled at the
+                                    next page.
+        """
+        self.entries = [parse_entry(entry) for entry in entries]
+        self.backend = get_backend(backend)
+        self.profile = get_output_profile(profile)
+        self.collect_metrics = collect_metrics
+        self.metrics = None    # metrics dict of the last run, when enabled
+        self.cancel_token = cancel_token or CancelToken()
+
+    @property
+    def sources(self) -> list[str]:
+        """Distinct source paths, in order of first use."""
+        return list(dict.fromkeys(source for source, _, _ in self.entries))
+
+    def assemble(self, output_path: str | None = None, progress_callback=None) -> str:
+        """
+        Write the assembled PDF.
+
+        Args:
+            output_path (str, optional): Where to write the result; defaults
+                to assets/output/assembled_<timestamp>.pdf. An existing file
+                is never overwritten ("<name> (1).pdf" is used instead).
+            progress_callback (callable, optional): Called as
+                progress_callback(entry_index, entry_count, page_index, page_count)
+                after every copied page.
+
+        Returns:
+            str: Full path of the output PDF (as actually written).
+        """
+        if not self.entries:
+            raise ValueError("At least one page entry is required to assemble.")
+
+        if output_path is None:
+            output_dir = os.path.join("assets", "output")
+            os.makedirs(output_dir, exist_ok=True)
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            output_path = os.path.join(output_dir, f"assembled_{timestamp}.pdf")
+        elif os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        recorder = new_recorder("assemble", self.collect_metrics, backend=self.backend.name)
+        docs = {}  # source path -> open document, one per distinct source
+        try:
+            # --- 1️⃣ Open every distinct source once ---
+            for source in self.sources:
+                with recorder.stage("parse"):
+                    docs[source] = self.backend.open(source)
+                recorder.count("files")
+
+            # --- 2️⃣ Resolve each entry against its source's page count ---
+            pieces = []
+            for source, pages, rotation in self.entries:
+                doc = docs[source]
+                try:
+                    indices = resolve_pages(pages, self.backend.page_count(doc))
+                except ValueError as e:
+                    raise ValueError(f"{os.path.basename(source)}: {e}") from None
+                pieces.append((doc, indices, rotation))
+
+            # --- 3️⃣ Copy all pieces and write the output in one pass ---
+            def on_progress(*progress):
+                self.cancel_token.raise_if_cancelled()
+                if progress_callback:
+                    progress_callback(*progress)
+
+            # Written atomically: a failed or cancelled run leaves no file
+            output_path = self.backend.assemble(pieces, output_path, on_progress,
+                                                self.profile, metrics=recorder)
+        except BaseException as e:
+            self.metrics = recorder.finish(self.sources, error=e)
+            raise
+        finally:
+            for doc in docs.values():
+                self.backend.close(doc)
+
+        self.metrics = recorder.finish(self.sources, [output_path])
+        return output_path
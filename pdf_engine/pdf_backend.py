@@ -0,0 +1,478 @@
+# ==========================================================
+#  PDF Backend Module
+#  ------------------
+#  Interchangeable PDF engines behind one small interface:
+#    • PyPDF2Backend  – pure Python, always available
+#    • PyMuPDFBackend – C-backed (fitz), much faster
+#  PDFMerger and PDFSplitter take a backend name per call;
+#  otherwise the default set from Settings is used.
+#
+#  Output profiles ("fast", "compact", "max-compress") trade
+#  CPU time for smaller files; see OUTPUT_PROFILES below.
+#
+#  Outputs are written through AtomicOutput: an existing file
+#  is never overwritten, so every operation returns the paths
+#  it actually wrote.
+# ==========================================================
+
+import os
+
+from pdf_engine.metrics import NULL_RECORDER
+from pdf_engine.utils.file_utils import AppendOutput, AtomicOutput
+
+
+# ==========================================================
+#  Output profiles
+# ==========================================================
+# Each profile maps to StreamingPDFWriter options (PyPDF2) and
+# to the matching Document.save() flags (PyMuPDF).
+OUTPUT_PROFILES = {
+    # Copy streams as they are, classic xref table
+    "fast": {"dedup": False, "compress_streams": False,
+             "recompress": False, "object_streams": False},
+    # Shared resources once, Flate for raw streams, object + xref streams
+    "compact": {"dedup": True, "compress_streams": True,
+                "recompress": False, "object_streams": True},
+    # As compact, and re-deflate existing streams at the highest level
+    "max-compress": {"dedup": True, "compress_streams": True,
+                     "recompress": True, "object_streams": True},
+}
+
+
+def get_output_profile(profile=None) -> dict:
+    """
+    Return the writer options for an output profile.
+
+    Args:
+        profile (str | dict, optional): Profile name, an options dict
+                                        (returned unchanged) or None for "fast".
+    """
+    if isinstance(profile, dict):
+        return profile
+    profile = profile or "fast"
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile: {profile}")
+    return OUTPUT_PROFILES[profile]
+
+
+class PDFBackend:
+    """
+    Base class for PDF engines.
+
+    Subclasses implement open / page_count / new_document /
+    append_pages / write / close; merge and split are built on top.
+    """
+
+    name = None
+    supports_streaming = False  # True: PDFMerger writes profile options with the streaming writer
+
+    def open(self, path):
+        raise NotImplementedError
+
+    def page_count(self, doc) -> int:
+        raise NotImplementedError
+
+    def new_document(self):
+        raise NotImplementedError
+
+    def append_pages(self, out, doc, page_indices, on_page=None, rotation=0):
+        """
+        Append the 0-based `page_indices` of `doc` to `out`, in order.
+
+        on_page(copied, total) is called as pages are copied. `rotation`
+        (a multiple of 90) is added to each copied page's own rotation.
+        """
+        raise NotImplementedError
+
+    def write(self, out, path, profile=None) -> str:
+        """
+        Save `out` using the given output profile.
+
+        Returns the path written: `path`, or a free name next to it
+        when `path` already exists (see AtomicOutput).
+        """
+        raise NotImplementedError
+
+    def close(self, doc):
+        pass
+
+    # ------------------------------------------------------
+    # Operations built on the primitives
+    # ------------------------------------------------------
+    def merge(self, file_paths, output_path, progress_callback=None, profile=None,
+              metrics=NULL_RECORDER):
+        """
+        Concatenate `file_paths` into `output_path`.
+
+        progress_callback(file_index, file_count, page_index, page_count)
+        is called as pages are copied. `profile` is an output profile
+        name or options dict (see get_output_profile). `metrics` receives
+        the parse / copy / write timings and page counts. Returns the
+        path written.
+        """
+        out = self.new_document()
+        for file_index, path in enumerate(file_paths):
+            def on_page(copied, total, file_index=file_index):
+                if progress_callback:
+                    progress_callback(file_index, len(file_paths), copied, total)
+
+            with metrics.stage("parse"):
+                doc = self.open(path)
+                page_count = self.page_count(doc)
+            with metrics.stage("copy"):
+                self.append_pages(out, doc, range(page_count), on_page)
+            self.close(doc)
+            metrics.count("files")
+            metrics.count("pages", page_count)
+        with metrics.stage("write"):
+            output_path = self.write(out, output_path, profile)
+        self.close(out)
+        return output_path
+
+    def split(self, doc, parts, output_paths, progress_callback=None, profile=None,
+              metrics=NULL_RECORDER):
+        """
+        Write each list of page indices in `parts` to the matching output path.
+
+        progress_callback(part_index, part_count, page_index, page_count)
+        is called as pages are copied. `profile` selects the output profile;
+        `metrics` receives the copy / write timings and page counts.
+        Returns the paths written; a cancelled or failed split removes
+        the parts it had already written.
+        """
+        written = []
+        try:
+            for part_index, (page_indices, path) in enumerate(zip(parts, output_paths)):
+                def on_page(copied, total, part_index=part_index):
+                    if progress_callback:
+                        progress_callback(part_index, len(parts), copied, total)
+
+                out = self.new_document()
+                with metrics.stage("copy"):
+                    self.append_pages(out, doc, page_indices, on_page)
+                with metrics.stage("write"):
+                    written.append(self.write(out, path, profile))
+                self.close(out)
+                metrics.count("files")
+                metrics.count("pages", len(page_indices))
+        except BaseException:
+            _discard(written)
+            raise
+        return written
+
+    def assemble(self, pieces, output_path, progress_callback=None, profile=None,
+                 metrics=NULL_RECORDER):
+        """
+        Build one output from (doc, page_indices, rotation) pieces, in order.
+
+        The same open doc may appear in several pieces; it is read from,
+        never reopened. progress_callback(piece_index, piece_count,
+        page_index, page_count) is called as pages are copied. Returns
+        the path written.
+        """
+        out = self.new_document()
+        for piece_index, (doc, page_indices, rotation) in enumerate(pieces):
+            def on_page(copied, total, piece_index=piece_index):
+                if progress_callback:
+                    progress_callback(piece_index, len(pieces), copied, total)
+
+            with metrics.stage("copy"):
+                self.append_pages(out, doc, page_indices, on_page, rotation)
+            metrics.count("pages", len(page_indices))
+        with metrics.stage("write"):
+            output_path = self.write(out, output_path, profile)
+        self.close(out)
+        return output_path
+
+    def append(self, file_paths, output_path, progress_callback=None, profile=None,
+               metrics=NULL_RECORDER):
+        """
+        Add the pages of `file_paths` to the end of the existing PDF at
+        `output_path` as an incremental update.
+
+        Only the new objects, the changed page tree and a new xref section
+        are written after the file's last byte, so the cost depends on the
+        inputs, not on the size of the existing file. A failed or cancelled
+        append truncates the file back to its original length. Progress and
+        metrics work as in merge(). Returns `output_path`.
+        """
+        raise NotImplementedError
+
+
+class PyPDF2Backend(PDFBackend):
+    """Pure-Python engine; slower, but has no native dependencies."""
+
+    name = "pypdf2"
+    supports_streaming = True
+
+    def __init__(self):
+        # Imported on first use, so choosing a backend at startup stays cheap
+        from PyPDF2 import PdfWriter
+        self._writer_class = PdfWriter
+
+    def open(self, path):
+        from pdf_engine.pdf_loader import open_reader
+
+        # Memory-mapped: pages are read from the mapping on demand
+        return open_reader(path)
+
+    def page_count(self, doc) -> int:
+        return len(doc.pages)
+
+    def new_document(self):
+        return self._writer_class()
+
+    def append_pages(self, out, doc, page_indices, on_page=None, rotation=0):
+        page_indices = list(page_indices)
+        for copied, i in enumerate(page_indices, start=1):
+            page = out.add_page(doc.pages[i])
+            if rotation % 360:
+                page.rotate(rotation)
+            if on_page:
+                on_page(copied, len(page_indices))
+
+    def write(self, out, path, profile=None) -> str:
+        # PdfWriter has no compact options; split() and PDFMerger use
+        # StreamingPDFWriter whenever the profile asks for any
+        output = AtomicOutput(path)
+        with output as f:
+            out.write(f)
+        return output.path
+
+    def close(self, doc):
+        # Unmap the input now rather than whenever cyclic GC frees the
+        # reader: on Windows a mapped file cannot be deleted or replaced.
+        # Writers (new_document) have no stream and nothing to release.
+        stream = getattr(doc, "stream", None)
+        if stream is not None:
+            stream.close()
+
+    def split(self, doc, parts, output_paths, progress_callback=None, profile=None,
+              metrics=NULL_RECORDER):
+        from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+
+        options = get_output_profile(profile)
+        if not any(options.values()):
+            return super().split(doc, parts, output_paths, progress_callback, metrics=metrics)
+
+        written = []
+        try:
+            for part_index, (page_indices, path) in enumerate(zip(parts, output_paths)):
+                def on_page(copied, total, part_index=part_index):
+                    if progress_callback:
+                        progress_callback(part_index, len(parts), copied, total)
+
+                output = AtomicOutput(path)
+                with output as f:
+                    writer = StreamingPDFWriter(f, **options)
+                    with metrics.stage("copy"):
+                        writer.add_pages(doc, page_indices, on_page)
+                    with metrics.stage("write"):
+                        writer.close()
+                written.append(output.path)
+                metrics.count("files")
+                metrics.count("pages", len(page_indices))
+        except BaseException:
+            _discard(written)
+            raise
+        return written
+
+    def assemble(self, pieces, output_path, progress_callback=None, profile=None,
+                 metrics=NULL_RECORDER):
+        from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+
+        options = get_output_profile(profile)
+        if not any(options.values()):
+            return super().assemble(pieces, output_path, progress_callback, metrics=metrics)
+
+        output = AtomicOutput(output_path)
+        with output as f:
+            # One writer for every piece: resources of a source used by
+            # several pieces are written once
+            writer = StreamingPDFWriter(f, **options)
+            for piece_index, (doc, page_indices, rotation) in enumerate(pieces):
+                def on_page(copied, total, piece_index=piece_index):
+                    if progress_callback:
+                        progress_callback(piece_index, len(pieces), copied, total)
+
+                with metrics.stage("copy"):
+                    writer.add_pages(doc, page_indices, on_page, rotation)
+                metrics.count("pages", len(page_indices))
+            with metrics.stage("write"):
+                writer.close()
+        return output.path
+
+    def append(self, file_paths, output_path, progress_callback=None, profile=None,
+               metrics=NULL_RECORDER):
+        from pdf_engine.pdf_loader import probe_update_base
+        from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+
+        # Trailer, xref, catalog and root page node only: the existing
+        # pages are never parsed
+        with metrics.stage("parse"):
+            base = probe_update_base(output_path)
+
+        with AppendOutput(output_path) as f:
+            writer = StreamingPDFWriter(f, **get_output_profile(profile), base=base)
+            for file_index, path in enumerate(file_paths):
+                def on_page(copied, total, file_index=file_index):
+                    if progress_callback:
+                        progress_callback(file_index, len(file_paths), copied, total)
+
+                with metrics.stage("parse"):
+                    doc = self.open(path)
+                    page_count = self.page_count(doc)
+                with metrics.stage("copy"):
+                    writer.add_pages(doc, on_page=on_page)
+                self.close(doc)  # released before the next input is opened
+                metrics.count("files")
+                metrics.count("pages", page_count)
+            with metrics.stage("write"):
+                writer.close()
+        return output_path
+
+
+class PyMuPDFBackend(PDFBackend):
+    """C-backed engine built on PyMuPDF (fitz)."""
+
+    name = "pymupdf"
+
+    def __init__(self):
+        import fitz  # raises ImportError when PyMuPDF is not installed
+        self._fitz = fitz
+
+    def open(self, path):
+        return self._fitz.open(path)
+
+    def page_count(self, doc) -> int:
+        return doc.page_count
+
+    def new_document(self):
+        return self._fitz.open()
+
+    def append_pages(self, out, doc, page_indices, on_page=None, rotation=0):
+        # Copy consecutive runs with one insert_pdf call each
+        page_indices = list(page_indices)
+        copied = 0
+        for start, end in _runs(page_indices):
+            first = out.page_count
+            out.insert_pdf(doc, from_page=start, to_page=end)
+            if rotation % 360:
+                # insert_pdf(rotate=) sets an absolute angle; add to each page's own
+                for page in out.pages(first, out.page_count):
+                    page.set_rotation((page.rotation + rotation) % 360)
+            copied += end - start + 1
+            if on_page:
+                on_page(copied, len(page_indices))
+
+    def write(self, out, path, profile=None) -> str:
+        options = get_output_profile(profile)
+        output = AtomicOutput(path)
+        with output:
+            # save() only writes to file names, so it gets the temp file's
+            out.save(
+                output.temp_path,
+                # garbage=4 also merges duplicate objects, comparing stream contents
+                garbage=4 if options["dedup"] else 0,
+                deflate=options["compress_streams"],
+                deflate_images=options["recompress"],
+                deflate_fonts=options["recompress"],
+                use_objstms=options["object_streams"],
+                compression_effort=100 if options["recompress"] else 0,
+            )
+        return output.path
+
+    def append(self, file_paths, output_path, progress_callback=None, profile=None,
+               metrics=NULL_RECORDER):
+        with metrics.stage("parse"):
+            out = self._fitz.open(output_path)
+        try:
+            if out.needs_pass or not out.can_save_incrementally():
+                raise ValueError(f"Cannot append to {os.path.basename(output_path)}: "
+                                 "encrypted or damaged")
+            for file_index, path in enumerate(file_paths):
+                def on_page(copied, total, file_index=file_index):
+                    if progress_callback:
+                        progress_callback(file_index, len(file_paths), copied, total)
+
+                with metrics.stage("parse"):
+                    doc = self.open(path)
+                    page_count = self.page_count(doc)
+                with metrics.stage("copy"):
+                    self.append_pages(out, doc, range(page_count), on_page)
+                self.close(doc)
+                metrics.count("files")
+                metrics.count("pages", page_count)
+
+            # save() appends to the file itself; AppendOutput fsyncs it, or
+            # cuts a half-written update off again
+            with metrics.stage("write"), AppendOutput(output_path):
+                out.save(output_path, incremental=True,
+                         encryption=self._fitz.PDF_ENCRYPT_KEEP,
+                         deflate=get_output_profile(profile)["compress_streams"])
+        finally:
+            self.close(out)
+        return output_path
+
+    def close(self, doc):
+        doc.close()
+
+
+def _discard(paths):
+    """Remove outputs of an operation that did not finish."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _runs(page_indices):
+    """Group indices into (start, end) runs of consecutive pages."""
+    runs = []
+    for i in page_indices:
+        if runs and i == runs[-1][1] + 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(run) for run in runs]
+
+
+# ==========================================================
+#  Backend selection
+# ==========================================================
+BACKENDS = {
+    PyPDF2Backend.name: PyPDF2Backend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+# "auto" prefers PyMuPDF and falls back to PyPDF2
+_default_name = "auto"
+
+
+def set_default_backend(name: str):
+    """Choose the backend used when a call does not name one ("auto", "pypdf2", "pymupdf")."""
+    if name != "auto" and name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name}")
+    global _default_name
+    _default_name = name
+
+
+def get_backend(name: str | None = None) -> PDFBackend:
+    """
+    Return a backend instance.
+
+    Args:
+        name (str, optional): "pypdf2", "pymupdf", "auto" or None for the
+                              configured default. A PDFBackend instance is
+                              returned unchanged.
+    """
+    if isinstance(name, PDFBackend):
+        return name
+    name = name or _default_name
+    if name == "auto":
+        try:
+            return PyMuPDFBackend()
+        except ImportError:
+            return PyPDF2Backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name}")
+    return BACKENDS[name]()
@@ -0,0 +1,539 @@
+# ==========================================================
+#  PDF Loader Module
+#  -----------------
+#  Metadata service used by the Merge and Split screens.
+#  Reads page count, encryption flag, PDF version and file
+#  size for a PDF and keeps the results in an on-disk cache
+#  keyed by (path, size, mtime), so only new or changed
+#  files are parsed again.
+#
+#  open_input() / open_reader() are the single way inputs are
+#  opened for PyPDF2: the file is memory-mapped instead of
+#  read into memory, so only the byte ranges the parser
+#  touches are ever loaded.
+#
+#  probe_pdf() answers the common question ("how many
+#  pages?") from the trailer, the xref and the root /Pages
+#  /Count alone; a full PdfReader is only built for files
+#  the probe cannot read (damaged, encrypted). The same
+#  reader gives the incremental-update writer what it needs
+#  to append to an existing file (probe_update_base).
+# ==========================================================
+
+from io import BytesIO
+import json
+import mmap
+import os
+import re
+import threading
+
+
+def open_input(file_path: str):
+    """
+    Return a read-only, zero-copy view of a PDF file.
+
+    The result is an mmap (file-like: read / seek / tell), so opening a
+    huge file costs no read up front; the OS pages in only what is used.
+    It stays valid after the file descriptor is closed and is released
+    when the last reference (e.g. the PdfReader) goes away. Files that
+    cannot be mapped (empty, special files) are read into a BytesIO.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return BytesIO(f.read())
+
+
+def open_reader(file_path: str):
+    """
+    Create a PdfReader over open_input(file_path).
+
+    PdfReader(path) would copy the whole file into a BytesIO first.
+    """
+    from PyPDF2 import PdfReader  # deferred: keeps app start-up free of PyPDF2
+
+    return PdfReader(open_input(file_path))
+
+
+# ==========================================================
+#  Page-count probe
+# ==========================================================
+# Bytes at the end of the file searched for "startxref"
+TAIL_SIZE = 2048
+
+# Bytes at the start of the file searched for the header and
+# the linearization dictionary
+HEAD_SIZE = 1024
+
+# Incremental-update sections followed before giving up (a binder
+# grown by PDFMerger append mode gains one per append)
+MAX_XREF_SECTIONS = 4096
+
+_HEADER_RE = re.compile(rb"%PDF-(\d\.\d)")
+_FIRST_OBJ_RE = re.compile(rb"(\d+)\s+(\d+)\s+obj\s*<<")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*(?:\r\n|\r|\n)")
+_XREF_ENTRY_RE = re.compile(rb"(\d{10}) (\d{5}) ([nf])[ \r\n]{1,2}")
+
+
+def probe_pdf(file_path: str) -> dict | None:
+    """
+    Read page count and PDF version without building a PdfReader.
+
+    Only the header, the trailer, the cross-reference sections (tables
+    or streams), the catalog and the root page-tree node are read; for
+    linearized files the page count comes straight from the
+    linearization dictionary. On a memory-mapped file that is a few
+    kilobytes of I/O, whatever the file size.
+
+    Returns:
+        dict | None: {"page_count", "encrypted", "pdf_version"}, or None
+                     when the file is damaged or encrypted and needs a
+                     full parse.
+    """
+    data = open_input(file_path)
+    try:
+        return _PdfProbe(data).run()
+    except Exception:
+        return None
+    finally:
+        data.close()
+
+
+def probe_update_base(file_path: str) -> dict:
+    """
+    Read what an incremental update of `file_path` builds on.
+
+    Like probe_pdf, only the trailer, the cross-reference sections, the
+    catalog and the root page-tree node are read.
+
+    Returns:
+        dict: {"file_size", "startxref", "size" (trailer /Size), "root",
+               "info", "id" (trailer values, "info" / "id" may be None),
+               "catalog", "pages_ref", "pages" (root /Pages node with its
+               /Kids resolved), "pdf_version", "xref_stream"}.
+
+    Raises:
+        ValueError: The file is encrypted, damaged or not a PDF; rewrite
+                    it with a normal merge first.
+    """
+    from PyPDF2.generic import NameObject
+
+    data = open_input(file_path)
+    try:
+        probe = _PdfProbe(data)
+        header = _HEADER_RE.search(probe._read(0, HEAD_SIZE))
+        startxref = probe._startxref()
+        probe._read_xref_chain(startxref)
+        if header is None or "/Encrypt" in probe.trailer:
+            raise ValueError("not an unencrypted PDF")
+
+        root = probe.trailer["/Root"]
+        catalog = probe.get_object(root)
+        # raw_get: item access would resolve the reference
+        pages_ref = catalog.raw_get("/Pages")
+        pages = probe.get_object(pages_ref)
+        for key in ("/Kids", "/Count"):
+            pages[NameObject(key)] = probe.get_object(pages.raw_get(key))
+        version = catalog.get("/Version")
+        return {
+            "file_size": probe.size,
+            "startxref": startxref,
+            "size": int(probe.trailer["/Size"]),
+            "root": root,
+            "info": probe.trailer.get("/Info"),
+            "id": probe.trailer.get("/ID"),
+            "catalog": catalog,
+            "pages_ref": pages_ref,
+            "pages": pages,
+            "pdf_version": str(version).lstrip("/") if version else header.group(1).decode(),
+            "xref_stream": probe.sections[0][0] == "stream",
+        }
+    except Exception as e:
+        raise ValueError(f"Cannot append to {os.path.basename(file_path)}: {e}") from None
+    finally:
+        data.close()
+
+
+class _PdfProbe:
+    """
+    Minimal object lookup over a PDF's cross-reference data.
+
+    Objects are parsed with PyPDF2's generic parser, which calls back
+    into get_object() for indirect stream lengths; strict stays True so
+    anything malformed raises and the caller falls back to PdfReader.
+    """
+
+    strict = True
+
+    def __init__(self, data):
+        self.data = data
+        data.seek(0, os.SEEK_END)
+        self.size = data.tell()
+        self.sections = []     # newest first: ("table", subsections) / ("stream", entries)
+        self.trailer = {}
+        self._objstms = {}     # object stream number -> (decoded data, {index: offset})
+
+    def run(self) -> dict | None:
+        head = self._read(0, HEAD_SIZE)
+        header = _HEADER_RE.search(head)
+        if header is None:
+            return None
+        version = header.group(1).decode()
+
+        self._read_xref_chain(self._startxref())
+        if "/Encrypt" in self.trailer:
+            return None  # the full parse tries the empty password
+
+        root = self.get_object(self.trailer["/Root"])
+        catalog_version = root.get("/Version")
+        if catalog_version:
+            version = str(catalog_version).lstrip("/")
+
+        page_count = self._linearized_count(head)
+        if page_count is None:
+            pages = self.get_object(root["/Pages"])
+            page_count = self.get_object(pages["/Count"])
+        page_count = int(page_count)
+        if page_count < 0:
+            return None
+        return {"page_count": page_count, "encrypted": False, "pdf_version": version}
+
+    # ------------------------------------------------------
+    # Object access (also called back by PyPDF2's parser)
+    # ------------------------------------------------------
+    def get_object(self, obj):
+        from PyPDF2.generic import IndirectObject, read_object
+
+        if not isinstance(obj, IndirectObject):
+            return obj
+        entry = self._lookup(obj.idnum)
+        if entry is None:
+            raise ValueError(f"Object {obj.idnum} not in xref")
+        kind, a, b = entry
+        if kind == "offset":
+            match = _OBJ_HEADER_RE.match(self._read(a, 32))
+            if match is None or int(match.group(1)) != obj.idnum:
+                raise ValueError(f"Bad xref offset for object {obj.idnum}")
+            self.data.seek(a + match.end())
+            self._skip_whitespace()
+            return read_object(self.data, self)
+
+        decoded, offsets = self._object_stream(a)
+        stream = BytesIO(decoded)
+        stream.seek(offsets[obj.idnum])
+        return read_object(stream, self)
+
+    def _lookup(self, num: int):
+        """Return ("offset", pos, 0) or ("compressed", objstm, index) for `num`."""
+        for kind, section in self.sections:
+            if kind == "stream":
+                entry = section.get(num)
+                if entry is None:
+                    continue
+                if entry[0] == 0:
+                    return None
+                return ("offset", entry[1], 0) if entry[0] == 1 else ("compressed", entry[1], entry[2])
+
+            for start, count, pos, entry_len in section:
+                if start <= num < start + count:
+                    match = _XREF_ENTRY_RE.match(self._read(pos + (num - start) * entry_len, 20))
+                    if match is None:
+                        raise ValueError(f"Bad xref entry for object {num}")
+                    return ("offset", int(match.group(1)), 0) if match.group(3) == b"n" else None
+        return None
+
+    def _object_stream(self, num: int):
+        """Decode object stream `num` and index its objects (cached)."""
+        from PyPDF2.generic import IndirectObject
+
+        if num not in self._objstms:
+            objstm = self.get_object(IndirectObject(num, 0, self))
+            decoded = objstm.get_data()
+            first = int(objstm["/First"])
+            numbers = decoded[:first].split()
+            offsets = {int(numbers[i]): first + int(numbers[i + 1])
+                       for i in range(0, 2 * int(objstm["/N"]), 2)}
+            self._objstms[num] = (decoded, offsets)
+        return self._objstms[num]
+
+    # ------------------------------------------------------
+    # Cross-reference data
+    # ------------------------------------------------------
+    def _startxref(self) -> int:
+        tail_start = max(0, self.size - TAIL_SIZE)
+        tail = self._read(tail_start, TAIL_SIZE)
+        pos = tail.rfind(b"startxref")
+        if pos < 0:
+            raise ValueError("startxref not found")
+        return int(tail[pos + 9:].split()[0])
+
+    def _read_xref_chain(self, offset: int):
+        """Read the newest xref section and every older one it links to."""
+        seen = set()
+        queue = [offset]
+        while queue:
+            offset = queue.pop(0)
+            if offset in seen:
+                continue
+            if len(seen) >= MAX_XREF_SECTIONS or not 0 < offset < self.size:
+                raise ValueError(f"Bad xref chain at {offset}")
+            seen.add(offset)
+
+            if self._read(offset, 4) == b"xref":
+                trailer = self._read_xref_table(offset + 4)
+                if "/XRefStm" in trailer:  # hybrid file: stream after the table
+                    queue.insert(0, int(trailer["/XRefStm"]))
+            else:
+                trailer = self._read_xref_stream(offset)
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            if "/Prev" in trailer:
+                queue.append(int(trailer["/Prev"]))
+
+    def _read_xref_table(self, pos: int) -> dict:
+        """Index the subsections of a classic xref table; return its trailer."""
+        from PyPDF2.generic import read_object
+
+        subsections = []
+        while True:
+            chunk = self._read(pos, 64)
+            stripped = chunk.lstrip()
+            if stripped.startswith(b"trailer"):
+                pos += len(chunk) - len(stripped) + len(b"trailer")
+                break
+            match = _SUBSECTION_RE.match(chunk)
+            if match is None:
+                raise ValueError(f"Bad xref subsection at {pos}")
+            start, count = int(match.group(1)), int(match.group(2))
+            pos += match.end()
+            entry_len = 20
+            if count:
+                # Entries are 20 bytes by spec; some writers use a 1-byte EOL
+                entry = _XREF_ENTRY_RE.match(self._read(pos, 20))
+                if entry is None:
+                    raise ValueError(f"Bad xref entry at {pos}")
+                entry_len = entry.end()
+            subsections.append((start, count, pos, entry_len))
+            pos += count * entry_len
+
+        self.sections.append(("table", subsections))
+        self.data.seek(pos)
+        self._skip_whitespace()
+        return read_object(self.data, self)
+
+    def _read_xref_stream(self, pos: int) -> dict:
+        """Decode a cross-reference stream; return its dictionary as the trailer."""
+        from PyPDF2.generic import read_object
+
+        match = _OBJ_HEADER_RE.match(self._read(pos, 32))
+        if match is None:
+            raise ValueError(f"No xref stream at {pos}")
+        self.data.seek(pos + match.end())
+        self._skip_whitespace()
+        xref = read_object(self.data, self)
+        if xref.get("/Type") != "/XRef":
+            raise ValueError(f"No xref stream at {pos}")
+
+        widths = [int(w) for w in xref["/W"]]
+        index = [int(i) for i in xref.get("/Index", [0, int(xref["/Size"])])]
+        data = xref.get_data()
+        entries = {}
+        cursor = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for num in range(first, first + count):
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[cursor:cursor + width], "big"))
+                    cursor += width
+                if widths[0] == 0:
+                    fields[0] = 1  # type defaults to "in use"
+                entries[num] = tuple(fields)
+        self.sections.append(("stream", entries))
+        return {key: value for key, value in xref.items() if not key.startswith("__")}
+
+    def _linearized_count(self, head: bytes) -> int | None:
+        """Return /N of a linearization dictionary that still matches the file."""
+        from PyPDF2.generic import read_object
+
+        match = _FIRST_OBJ_RE.search(head)
+        if match is None:
+            return None
+        self.data.seek(match.end() - 2)
+        try:
+            params = read_object(self.data, self)
+            if "/Linearized" not in params:
+                return None
+        except Exception:
+            return None
+        # /L is the file length; an incremental update makes /N stale
+        if int(params.get("/L", -1)) != self.size:
+            return None
+        return int(params["/N"])
+
+    def _skip_whitespace(self):
+        while True:
+            char = self.data.read(1)
+            if not char or char not in b" \t\r\n\f\x00":
+                break
+        if char:
+            self.data.seek(-1, os.SEEK_CUR)
+
+    def _read(self, pos: int, size: int) -> bytes:
+        self.data.seek(pos)
+        return self.data.read(size)
+
+
+# Default location of the metadata cache (relative, like assets/output)
+DEFAULT_CACHE_PATH = os.path.join("assets", "cache", "pdf_metadata.json")
+
+# Bump when the structure of a cache entry changes
+CACHE_VERSION = 1
+
+
+class PDFLoader:
+    """Reads and caches lightweight metadata about PDF files."""
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH):
+        """
+        Initialize the loader.
+
+        Args:
+            cache_path (str): JSON file used to persist metadata between runs.
+        """
+        self.cache_path = cache_path
+        self._entries = None   # loaded lazily on first use
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def get_info(self, file_path: str) -> dict:
+        """
+        Return metadata for a PDF, parsing it only if it is new or changed.
+
+        Args:
+            file_path (str): Path to the PDF.
+
+        Returns:
+            dict: {"page_count", "encrypted", "pdf_version", "file_size", "error"}.
+                  "error" is None for readable files; unreadable files report
+                  page_count 0 and the error message.
+        """
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                return dict(entry["info"])
+
+        info = self._read_info(file_path, stat.st_size)
+
+        with self._lock:
+            self._entries[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "info": info}
+            self._dirty = True
+        return dict(info)
+
+    def page_count(self, file_path: str) -> int:
+        """Return the cached page count of a PDF (0 if unreadable)."""
+        return self.get_info(file_path)["page_count"]
+
+    def forget(self, file_path: str):
+        """Drop the cached entry for a file (e.g. after it was deleted)."""
+        with self._lock:
+            if self._load().pop(os.path.abspath(file_path), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CACHE_VERSION, "entries": self._entries}
+            self._dirty = False
+
+        folder = os.path.dirname(self.cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        # Write to a temp file and rename, so a crash never leaves a torn cache
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _load(self) -> dict:
+        """Load cache entries from disk on first access (caller holds the lock)."""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.cache_path, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = data.get("entries", {})
+            except (OSError, ValueError):
+                # Missing or corrupt cache: start fresh
+                pass
+        return self._entries
+
+    @staticmethod
+    def _read_info(file_path: str, file_size: int) -> dict:
+        """Parse a PDF and collect its metadata."""
+        info = {
+            "page_count": 0,
+            "encrypted": False,
+            "pdf_version": None,
+            "file_size": file_size,
+            "error": None,
+        }
+        probed = probe_pdf(file_path)
+        if probed is not None:
+            info.update(probed)
+            return info
+
+        # Damaged or encrypted: full parse (PdfReader repairs what it can)
+        try:
+            reader = open_reader(file_path)
+            info["encrypted"] = reader.is_encrypted
+            info["pdf_version"] = PDFLoader._pdf_version(reader)
+            if reader.is_encrypted:
+                # Many "encrypted" PDFs only have an owner password
+                reader.decrypt("")
+            info["page_count"] = len(reader.pages)
+        except Exception as e:
+            info["error"] = str(e)
+        return info
+
+    @staticmethod
+    def _pdf_version(reader) -> str | None:
+        """Return the PDF version, preferring the catalog /Version over the header."""
+        version = None
+        header = reader.pdf_header or ""
+        if header.startswith("%PDF-"):
+            version = header[5:].strip()
+        try:
+            catalog_version = reader.trailer["/Root"].get("/Version")
+            if catalog_version:
+                version = str(catalog_version).lstrip("/")
+        except Exception:
+            pass
+        return version
+
+
+# Shared loader so every screen sees the same in-memory cache
+_default_loader = None
+
+
+def get_loader() -> PDFLoader:
+    """Return the process-wide PDFLoader instance."""
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = PDFLoader()
+    return _default_loader
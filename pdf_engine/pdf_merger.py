@@ -2,56 +2,410 @@
 #  PDF Merger Module
 #  -----------------
 #  This file defines the PDFMerger class used in main.py.
-#  It merges multiple PDF files into a single PDF using PyPDF2.
+#  It merges multiple PDF files into a single PDF using the
+#  selected PDF backend (PyMuPDF or PyPDF2).
+#
+#  Long merges can be cancelled through a CancelToken, and
+#  with checkpoint=True an interrupted merge resumes after
+#  the last input that was fully written. In append mode
+#  the inputs are added to an existing output as a PDF
+#  incremental update instead of rewriting it. With optimize=
+#  the page images of the result are downsampled and
+#  recompressed afterwards (see pdf_optimizer).
 # ==========================================================
 
-from PyPDF2 import PdfReader, PdfWriter
+import gc
+import hashlib
+import json
 import os
 import time
 
+from pdf_engine.pdf_backend import PyPDF2Backend, get_backend, get_output_profile
+from pdf_engine.metrics import new_recorder
+from pdf_engine.cancellation import CancelToken
+from pdf_engine.pdf_loader import open_reader
+from pdf_engine.pdf_optimizer import get_optimize_options, optimize_outputs
+from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+from pdf_engine.utils.file_utils import OUTPUT_BUFFER_SIZE, AtomicOutput, publish_file
+from pdf_engine.utils.memory_utils import current_rss
+
 
 class PDFMerger:
     """Handles merging of multiple PDF files."""
 
-    def __init__(self, file_paths: list[str]):
+    def __init__(self, file_paths: list[str], backend: str | None = None,
+                 profile: str | None = None, collect_metrics: bool = False,
+                 cancel_token: CancelToken | None = None, optimize=None):
         """
         Initialize with a list of PDF file paths.
 
         Args:
             file_paths (list[str]): Full paths to PDFs to merge, in order.
+            backend (str, optional): "pypdf2", "pymupdf" or "auto"; defaults
+                                     to the backend chosen in Settings.
+            profile (str, optional): Output profile, "fast" (default),
+                                     "compact" or "max-compress".
+            collect_metrics (bool): Record per-stage timings and counters in
+                                    self.metrics (also on when a metrics
+                                    sink is set, see pdf_engine.metrics).
+            cancel_token (CancelToken, optional): Cancelling it stops the
+                                    merge with OperationCancelled at the
+                                    next page.
+            optimize (bool | dict, optional): Downsample and recompress the
+                                    page images of the merged file; True for
+                                    the defaults or a dict of "dpi",
+                                    "quality" and "max_workers".
         """
         self.file_paths = file_paths
+        self.cancel_token = cancel_token or CancelToken()
+        self.backend = get_backend(backend)
+        self.profile = get_output_profile(profile)
+        self.peak_rss = 0  # peak resident memory (bytes) seen during the last merge
+        self.deduplicated = 0  # objects shared instead of rewritten (streaming dedup)
+        self.collect_metrics = collect_metrics
+        self.metrics = None    # metrics dict of the last merge, when enabled
+        self.optimize = get_optimize_options(optimize)
+        self.optimization = None  # image optimization totals of the last merge
 
-    def merge(self) -> str:
+    def merge(self, progress_callback=None, streaming: bool = False,
+              memory_limit_mb: int | None = None, dedup: bool = False,
+              output_path: str | None = None, checkpoint: bool = False,
+              append: bool = False) -> str:
         """
         Merge all PDFs into one output file.
 
+        Args:
+            progress_callback (callable, optional): Called as
+                progress_callback(file_index, file_count, page_index, page_count)
+                after every copied page.
+            streaming (bool): Write pages to disk one input at a time and
+                release each reader before opening the next, so memory stays
+                bounded by the largest input instead of the sum of all inputs.
+                Streaming always runs on the PyPDF2 streaming writer, whatever
+                the backend: PyMuPDF builds the whole output document in
+                memory, so it cannot bound memory however early it closes
+                each source.
+            memory_limit_mb (int, optional): Implies streaming mode. When RSS
+                goes above this ceiling the current reader's object cache is
+                dropped; if that is not enough the merge stops with MemoryError.
+            dedup (bool): Write identical fonts, images, XObjects and other
+                resources once and point every page at the shared copy.
+                With PyPDF2 this implies streaming mode.
+            output_path (str, optional): Where to write the result; defaults
+                to assets/output/merged_<timestamp>.pdf. An existing file is
+                never overwritten: the merge is saved as "<name> (1).pdf",
+                ... instead.
+            checkpoint (bool): Write to "<output>.part" and save a checkpoint
+                after every input. If the same inputs are merged again after
+                a cancel or crash, the merge continues from the checkpoint
+                (and its output path) instead of starting over. Implies
+                streaming mode, so it also uses the PyPDF2 streaming writer
+                whatever backend is configured.
+            append (bool): Add the inputs' pages to the end of the existing
+                PDF at output_path (e.g. a daily log binder) as an incremental
+                update: the existing pages are neither read nor rewritten, so
+                the cost depends only on the inputs. A single input is
+                enough. If output_path does not exist yet it is created by a
+                normal merge. Cannot be combined with checkpoint or optimize.
+
         Returns:
-            str: Full path of the merged output PDF.
+            str: Full path of the merged output PDF (as actually written).
         """
-        if not self.file_paths or len(self.file_paths) < 2:
+        if append:
+            if output_path is None:
+                raise ValueError("Append mode needs the output_path of the PDF to extend.")
+            if checkpoint or self.optimize:
+                raise ValueError("Append mode cannot be combined with checkpoint or optimize.")
+            if self.file_paths and os.path.exists(output_path):
+                return self._append(output_path, progress_callback, dedup)
+        if not self.file_paths or len(self.file_paths) < (1 if append else 2):
             raise ValueError("At least two PDF files are required to merge.")
 
-        # --- 1️⃣ Create output directory ---
-        output_dir = os.path.join("assets", "output")
-        os.makedirs(output_dir, exist_ok=True)
+        explicit_output = output_path
+        if output_path is None:
+            # --- 1️⃣ Create output directory ---
+            output_dir = os.path.join("assets", "output")
+            os.makedirs(output_dir, exist_ok=True)
 
-        # --- 2️⃣ Create a writer instance ---
-        writer = PdfWriter()
+            # --- 2️⃣ Build filename (a clash gets " (1)", " (2)", ... when saved) ---
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            filename = f"merged_{timestamp}.pdf"
+            output_path = os.path.join(output_dir, filename)
+        elif os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # --- 3️⃣ Loop through files and append pages ---
-        for path in self.file_paths:
-            reader = PdfReader(path)
-            for page in reader.pages:
-                writer.add_page(page)
+        self.peak_rss = current_rss()
+        options = dict(self.profile, dedup=self.profile["dedup"] or dedup)
+        self.deduplicated = 0
+        # Bounded memory and checkpoints need the streaming writer on any
+        # backend; PdfWriter cannot produce compact output either, so with
+        # PyPDF2 any output option means streaming too
+        use_streaming = (checkpoint or streaming or memory_limit_mb is not None
+                         or (any(options.values()) and self.backend.supports_streaming))
+        # The streaming writer reads its inputs with PyPDF2
+        engine = PyPDF2Backend.name if use_streaming else self.backend.name
+        recorder = new_recorder("merge", self.collect_metrics, backend=engine)
+        try:
+            if use_streaming:
+                checkpoint_path = None
+                if checkpoint:
+                    checkpoint_path = self._checkpoint_path(output_path, options, explicit_output)
+                output_path = self._merge_streaming(output_path, progress_callback, memory_limit_mb,
+                                                    options, recorder, checkpoint_path)
+            else:
+                # --- 3️⃣ Append every input and write the merged file ---
+                def on_progress(*progress):
+                    self.cancel_token.raise_if_cancelled()
+                    if progress_callback:
+                        progress_callback(*progress)
+                    if progress[2] == progress[3]:  # an input has been fully copied
+                        self._sample_memory()
 
-        # --- 4️⃣ Build unique filename ---
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"merged_{timestamp}.pdf"
-        output_path = os.path.join(output_dir, filename)
+                output_path = self.backend.merge(self.file_paths, output_path, on_progress,
+                                                 options, metrics=recorder)
+                self._sample_memory()
 
-        # --- 5️⃣ Write merged file ---
-        with open(output_path, "wb") as f:
-            writer.write(f)
+            # --- 4️⃣ Shrink the page images of the merged file in place ---
+            if self.optimize:
+                self.optimization = optimize_outputs([output_path], self.optimize, options,
+                                                     self.cancel_token, recorder)
+        except BaseException as e:
+            self.metrics = recorder.finish(self.file_paths, error=e)
+            raise
 
+        self.metrics = recorder.finish(self.file_paths, [output_path])
         return output_path
+
+    # ------------------------------------------------------
+    # Append mode
+    # ------------------------------------------------------
+    def _append(self, output_path, progress_callback, dedup) -> str:
+        """Add every input to the existing `output_path` as one incremental update."""
+        self.peak_rss = current_rss()
+        self.deduplicated = 0
+        options = dict(self.profile, dedup=self.profile["dedup"] or dedup)
+        recorder = new_recorder("append", self.collect_metrics, backend=self.backend.name)
+        size_before = os.path.getsize(output_path)
+
+        def on_progress(*progress):
+            self.cancel_token.raise_if_cancelled()
+            if progress_callback:
+                progress_callback(*progress)
+            if progress[2] == progress[3]:
+                self._sample_memory()
+
+        try:
+            # A failed or cancelled append leaves the file as it was
+            self.backend.append(self.file_paths, output_path, on_progress, options,
+                                metrics=recorder)
+            self._sample_memory()
+        except BaseException as e:
+            self.metrics = recorder.finish(self.file_paths, error=e)
+            raise
+
+        # bytes_written reports the whole file; this is what the update added
+        recorder.count("update_bytes", os.path.getsize(output_path) - size_before)
+        self.metrics = recorder.finish(self.file_paths, [output_path])
+        return output_path
+
+    # ------------------------------------------------------
+    # Streaming mode
+    # ------------------------------------------------------
+    def _merge_streaming(self, output_path, progress_callback, memory_limit_mb, options,
+                         recorder, checkpoint_path=None) -> str:
+        """
+        Copy inputs to `output_path` one reader at a time.
+
+        With `checkpoint_path`, the file is built as a .part file next to
+        the checkpoint, which is saved after every input; a matching
+        checkpoint found there is resumed. Returns the path of the
+        finished PDF.
+        """
+        limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        file_count = len(self.file_paths)
+        inputs = _input_signature(self.file_paths)
+
+        state = _load_checkpoint(checkpoint_path, inputs) if checkpoint_path else None
+        if state:
+            output_path = state["output_path"]
+        start = state["completed"] if state else 0
+        recorder.count("resumed_files", start)
+
+        if checkpoint_path:
+            _prune_checkpoints(os.path.dirname(checkpoint_path), keep=checkpoint_path)
+            # Kept across runs for resuming; published only when complete
+            part_path = _part_path(checkpoint_path)
+            os.makedirs(os.path.dirname(part_path), exist_ok=True)
+            output = open(part_path, "r+b" if state else "wb", buffering=OUTPUT_BUFFER_SIZE)
+        else:
+            output = AtomicOutput(output_path)  # nothing appears unless the merge completes
+
+        with output as f:
+            if state:
+                # Drop anything written after the last checkpoint
+                f.truncate(state["writer"]["bytes_written"])
+                f.seek(0, os.SEEK_END)
+                writer = StreamingPDFWriter(f, **options, state=state["writer"])
+            else:
+                writer = StreamingPDFWriter(f, **options)
+
+            for file_index in range(start, file_count):
+                self.cancel_token.raise_if_cancelled()
+                with recorder.stage("parse"):
+                    reader = open_reader(self.file_paths[file_index])
+                    page_count = len(reader.pages)
+
+                def on_page(copied, total, file_index=file_index, reader=reader):
+                    self.cancel_token.raise_if_cancelled()
+                    if progress_callback:
+                        progress_callback(file_index, file_count, copied, total)
+                    self._enforce_limit(reader, limit)
+
+                with recorder.stage("copy"):  # pages are written as they are copied
+                    writer.add_pages(reader, on_page=on_page)
+                recorder.count("files")
+                recorder.count("pages", page_count)
+
+                # Release the source (and unmap it) before opening the next one
+                reader.stream.close()
+                del reader, on_page
+                gc.collect()
+                self._sample_memory()
+
+                if checkpoint_path:
+                    writer_state = writer.checkpoint()
+                    f.flush()
+                    os.fsync(f.fileno())
+                    _save_checkpoint(checkpoint_path, {
+                        "inputs": inputs,
+                        "output_path": output_path,
+                        "completed": file_index + 1,
+                        "writer": writer_state,
+                    })
+
+            with recorder.stage("write"):
+                writer.close()
+                if checkpoint_path:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.deduplicated = writer.deduplicated
+            recorder.count("deduplicated", writer.deduplicated)
+
+        if checkpoint_path:
+            output_path = publish_file(part_path, output_path)
+            os.remove(checkpoint_path)
+            return output_path
+        return output.path
+
+    def _checkpoint_path(self, output_path, options, explicit_output) -> str:
+        """Checkpoint file that identifies this job by its inputs, options and target."""
+        job = json.dumps({
+            "inputs": [os.path.abspath(path) for path in self.file_paths],
+            "options": options,
+            "output": os.path.abspath(explicit_output) if explicit_output else None,
+        }, sort_keys=True)
+        job_id = hashlib.sha1(job.encode()).hexdigest()[:16]
+        folder = os.path.join(os.path.dirname(output_path), ".checkpoints")
+        return os.path.join(folder, f"merge_{job_id}.json")
+
+    def _enforce_limit(self, reader, limit):
+        """Drop cached source objects when over the memory ceiling."""
+        rss = self._sample_memory()
+        if limit is None or rss <= limit:
+            return
+        # Objects already written are no longer needed in memory
+        reader.resolved_objects.clear()
+        gc.collect()
+        rss = current_rss()
+        if rss > limit:
+            raise MemoryError(
+                f"Merge needs {rss // (1024 * 1024)} MB, above the "
+                f"{limit // (1024 * 1024)} MB limit."
+            )
+
+    def _sample_memory(self) -> int:
+        """Record the current RSS in peak_rss and return it."""
+        rss = current_rss()
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+
+# ==========================================================
+#  Checkpoint files
+# ==========================================================
+# Bump when the checkpoint structure changes
+CHECKPOINT_VERSION = 2
+
+# Checkpoints (and their .part files) left this long by a cancelled job
+# that was never merged again are deleted (seconds)
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600
+
+
+def _input_signature(file_paths) -> list:
+    """[path, size, mtime_ns] per input; a checkpoint is only valid for unchanged inputs."""
+    signature = []
+    for path in file_paths:
+        stat = os.stat(path)
+        signature.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def _part_path(checkpoint_path) -> str:
+    """The partial output belonging to a checkpoint (unique per job)."""
+    return os.path.splitext(checkpoint_path)[0] + ".pdf.part"
+
+
+def _load_checkpoint(path, inputs) -> dict | None:
+    """Return a usable checkpoint for these inputs, or None (discarding a stale one)."""
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    part_path = _part_path(path)
+    try:
+        valid = (
+            state["version"] == CHECKPOINT_VERSION
+            and state["inputs"] == inputs
+            and isinstance(state["output_path"], str)
+            and isinstance(state["completed"], int)
+            and os.path.exists(part_path)
+            and os.path.getsize(part_path) >= state["writer"]["bytes_written"]
+        )
+    except (KeyError, TypeError):  # truncated or from an older version
+        valid = False
+    if not valid:
+        os.remove(path)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return None
+    return state
+
+
+def _prune_checkpoints(folder, keep):
+    """Remove files of other jobs' checkpoints not touched for CHECKPOINT_MAX_AGE."""
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    cutoff = time.time() - CHECKPOINT_MAX_AGE
+    kept = {os.path.basename(keep), os.path.basename(_part_path(keep))}
+    for name in names:
+        if not name.startswith("merge_") or name in kept:
+            continue
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)  # .json, .json.tmp or .pdf.part
+        except OSError:
+            pass
+
+
+def _save_checkpoint(path, state: dict):
+    """Write the checkpoint atomically (temp file + rename)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(state, version=CHECKPOINT_VERSION), f)
+    os.replace(tmp_path, path)
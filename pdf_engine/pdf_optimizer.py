@@ -0,0 +1,373 @@
+# ==========================================================
+#  PDF Image Optimizer Module
+#  --------------------------
+#  Shrinks scanned PDFs: every page image that is stored at
+#  a higher resolution than needed is decoded, downsampled
+#  to a target DPI and re-encoded as JPEG at a chosen
+#  quality (Pillow), then swapped back into the document.
+#  Uncompressed or Flate bitmaps are JPEG-encoded even when
+#  they need no downsampling. An image is only replaced
+#  when the new encoding is smaller.
+#
+#  Decoding and encoding run on a process pool, so a phone
+#  scan with one multi-megabyte image per page uses every
+#  core. Usable on its own (ImageOptimizer / optimize_pdf)
+#  or as the optimize= option of PDFMerger and PDFSplitter
+#  (optimize_outputs).
+# ==========================================================
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import io
+import multiprocessing
+import os
+
+from pdf_engine.pdf_backend import get_output_profile
+from pdf_engine.pdf_loader import open_reader
+from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+from pdf_engine.metrics import NULL_RECORDER
+from pdf_engine.cancellation import CancelToken
+from pdf_engine.utils.file_utils import AtomicOutput
+
+
+# Resolution images are reduced to, in pixels per inch of the page
+DEFAULT_DPI = 150
+
+# JPEG quality used when re-encoding (1-95)
+DEFAULT_QUALITY = 75
+
+# Images at most this much above the target DPI are not resampled
+DPI_TOLERANCE = 1.1
+
+# Images handed to the pool at once, per worker (bounds memory use)
+IN_FLIGHT_PER_WORKER = 2
+
+# PDF color spaces that map directly onto a Pillow mode
+_MODES = {"/DeviceGray": "L", "/DeviceRGB": "RGB"}
+_ICC_MODES = {1: "L", 3: "RGB"}
+
+
+def get_optimize_options(optimize) -> dict | None:
+    """
+    Normalize the optimize= option of merge / split.
+
+    Args:
+        optimize (bool | dict | None): True for the defaults, a dict with
+            any of "dpi", "quality", "max_workers", or None / False for off.
+    """
+    if not optimize:
+        return None
+    options = {"dpi": DEFAULT_DPI, "quality": DEFAULT_QUALITY, "max_workers": None}
+    if isinstance(optimize, dict):
+        unknown = set(optimize) - set(options)
+        if unknown:
+            raise ValueError(f"Unknown optimize option(s): {', '.join(sorted(unknown))}")
+        options.update(optimize)
+    return options
+
+
+def optimize_pdf(input_path: str, output_path: str | None = None, **options) -> dict:
+    """Optimize one PDF with a temporary ImageOptimizer (see ImageOptimizer.optimize)."""
+    with ImageOptimizer(**options) as optimizer:
+        return optimizer.optimize(input_path, output_path)
+
+
+def optimize_outputs(paths, options: dict, profile=None, cancel_token: CancelToken | None = None,
+                     metrics=NULL_RECORDER) -> dict:
+    """
+    Optimize freshly written files in place (the optimize= step of merge / split).
+
+    Args:
+        paths (list[str]): Files to rewrite.
+        options (dict): As returned by get_optimize_options.
+        profile (str | dict, optional): Output profile of the rewritten files.
+        cancel_token (CancelToken, optional): Stops at the next image; files
+            not yet rewritten keep their unoptimized content.
+        metrics: Recorder that gets an "optimize" stage and the
+            "images_optimized" / "image_bytes_saved" counters.
+
+    Returns:
+        dict: Totals over all files: {"files", "images", "optimized",
+              "bytes_before", "bytes_after", "bytes_saved"}.
+    """
+    totals = dict.fromkeys(("images", "optimized", "bytes_before", "bytes_after", "bytes_saved"), 0)
+    with metrics.stage("optimize"), ImageOptimizer(profile=profile, cancel_token=cancel_token,
+                                                   **options) as optimizer:
+        for path in paths:
+            report = optimizer.optimize(path, path)
+            for key in totals:
+                totals[key] += report[key]
+    metrics.count("images_optimized", totals["optimized"])
+    metrics.count("image_bytes_saved", totals["bytes_saved"])
+    return dict(totals, files=len(paths))
+
+
+class ImageOptimizer:
+    """Downsamples and recompresses the images of PDF files."""
+
+    def __init__(self, dpi: int = DEFAULT_DPI, quality: int = DEFAULT_QUALITY,
+                 max_workers: int | None = None, profile=None,
+                 cancel_token: CancelToken | None = None):
+        """
+        Args:
+            dpi (int): Target resolution of page images.
+            quality (int): JPEG quality of re-encoded images (1-95).
+            max_workers (int, optional): Pool size; defaults to the CPU count.
+                                         1 does all image work in this process.
+            profile (str | dict, optional): Output profile of the rewritten PDF.
+            cancel_token (CancelToken, optional): Cancelling it stops the
+                optimization with OperationCancelled at the next image.
+
+        The process pool is started on first use and shared by every
+        optimize() call; close() (or leaving a with block) shuts it down.
+        """
+        if dpi <= 0:
+            raise ValueError("Target DPI must be positive")
+        if not 1 <= quality <= 95:
+            raise ValueError("JPEG quality must be between 1 and 95")
+        self.dpi = dpi
+        self.quality = quality
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.options = get_output_profile(profile)
+        self.cancel_token = cancel_token or CancelToken()
+        self._pool = None
+        self._pool_failed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def optimize(self, input_path: str, output_path: str | None = None,
+                 progress_callback=None) -> dict:
+        """
+        Rewrite `input_path` with optimized images.
+
+        Args:
+            input_path (str): PDF to optimize.
+            output_path (str, optional): Where to write the result; defaults
+                to <name>_optimized.pdf next to the input. When it is the
+                input itself, the input is replaced atomically; otherwise an
+                existing file is never overwritten.
+            progress_callback (callable, optional): Called as
+                progress_callback(done - 1, total, 1, 1) as images finish,
+                i.e. "image index done - 1 is complete".
+
+        Returns:
+            dict: {"output_path", "images", "optimized", "bytes_before",
+                   "bytes_after", "bytes_saved"}; bytes are file sizes.
+        """
+        if output_path is None:
+            stem, ext = os.path.splitext(input_path)
+            output_path = f"{stem}_optimized{ext}"
+        in_place = os.path.abspath(output_path) == os.path.abspath(input_path)
+        bytes_before = os.path.getsize(input_path)
+
+        # --- 1️⃣ Find the page images and how large they are drawn ---
+        reader = open_reader(input_path)
+        images = _page_images(reader)
+        jobs = {key: job for key, job in
+                ((key, self._job(obj, dpi)) for key, (obj, dpi) in images.items())
+                if job is not None}
+
+        # --- 2️⃣ Recompress on the pool and swap smaller results in ---
+        optimized = 0
+        done = 0
+        for key, data in self._run(jobs):
+            obj = images[key][0]
+            if data is not None and len(data) < len(obj._data):
+                _replace_image(obj, data, jobs[key])
+                optimized += 1
+            done += 1
+            if progress_callback:
+                progress_callback(done - 1, len(jobs), 1, 1)
+
+        # --- 3️⃣ Write the document with the new images ---
+        output = None
+        if optimized or not in_place:
+            # Published only after the input is unmapped below: Windows
+            # refuses to replace a file that is still mapped
+            output = AtomicOutput(output_path, overwrite=in_place, publish=False)
+            with output as f:
+                writer = StreamingPDFWriter(f, **self.options)
+                writer.add_pages(reader)
+                writer.close()
+            del writer
+
+        # --- 4️⃣ Release the input, then publish the result ---
+        try:
+            reader.stream.close()
+        except BufferError:
+            if output is not None:
+                output.discard()
+            raise
+        del reader
+        if output is not None:
+            output_path = output.publish()
+
+        bytes_after = os.path.getsize(output_path)
+        return {
+            "output_path": output_path,
+            "images": len(images),
+            "optimized": optimized,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+        }
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _job(self, obj, dpi) -> tuple | None:
+        """Describe the work for one image, or None when it is left alone."""
+        if obj.get("/ImageMask") or "/Decode" in obj or "/Mask" in obj:
+            return None
+        if int(obj.get("/BitsPerComponent", 8)) != 8:
+            return None  # bilevel / 16-bit scans: JPEG would not help
+        mode = _pillow_mode(obj.get("/ColorSpace"))
+        if mode is None:
+            return None
+
+        filters = obj.get("/Filter")
+        filters = [] if filters is None else [filters] if isinstance(filters, str) else list(filters)
+        width, height = int(obj["/Width"]), int(obj["/Height"])
+        scale = self.dpi / dpi if dpi > self.dpi * DPI_TOLERANCE else 1.0
+        if filters == ["/DCTDecode"]:
+            if scale == 1.0:
+                return None  # already JPEG at a sensible resolution
+            kind, data = "jpeg", obj._data
+        elif filters in ([], ["/FlateDecode"]):
+            kind, data = "raw", obj.get_data()
+        else:
+            return None  # JPX, CCITT, JBIG2, ...
+
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return (kind, data, mode, (width, height), size, self.quality)
+
+    def _run(self, jobs):
+        """Yield (key, jpeg bytes or None) for every job, using the pool when it helps."""
+        pool = self._get_pool() if len(jobs) > 1 else None
+        if pool is None:
+            for key, job in jobs.items():
+                self.cancel_token.raise_if_cancelled()
+                yield key, _recompress(job)
+            return
+
+        limit = self.max_workers * IN_FLIGHT_PER_WORKER
+        pending = {}
+        queue = iter(jobs.items())
+        try:
+            while True:
+                for key, job in queue:
+                    pending[pool.submit(_recompress, job)] = key
+                    if len(pending) >= limit:
+                        break
+                if not pending:
+                    return
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self.cancel_token.raise_if_cancelled()
+                    yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _get_pool(self):
+        if self._pool is None and not self._pool_failed and self.max_workers > 1:
+            try:
+                # "spawn" avoids forking a process that holds GUI/GL state
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, ImportError, NotImplementedError):
+                self._pool_failed = True  # e.g. Android without sem_open: run serially
+        return self._pool
+
+
+def _page_images(reader) -> dict:
+    """
+    Map every image XObject used directly by a page to (object, effective DPI).
+
+    The DPI compares the image's long edge with the page's long edge, so it
+    is exact for full-page scans and errs low (less downsampling) for
+    images drawn smaller. An image used on several pages keeps its lowest DPI.
+    """
+    images = {}
+    for page in reader.pages:
+        box = page.mediabox
+        page_inches = max(float(box.width), float(box.height)) / 72
+        resources = page.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources else None
+        if not xobjects or page_inches <= 0:
+            continue
+        for ref in xobjects.get_object().values():
+            if not hasattr(ref, "idnum"):
+                continue  # inline dictionaries cannot be shared or replaced
+            obj = ref.get_object()
+            if obj.get("/Subtype") != "/Image":
+                continue
+            dpi = max(int(obj["/Width"]), int(obj["/Height"])) / page_inches
+            key = (ref.idnum, ref.generation)
+            if key not in images or dpi < images[key][1]:
+                images[key] = (obj, dpi)
+    return images
+
+
+def _pillow_mode(color_space) -> str | None:
+    """Pillow mode for a gray / RGB color space (incl. ICCBased); None otherwise."""
+    if color_space is None:
+        return None
+    color_space = color_space.get_object()
+    if isinstance(color_space, str):
+        return _MODES.get(color_space)
+    if len(color_space) == 2 and color_space[0] == "/ICCBased":
+        return _ICC_MODES.get(int(color_space[1].get_object().get("/N", 0)))
+    return None
+
+
+def _replace_image(obj, data: bytes, job: tuple):
+    """Point an image XObject at new JPEG data (keeps its color space and masks)."""
+    from PyPDF2.generic import NameObject, NumberObject
+
+    width, height = job[4]
+    obj._data = data
+    obj[NameObject("/Filter")] = NameObject("/DCTDecode")
+    obj[NameObject("/Width")] = NumberObject(width)
+    obj[NameObject("/Height")] = NumberObject(height)
+    obj[NameObject("/BitsPerComponent")] = NumberObject(8)
+    obj.pop("/DecodeParms", None)
+    if hasattr(obj, "decoded_self"):
+        obj.decoded_self = None  # drop the cached decoding of the old data
+
+
+def _recompress(job) -> bytes | None:
+    """
+    Decode, resize and JPEG-encode one image (runs in a worker process).
+
+    Returns None when the image cannot be decoded.
+    """
+    from PIL import Image
+
+    kind, data, mode, size, new_size, quality = job
+    try:
+        if kind == "jpeg":
+            image = Image.open(io.BytesIO(data))
+            image.draft(mode, new_size)  # let libjpeg decode at a reduced scale
+            image = image.convert(mode)
+        else:
+            image = Image.frombytes(mode, size, data)
+    except (OSError, ValueError):
+        return None
+
+    if image.size != new_size:
+        image = image.resize(new_size, Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
@@ -2,27 +2,98 @@
 #  PDF Splitter Module
 #  --------------------
 #  This file defines the PDFSplitter class used in main.py.
-#  It uses the PyPDF2 library to split a PDF file into
-#  two parts based on a page number entered by the user.
+#  It uses the selected PDF backend to split a PDF file into
+#  parts: two parts at a page number entered by the user,
+#  any number of page ranges ("1-3,4-10,11-end"), chunks of
+#  K pages, or one file per page ("burst"). With optimize=
+#  the page images of every part are downsampled and
+#  recompressed (see pdf_optimizer).
 # ==========================================================
 
-# Import PyPDF2 classes
-# - PdfReader is used to read pages from an existing PDF
-# - PdfWriter is used to create and save new PDF files
-from PyPDF2 import PdfReader, PdfWriter
+# The backend (PyMuPDF or PyPDF2) reads the input and writes the parts
+from pdf_engine.pdf_backend import get_backend, get_output_profile
+from pdf_engine.metrics import new_recorder
+from pdf_engine.cancellation import CancelToken
+from pdf_engine.pdf_optimizer import get_optimize_options, optimize_outputs
 
 # os is used for file path manipulation (creating folders, saving files, etc.)
 import os
 
+# Used by split_batch() to spread independent splits over CPU cores
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+
+
+def parse_page_ranges(spec: str, total_pages: int) -> list[list[int]]:
+    """
+    Parse a range spec such as "1-3,4-10,11-end" into page index lists.
+
+    Pages are 1-based in the spec and 0-based in the result. "end" means
+    the last page, and so does an open end ("3-" is page 3 to the last);
+    a single number ("7") is a one-page range.
+
+    Args:
+        spec (str): Comma-separated ranges.
+        total_pages (int): Number of pages in the document.
+
+    Returns:
+        list[list[int]]: One list of 0-based page indices per range.
+    """
+    def page_number(text):
+        text = text.strip().lower()
+        if text == "end":
+            return total_pages
+        if not text.isdigit():
+            raise ValueError(f"Invalid page number: '{text}'")
+        return int(text)
+
+    ranges = []
+    for chunk in spec.split(","):
+        if not chunk.strip():
+            continue
+        start_text, dash, end_text = chunk.partition("-")
+        start = page_number(start_text)
+        if not dash:
+            end = start
+        elif end_text.strip():
+            end = page_number(end_text)
+        else:
+            end = total_pages  # open range such as "3-"
+        if start < 1 or end > total_pages or start > end:
+            raise ValueError(f"Range '{chunk.strip()}' must be within 1–{total_pages}")
+        ranges.append(list(range(start - 1, end)))
+
+    if not ranges:
+        raise ValueError("Please enter at least one page range.")
+    return ranges
+
 
 class PDFSplitter:
-    """Handles splitting of PDF files into two parts."""
+    """Handles splitting of PDF files into parts."""
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, backend: str | None = None, profile: str | None = None,
+                 output_dir: str | None = None, collect_metrics: bool = False,
+                 cancel_token: CancelToken | None = None, optimize=None):
         # Store the original PDF file path when the class is initialized
         self.file_path = file_path
+        # Where the parts go; defaults to split_output/ next to the input
+        self.output_dir = output_dir
+        # "pypdf2", "pymupdf", "auto" or None for the backend chosen in Settings
+        self.backend = get_backend(backend)
+        # Output profile: "fast" (default), "compact" or "max-compress"
+        self.profile = get_output_profile(profile)
+        # Per-stage timings and counters of the last split (see pdf_engine.metrics)
+        self.collect_metrics = collect_metrics
+        self.metrics = None
+        self._recorder = None
+        # Cancelling the token stops the split at the next page
+        self.cancel_token = cancel_token or CancelToken()
+        # Image downsampling of the parts: True, a dict of "dpi", "quality"
+        # and "max_workers", or None; totals of the last split go in optimization
+        self.optimize = get_optimize_options(optimize)
+        self.optimization = None
 
-    def split(self, split_page: int):
+    def split(self, split_page: int, progress_callback=None):
         """
         Splits the PDF into two separate files.
 
@@ -31,52 +102,220 @@ class PDFSplitter:
                               Example: If split_page = 5, then:
                                 - part1 = pages 1–5
                                 - part2 = pages 6–end
+            progress_callback (callable, optional): Called as
+                progress_callback(part_index, part_count, page_index, page_count)
+                after every copied page.
 
         Returns:
             tuple(str, str): Paths of the two output files created.
         """
 
-        # --- 1️⃣ Load the input PDF file ---
-        reader = PdfReader(self.file_path)
-        total_pages = len(reader.pages)  # total number of pages in the file
+        def make_parts(total_pages):
+            # --- 2️⃣ Validate split page ---
+            # The page number must be within the valid range
+            if split_page < 1 or split_page >= total_pages:
+                raise ValueError(f"Split page must be between 1 and {total_pages - 1}")
+            # Part 1 (pages 1..split_page) and part 2 (the rest)
+            return [list(range(split_page)), list(range(split_page, total_pages))]
+
+        # --- 1️⃣ Load the input PDF file and plan the parts ---
+        reader, parts = self._open(make_parts)
+
+        # --- 3️⃣ Write part 1 and part 2 ---
+        return tuple(self._write_parts(reader, parts, "part", progress_callback))
+
+    def split_ranges(self, spec: str, progress_callback=None) -> list[str]:
+        """
+        Split the PDF into one file per range, e.g. "1-3,4-10,11-end".
+
+        Ranges may overlap or leave pages out; each becomes its own file
+        named <name>_part1.pdf, <name>_part2.pdf, ... (existing files are
+        kept; a taken name becomes "<name>_part1 (1).pdf" and so on).
+
+        Returns:
+            list[str]: Paths of the output files, in range order.
+        """
+        reader, parts = self._open(lambda total_pages: parse_page_ranges(spec, total_pages))
+        return self._write_parts(reader, parts, "part", progress_callback)
+
+    def split_every(self, pages_per_part: int, progress_callback=None) -> list[str]:
+        """
+        Split the PDF into chunks of `pages_per_part` pages (last one may be shorter).
+
+        Returns:
+            list[str]: Paths of the output files, in page order.
+        """
+        def make_parts(total_pages):
+            if pages_per_part < 1:
+                raise ValueError("Pages per part must be at least 1")
+            return [list(range(start, min(start + pages_per_part, total_pages)))
+                    for start in range(0, total_pages, pages_per_part)]
+
+        reader, parts = self._open(make_parts)
+        return self._write_parts(reader, parts, "part", progress_callback)
+
+    def burst(self, progress_callback=None) -> list[str]:
+        """
+        Write every page to its own file (<name>_page1.pdf, <name>_page2.pdf, ...).
+
+        Returns:
+            list[str]: Paths of the output files, in page order.
+        """
+        reader, parts = self._open(lambda total_pages: [[i] for i in range(total_pages)])
+        return self._write_parts(reader, parts, "page", progress_callback)
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _open(self, make_parts):
+        """
+        Open the input, start recording metrics for this split and plan it.
 
-        # --- 2️⃣ Validate split page ---
-        # The page number must be within the valid range
-        if split_page < 1 or split_page >= total_pages:
-            raise ValueError(f"Split page must be between 1 and {total_pages - 1}")
+        `make_parts(total_pages)` returns the page index lists to write (or
+        raises ValueError). Returns (reader, parts). A failure here, like one
+        while writing, is reported through the metrics with its error.
+        """
+        self._recorder = new_recorder("split", self.collect_metrics, backend=self.backend.name)
+        reader = None
+        try:
+            with self._recorder.stage("parse"):
+                reader = self.backend.open(self.file_path)
+            return reader, make_parts(self.backend.page_count(reader))
+        except BaseException as e:
+            if reader is not None:
+                self.backend.close(reader)
+            self.metrics = self._recorder.finish([self.file_path], error=e)
+            raise
+
+    def _write_parts(self, reader, parts, suffix, progress_callback=None) -> list[str]:
+        """
+        Write each list of page indices in `parts` to its own file.
 
-        # --- 3️⃣ Create an output folder to save results ---
-        output_dir = os.path.join(os.path.dirname(self.file_path), "split_output")
+        All parts come from the same already-parsed reader, so the source
+        is read only once no matter how many files are produced. The reader
+        is closed afterwards. Returns the paths actually written.
+        """
+        # Create an output folder to save results
+        output_dir = self.output_dir or os.path.join(os.path.dirname(self.file_path), "split_output")
         os.makedirs(output_dir, exist_ok=True)  # create folder if not exists
 
-        # --- 4️⃣ Create first output PDF (from page 1 to split_page) ---
-        part1 = PdfWriter()
-        for i in range(split_page):
-            part1.add_page(reader.pages[i])  # add each page one by one
-
-        # Build the output file name (e.g., file_part1.pdf)
-        part1_path = os.path.join(
-            output_dir,
-            f"{os.path.splitext(os.path.basename(self.file_path))[0]}_part1.pdf"
-        )
-
-        # Save part 1
-        with open(part1_path, "wb") as f:
-            part1.write(f)
-
-        # --- 5️⃣ Create second output PDF (remaining pages) ---
-        part2 = PdfWriter()
-        for i in range(split_page, total_pages):
-            part2.add_page(reader.pages[i])
-
-        part2_path = os.path.join(
-            output_dir,
-            f"{os.path.splitext(os.path.basename(self.file_path))[0]}_part2.pdf"
-        )
-
-        # Save part 2
-        with open(part2_path, "wb") as f:
-            part2.write(f)
-
-        # --- 6️⃣ Return the saved file paths ---
-        return part1_path, part2_path
+        base_name = os.path.splitext(os.path.basename(self.file_path))[0]
+        # Build the output file names (e.g., file_part1.pdf)
+        output_paths = [os.path.join(output_dir, f"{base_name}_{suffix}{i + 1}.pdf")
+                        for i in range(len(parts))]
+
+        def on_progress(*progress):
+            self.cancel_token.raise_if_cancelled()
+            if progress_callback:
+                progress_callback(*progress)
+
+        try:
+            # A cancelled or failed split leaves no parts behind (the backend removes them)
+            output_paths = self.backend.split(reader, parts, output_paths, on_progress,
+                                              self.profile, metrics=self._recorder)
+
+            # One optimizer (and process pool) serves every part
+            if self.optimize:
+                self.optimization = optimize_outputs(output_paths, self.optimize, self.profile,
+                                                     self.cancel_token, self._recorder)
+        except BaseException as e:
+            self.metrics = self._recorder.finish([self.file_path], error=e)
+            raise
+        finally:
+            self.backend.close(reader)
+        self.metrics = self._recorder.finish([self.file_path], output_paths)
+        return output_paths
+
+
+# ==========================================================
+#  Batch splitting
+# ==========================================================
+def split_batch(jobs, max_workers: int | None = None, progress_callback=None,
+                backend: str | None = None, profile: str | None = None,
+                cancel_token: CancelToken | None = None) -> list[dict]:
+    """
+    Split many PDFs in parallel on a process pool.
+
+    Each job is (file_path, spec) where spec is either a page number
+    (two-part split, like PDFSplitter.split) or a range spec string
+    (like PDFSplitter.split_ranges). PyPDF2 parsing is pure Python and
+    holds the GIL, so separate processes are what gives real speed-up.
+
+    Args:
+        jobs (list[tuple]): (file_path, spec) per file.
+        max_workers (int, optional): Pool size; defaults to the CPU count.
+        progress_callback (callable, optional): Called as
+            progress_callback(done - 1, total, 1, 1) each time a file
+            finishes, i.e. "file index done - 1 is complete", the same
+            convention as the per-page progress of merge and split.
+        backend (str, optional): Backend name used by every worker.
+        profile (str, optional): Output profile used by every worker.
+        cancel_token (CancelToken, optional): Once cancelled, files not yet
+            started are skipped and reported with error "Operation cancelled";
+            files already running in a worker still finish.
+
+    Returns:
+        list[dict]: One {"file_path", "outputs", "error"} per job, in job
+                    order. "error" is None on success, else the message.
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    def record(index, result):
+        results[index] = result
+        if progress_callback:
+            done = sum(r is not None for r in results)
+            progress_callback(done - 1, len(jobs), 1, 1)
+
+    pool = None
+    if workers > 1:
+        try:
+            # "spawn" avoids forking a process that holds GUI/GL state
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, ImportError, NotImplementedError):
+            pool = None  # e.g. Android builds without sem_open: run serially
+
+    def cancelled(index):
+        return {"file_path": jobs[index][0], "outputs": [], "error": "Operation cancelled"}
+
+    if pool is None:
+        for index, (file_path, spec) in enumerate(jobs):
+            if cancel_token and cancel_token.cancelled:
+                record(index, cancelled(index))
+            else:
+                record(index, _split_job(file_path, spec, backend, profile))
+        return results
+
+    with pool:
+        futures = {pool.submit(_split_job, file_path, spec, backend, profile): index
+                   for index, (file_path, spec) in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            if cancel_token and cancel_token.cancelled:
+                # Drop everything that has not started yet
+                for pending, pending_index in futures.items():
+                    if results[pending_index] is None and pending.cancel():
+                        record(pending_index, cancelled(pending_index))
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:  # worker crashed (e.g. BrokenProcessPool)
+                result = {"file_path": jobs[index][0], "outputs": [], "error": str(e)}
+            record(index, result)
+    return results
+
+
+def _split_job(file_path, spec, backend=None, profile=None) -> dict:
+    """Run one split inside a worker process and report its outcome."""
+    try:
+        splitter = PDFSplitter(file_path, backend, profile)
+        if isinstance(spec, int):
+            outputs = list(splitter.split(spec))
+        else:
+            outputs = splitter.split_ranges(spec)
+        return {"file_path": file_path, "outputs": outputs, "error": None}
+    except Exception as e:
+        return {"file_path": file_path, "outputs": [], "error": str(e)}
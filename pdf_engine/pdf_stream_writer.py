@@ -0,0 +1,577 @@
+# ==========================================================
+#  Streaming PDF Writer Module
+#  ---------------------------
+#  Writes a PDF object by object straight to an open file,
+#  instead of collecting every page in a PdfWriter until the
+#  end. Each source reader only has to stay alive while its
+#  pages are being copied, so memory use is bounded by the
+#  largest single input rather than the sum of all inputs.
+#
+#  With dedup enabled, resources (fonts, images, XObjects,
+#  ICC profiles, ...) are fingerprinted by content, and an
+#  object identical to one already written is replaced by a
+#  reference to that copy, even across different inputs.
+#
+#  Compact output (used by the "compact" / "max-compress"
+#  profiles) Flate-compresses uncompressed streams and packs
+#  the other objects into object streams indexed by a
+#  cross-reference stream (PDF 1.5).
+#
+#  With base= the writer appends to an existing PDF as an
+#  incremental update: only the new objects, the changed
+#  page-tree root and a new xref section (linked to the old
+#  one by /Prev) are written after the file's last byte.
+# ==========================================================
+
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject, NumberObject,
+    StreamObject
+)
+import copy
+import hashlib
+import io
+import weakref
+import zlib
+
+
+# Object numbers reserved for the page tree root and the catalog
+PAGES_ROOT_NUM = 1
+CATALOG_NUM = 2
+
+# Written header version; newer inputs raise it through the catalog /Version
+HEADER_VERSION = "1.4"
+
+# Object and cross-reference streams need PDF 1.5
+OBJECT_STREAMS_VERSION = "1.5"
+
+# Objects packed into one object stream
+OBJSTM_SIZE = 100
+
+# Page attributes inherited from page-tree nodes, with the value a page
+# appended below an existing root uses when it has none of its own
+INHERITED_DEFAULTS = {
+    "/Resources": lambda page: DictionaryObject(),
+    "/MediaBox": lambda page: ArrayObject(NumberObject(n) for n in (0, 0, 612, 792)),
+    "/CropBox": lambda page: page.get("/MediaBox") or INHERITED_DEFAULTS["/MediaBox"](page),
+    "/Rotate": lambda page: NumberObject(0),
+}
+
+
+class StreamingPDFWriter:
+    """Copies pages from PdfReaders into an output stream incrementally."""
+
+    def __init__(self, stream, dedup: bool = False, compress_streams: bool = False,
+                 recompress: bool = False, object_streams: bool = False, state: dict | None = None,
+                 base: dict | None = None):
+        """
+        Start a new PDF on `stream`, continue one from a checkpoint, or
+        append pages to an existing PDF as an incremental update.
+
+        Args:
+            stream: Binary file object opened for writing.
+            dedup (bool): Write objects with identical content only once.
+            compress_streams (bool): Flate-compress streams that have no filter.
+            recompress (bool): Also re-deflate plain FlateDecode streams at the
+                highest level, and compress new streams at that level too.
+            object_streams (bool): Pack non-stream objects into object streams
+                and write a cross-reference stream instead of an xref table.
+            state (dict, optional): Result of checkpoint() for a file whose
+                first state["bytes_written"] bytes are already on `stream`;
+                `stream` must be positioned right after them.
+            base (dict, optional): Result of pdf_loader.probe_update_base for
+                the file `stream` is positioned at the end of. The pages are
+                added after the existing ones; close() writes the update.
+        """
+        if state is not None and base is not None:
+            raise ValueError("A checkpoint cannot be combined with an incremental update")
+        self.stream = stream
+        self.dedup = dedup
+        self.compress_streams = compress_streams
+        self.recompress = recompress
+        self.object_streams = object_streams
+        self.page_refs = []          # object numbers of output pages, in order
+        self.bytes_written = 0
+        self.deduplicated = 0        # objects replaced by an already written copy
+        self._shared = {}            # content fingerprint -> object number
+        self._offsets = {}           # object number -> byte offset
+        self._packed = {}            # object number -> (object stream number, index)
+        self._objstm_batch = []      # (object number, serialized object) awaiting packing
+        self._sources = weakref.WeakKeyDictionary()  # reader -> its object mapping state
+        self._generations = {}       # object number -> generation, where not 0
+        self._next_num = CATALOG_NUM + 1
+        self._header = OBJECT_STREAMS_VERSION if object_streams else HEADER_VERSION
+        self._version = self._header
+        self._parent_num = PAGES_ROOT_NUM  # page-tree node the pages are added to
+        self._base = base
+        if state is not None:
+            self._restore(state)
+        elif base is not None:
+            self._start_update(base)
+        else:
+            self._write(f"%PDF-{self._header}\n".encode() + b"%\xe2\xe3\xcf\xd3\n")
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def add_pages(self, reader, page_indices=None, on_page=None, rotation: int = 0):
+        """
+        Copy pages (and everything they reference) from `reader`.
+
+        Objects shared between pages of the same reader are written once,
+        also across several add_pages calls with the same reader.
+        References to pages that are not being copied are replaced by null,
+        so a link annotation can never drag in the rest of the source file.
+
+        Args:
+            reader (PdfReader): Source document.
+            page_indices (iterable[int], optional): 0-based pages to copy,
+                in output order. Defaults to every page.
+            on_page (callable, optional): on_page(copied, total) after each page.
+            rotation (int): Degrees (a multiple of 90) added to the /Rotate
+                of every copied page.
+        """
+        pages = reader.pages
+        indices = list(range(len(pages))) if page_indices is None else list(page_indices)
+        self._note_version(reader)
+
+        if reader not in self._sources:
+            self._sources[reader] = (
+                {self._key(page.indirect_reference) for page in pages},
+                {},  # (idnum, generation) in reader -> object number in output
+                {} if self.dedup else None,
+            )
+        all_page_keys, mapping, fingerprints = self._sources[reader]
+        remap = lambda obj, pending, excluded=(): self._remap(
+            obj, mapping, all_page_keys, pending, excluded, reader, fingerprints)
+
+        for copied, index in enumerate(indices, start=1):
+            page = pages[index]
+            key = self._key(page.indirect_reference)
+            if key in mapping:
+                # Same page used twice: it needs its own page object
+                page_num = self._allocate()
+            else:
+                page_num = mapping[key] = self._allocate()
+
+            pending = []
+            page_copy = remap(page, pending, excluded=("/Parent", "/StructParents"))
+            page_copy[NameObject("/Parent")] = IndirectObject(self._parent_num, 0, None)
+            if self._base is not None:
+                # Do not pick up attributes the existing root node passes down
+                for attr, default in INHERITED_DEFAULTS.items():
+                    if attr in self._base["pages"] and attr not in page_copy:
+                        page_copy[NameObject(attr)] = default(page_copy)
+            if rotation % 360:
+                # reader.pages already carries an inherited /Rotate on the page
+                page_copy[NameObject("/Rotate")] = NumberObject(
+                    (int(page_copy.get("/Rotate", 0)) + rotation) % 360)
+            self._write_object(page_num, page_copy)
+            self.page_refs.append(page_num)
+
+            # Write every object reachable from this page that is new
+            while pending:
+                src_key = pending.pop()
+                obj = reader.get_object(IndirectObject(src_key[0], src_key[1], reader))
+                self._write_object(mapping[src_key], remap(obj, pending))
+
+            if on_page:
+                on_page(copied, len(indices))
+
+    def checkpoint(self) -> dict:
+        """
+        Return a JSON-serializable snapshot of the writer after the last page.
+
+        Everything up to state["bytes_written"] is final; a new writer built
+        with state=... can append the remaining pages after a restart.
+        """
+        self._flush_objstm()  # queued objects would be lost otherwise
+        return {
+            "header": self._header,
+            "version": self._version,
+            "bytes_written": self.bytes_written,
+            "next_num": self._next_num,
+            "page_refs": list(self.page_refs),
+            "offsets": {str(num): offset for num, offset in self._offsets.items()},
+            "packed": {str(num): list(place) for num, place in self._packed.items()},
+            "shared": {digest.hex(): num for digest, num in self._shared.items()},
+            "deduplicated": self.deduplicated,
+        }
+
+    def close(self):
+        """Write the page tree, catalog, xref table and trailer."""
+        if self._base is not None:
+            self._close_update()
+            return
+
+        kids = " ".join(f"{num} 0 R" for num in self.page_refs)
+        self._write_raw_object(
+            PAGES_ROOT_NUM,
+            f"<< /Type /Pages /Kids [ {kids} ] /Count {len(self.page_refs)} >>".encode(),
+        )
+        catalog = f"<< /Type /Catalog /Pages {PAGES_ROOT_NUM} 0 R"
+        if self._version != self._header:
+            catalog += f" /Version /{self._version}"
+        self._write_raw_object(CATALOG_NUM, (catalog + " >>").encode())
+
+        if self.object_streams:
+            self._flush_objstm()
+            self._write_xref_stream()
+            return
+
+        xref_offset = self.bytes_written
+        size = self._next_num
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for num in range(1, size):
+            offset = self._offsets.get(num)
+            lines.append(f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 00000 f \n")
+        lines.append(f"trailer\n<< /Size {size} /Root {CATALOG_NUM} 0 R >>\n")
+        lines.append(f"startxref\n{xref_offset}\n%%EOF\n")
+        self._write("".join(lines).encode())
+
+    # ------------------------------------------------------
+    # Incremental update
+    # ------------------------------------------------------
+    def _start_update(self, base: dict):
+        """Continue numbering and byte offsets after the existing file."""
+        self.bytes_written = base["file_size"]
+        self._next_num = base["size"]
+        self._header = self._version = base["pdf_version"]
+        # The old xref style is kept: compressed entries need a stream
+        self.object_streams = self.object_streams or base["xref_stream"]
+        if self.object_streams and _version_tuple(self._version) < _version_tuple(OBJECT_STREAMS_VERSION):
+            self._version = OBJECT_STREAMS_VERSION  # raised through the catalog on close
+        # The new pages hang below one new node under the existing root,
+        # so the root's /Kids grows by one entry per update
+        self._parent_num = self._allocate()
+        self._write(b"\n")  # the file may end right after %%EOF
+
+    def _close_update(self):
+        """Write the new page-tree nodes, the catalog if needed, and the xref section."""
+        base = self._base
+        root = base["pages_ref"]
+        kids = " ".join(f"{num} 0 R" for num in self.page_refs)
+        self._write_raw_object(
+            self._parent_num,
+            f"<< /Type /Pages /Parent {root.idnum} {root.generation} R "
+            f"/Kids [ {kids} ] /Count {len(self.page_refs)} >>".encode(),
+        )
+
+        pages = copy.copy(base["pages"])
+        pages[NameObject("/Kids")] = ArrayObject(
+            list(base["pages"]["/Kids"]) + [IndirectObject(self._parent_num, 0, None)])
+        pages[NameObject("/Count")] = NumberObject(int(base["pages"]["/Count"]) + len(self.page_refs))
+        self._write_raw_object(root.idnum, _serialize(pages), root.generation)
+
+        if self._version != base["pdf_version"]:
+            catalog = copy.copy(base["catalog"])
+            catalog[NameObject("/Version")] = NameObject(f"/{self._version}")
+            self._write_raw_object(base["root"].idnum, _serialize(catalog), base["root"].generation)
+
+        trailer = f"/Root {base['root'].idnum} {base['root'].generation} R /Prev {base['startxref']}"
+        for key in ("info", "id"):
+            if base[key] is not None:
+                trailer += f" /{key.capitalize()} " + _serialize(base[key]).decode("latin-1")
+
+        if self.object_streams:
+            self._flush_objstm()
+            self._write_xref_stream(trailer)
+            return
+
+        xref_offset = self.bytes_written
+        # Object 0 (head of the free list) is listed again, as PyPDF2
+        # warns about tables whose first subsection does not start at 0
+        lines = ["xref\n"]
+        for start, run in _subsections([0] + sorted(self._offsets)):
+            lines.append(f"{start} {len(run)}\n")
+            lines.extend(f"{self._offsets[num]:010d} {self._generations.get(num, 0):05d} n \n"
+                         if num else "0000000000 65535 f \n" for num in run)
+        lines.append(f"trailer\n<< /Size {self._next_num} {trailer} >>\n")
+        lines.append(f"startxref\n{xref_offset}\n%%EOF\n")
+        self._write("".join(lines).encode())
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _restore(self, state: dict):
+        """Load a checkpoint() snapshot (the bytes are already on the stream)."""
+        self._header = state["header"]
+        self._version = state["version"]
+        self.bytes_written = state["bytes_written"]
+        self._next_num = state["next_num"]
+        self.page_refs = list(state["page_refs"])
+        self._offsets = {int(num): offset for num, offset in state["offsets"].items()}
+        self._packed = {int(num): tuple(place) for num, place in state["packed"].items()}
+        self._shared = {bytes.fromhex(digest): num for digest, num in state["shared"].items()}
+        self.deduplicated = state["deduplicated"]
+
+    def _allocate(self) -> int:
+        num = self._next_num
+        self._next_num += 1
+        return num
+
+    @staticmethod
+    def _key(ref) -> tuple:
+        return ref.idnum, ref.generation
+
+    def _remap(self, obj, mapping, all_page_keys, pending, excluded=(),
+               reader=None, fingerprints=None):
+        """
+        Return a copy of `obj` whose indirect references use output numbers.
+
+        When `fingerprints` is given (dedup mode), a referenced object whose
+        content matches one already written is pointed at that copy instead.
+        """
+        if isinstance(obj, IndirectObject):
+            key = self._key(obj)
+            if key not in mapping:
+                if key in all_page_keys:
+                    return NullObject()
+                digest = None
+                if fingerprints is not None:
+                    digest = self._fingerprint(reader, key, all_page_keys, fingerprints)
+                if digest is not None and digest in self._shared:
+                    mapping[key] = self._shared[digest]
+                    self.deduplicated += 1
+                else:
+                    mapping[key] = self._allocate()
+                    pending.append(key)
+                    if digest is not None:
+                        self._shared[digest] = mapping[key]
+            return IndirectObject(mapping[key], 0, None)
+
+        if isinstance(obj, DictionaryObject):
+            new = copy.copy(obj)  # keeps the class and stream data
+            new.clear()
+            for k, v in obj.items():
+                if k in excluded or (k == "/Length" and isinstance(obj, StreamObject)):
+                    continue
+                new[k] = self._remap(v, mapping, all_page_keys, pending,
+                                     reader=reader, fingerprints=fingerprints)
+            return new
+
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(
+                self._remap(v, mapping, all_page_keys, pending,
+                            reader=reader, fingerprints=fingerprints)
+                for v in obj
+            )
+
+        return obj
+
+    def _fingerprint(self, reader, key, all_page_keys, fingerprints, visiting=None):
+        """
+        Return a content hash of the object `key` and everything it references.
+
+        Returns None for objects that must not be shared: anything that
+        reaches a page (annotations, form fields) or is part of a cycle.
+        Results are memoized per reader in `fingerprints`.
+        """
+        if key in fingerprints:
+            return fingerprints[key]
+        visiting = set() if visiting is None else visiting
+        if key in all_page_keys or key in visiting:
+            return None
+
+        visiting.add(key)
+        digest = hashlib.sha256()
+        try:
+            obj = reader.get_object(IndirectObject(key[0], key[1], reader))
+            ok = self._hash_into(digest, obj, reader, all_page_keys, fingerprints, visiting)
+        except RecursionError:
+            ok = False
+        visiting.discard(key)
+
+        fingerprints[key] = digest.digest() if ok else None
+        return fingerprints[key]
+
+    def _hash_into(self, digest, obj, reader, all_page_keys, fingerprints, visiting) -> bool:
+        """Feed `obj` into `digest`; False if it contains something unshareable."""
+        if isinstance(obj, IndirectObject):
+            child = self._fingerprint(reader, self._key(obj), all_page_keys, fingerprints, visiting)
+            if child is None:
+                return False
+            digest.update(b"R" + child)
+            return True
+
+        if isinstance(obj, DictionaryObject):
+            digest.update(b"S" if isinstance(obj, StreamObject) else b"D")
+            for k, v in sorted(obj.items()):  # raw values, references unresolved
+                if k == "/Length" and isinstance(obj, StreamObject):
+                    continue  # written fresh from the data
+                digest.update(k.encode() + b"\0")
+                if not self._hash_into(digest, v, reader, all_page_keys, fingerprints, visiting):
+                    return False
+            if isinstance(obj, StreamObject):
+                digest.update(b"#" + obj._data)
+            return True
+
+        if isinstance(obj, ArrayObject):
+            digest.update(b"A%d" % len(obj))
+            for v in obj:
+                if not self._hash_into(digest, v, reader, all_page_keys, fingerprints, visiting):
+                    return False
+            return True
+
+        # Names, numbers, strings, booleans, null
+        buffer = io.BytesIO()
+        obj.write_to_stream(buffer, None)
+        digest.update(type(obj).__name__.encode() + b":" + buffer.getvalue() + b"\0")
+        return True
+
+    def _note_version(self, reader):
+        """Track the highest PDF version among the inputs."""
+        header = reader.pdf_header or ""
+        if header.startswith("%PDF-"):
+            version = header[5:].strip()
+            if _version_tuple(version) > _version_tuple(self._version):
+                self._version = version
+
+    def _write_object(self, num, obj):
+        if isinstance(obj, StreamObject):
+            self._compress(obj)
+        elif self.object_streams:
+            buffer = io.BytesIO()
+            obj.write_to_stream(buffer, None)
+            self._pack(num, buffer.getvalue())
+            return
+        self._offsets[num] = self.bytes_written
+        self._write(f"{num} 0 obj\n".encode())
+        obj.write_to_stream(_CountingStream(self), None)
+        self._write(b"\nendobj\n")
+
+    def _write_raw_object(self, num, body: bytes, generation: int = 0):
+        if self.object_streams and not generation:  # object streams hold generation 0 only
+            self._pack(num, body)
+            return
+        self._offsets[num] = self.bytes_written
+        if generation:
+            self._generations[num] = generation
+        self._write(f"{num} {generation} obj\n".encode() + body + b"\nendobj\n")
+
+    # ------------------------------------------------------
+    # Compact output
+    # ------------------------------------------------------
+    def _compress(self, obj):
+        """Flate-compress (or re-deflate) a stream copy in place when that makes it smaller."""
+        level = 9 if self.recompress else 6
+        filters = obj.get("/Filter")
+        if filters is None:
+            if not self.compress_streams:
+                return
+            packed = zlib.compress(obj._data, level)
+            if len(packed) < len(obj._data):
+                obj._data = packed
+                obj[NameObject("/Filter")] = NameObject("/FlateDecode")
+        elif self.recompress and filters == "/FlateDecode" and "/DecodeParms" not in obj:
+            try:
+                packed = zlib.compress(zlib.decompress(obj._data), level)
+            except zlib.error:
+                return  # damaged stream: copy it as is
+            if len(packed) < len(obj._data):
+                obj._data = packed
+
+    def _pack(self, num, body: bytes):
+        """Queue a serialized non-stream object for the next object stream."""
+        self._objstm_batch.append((num, body))
+        if len(self._objstm_batch) >= OBJSTM_SIZE:
+            self._flush_objstm()
+
+    def _flush_objstm(self):
+        """Write the queued objects as one compressed /ObjStm."""
+        if not self._objstm_batch:
+            return
+        stm_num = self._allocate()
+        header, offset = [], 0
+        for index, (num, body) in enumerate(self._objstm_batch):
+            header.append(f"{num} {offset}")
+            offset += len(body) + 1
+            self._packed[num] = (stm_num, index)
+        header = (" ".join(header) + "\n").encode()
+        data = zlib.compress(header + b"\n".join(body for _, body in self._objstm_batch) + b"\n")
+
+        self._offsets[stm_num] = self.bytes_written
+        self._write(
+            f"{stm_num} 0 obj\n<< /Type /ObjStm /N {len(self._objstm_batch)} /First {len(header)} "
+            f"/Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode()
+            + data + b"\nendstream\nendobj\n"
+        )
+        self._objstm_batch = []
+
+    def _write_xref_stream(self, trailer: str | None = None):
+        """
+        Write the cross-reference stream that also serves as the trailer.
+
+        `trailer` holds the /Root, /Prev, ... entries of an incremental
+        update, whose stream only lists the objects written by this writer.
+        """
+        xref_num = self._allocate()
+        xref_offset = self.bytes_written
+        self._offsets[xref_num] = xref_offset
+        size = self._next_num
+
+        if trailer is None:
+            trailer = f"/Root {CATALOG_NUM} 0 R"
+            runs = [(0, range(size))]
+        else:
+            runs = _subsections(sorted(self._offsets.keys() | self._packed.keys() | {0}))
+
+        width = max(1, (max(xref_offset, size).bit_length() + 7) // 8)
+        rows = []
+        for _, run in runs:
+            for num in run:
+                if num == 0:
+                    kind, field2, field3 = 0, 0, 0xFFFF  # head of the free list
+                elif num in self._offsets:
+                    kind, field2, field3 = 1, self._offsets[num], self._generations.get(num, 0)
+                elif num in self._packed:
+                    kind, (field2, field3) = 2, self._packed[num]
+                else:
+                    kind, field2, field3 = 0, 0, 0
+                rows.append(bytes([kind]) + field2.to_bytes(width, "big") + field3.to_bytes(2, "big"))
+        data = zlib.compress(b"".join(rows))
+        index = " ".join(f"{start} {len(run)}" for start, run in runs)
+
+        self._write(
+            f"{xref_num} 0 obj\n<< /Type /XRef /Size {size} /Index [ {index} ] /W [ 1 {width} 2 ] "
+            f"{trailer} /Filter /FlateDecode /Length {len(data)} >>\n"
+            f"stream\n".encode()
+            + data + f"\nendstream\nendobj\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+
+
+class _CountingStream:
+    """Forwards writes to the owning writer so byte offsets stay accurate."""
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def write(self, data):
+        self._writer._write(data)
+
+
+def _serialize(obj) -> bytes:
+    buffer = io.BytesIO()
+    obj.write_to_stream(buffer, None)
+    return buffer.getvalue()
+
+
+def _subsections(nums: list) -> list:
+    """Group sorted object numbers into (first, numbers) runs of consecutive numbers."""
+    runs = []
+    for num in nums:
+        if runs and num == runs[-1][1][-1] + 1:
+            runs[-1][1].append(num)
+        else:
+            runs.append((num, [num]))
+    return runs
+
+
+def _version_tuple(version: str) -> tuple:
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except ValueError:
+        return (0,)
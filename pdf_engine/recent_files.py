@@ -0,0 +1,149 @@
+# ==========================================================
+#  Recent Files Store
+#  ------------------
+#  Keeps the recently opened PDFs in memory, indexed by path,
+#  with per-file metadata (page count, size, last opened).
+#  Changes only mark the store dirty; flush() writes them to
+#  recent.json atomically, so callers can batch several
+#  updates into a single write.
+# ==========================================================
+
+import json
+import os
+import threading
+import time
+
+from pdf_engine.pdf_loader import get_loader
+
+
+# Bump when the structure of recent.json changes
+STORE_VERSION = 1
+
+
+class RecentFilesStore:
+    """In-memory list of recently opened PDFs backed by a JSON file."""
+
+    def __init__(self, path: str, max_entries: int = 50):
+        """
+        Load the store from disk.
+
+        Args:
+            path (str): Location of recent.json.
+            max_entries (int): Oldest entries beyond this count are dropped.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}     # abspath -> entry, oldest first
+        self._dirty = False
+        self._view = None      # cached newest-first tuple, rebuilt on change
+        self.revision = 0      # increases on every change, lets views skip redraws
+        self._load()
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def record(self, file_path: str) -> dict:
+        """
+        Mark a file as just opened and refresh its metadata.
+
+        Args:
+            file_path (str): Path of the opened PDF.
+
+        Returns:
+            dict: The stored entry {"path", "name", "page_count", "file_size", "last_opened"}.
+        """
+        key = os.path.abspath(file_path)
+        try:
+            info = get_loader().get_info(key)
+            page_count, file_size = info["page_count"], info["file_size"]
+        except OSError:
+            page_count, file_size = 0, 0
+
+        entry = {
+            "path": key,
+            "name": os.path.basename(key),
+            "page_count": page_count,
+            "file_size": file_size,
+            "last_opened": time.time(),
+        }
+        with self._lock:
+            # Re-insert so the dict order stays oldest -> newest
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._changed()
+        return entry
+
+    def remove(self, file_path: str):
+        """Drop a file from the store (no-op if absent)."""
+        with self._lock:
+            if self._entries.pop(os.path.abspath(file_path), None) is not None:
+                self._changed()
+
+    def __contains__(self, file_path: str) -> bool:
+        return os.path.abspath(file_path) in self._entries
+
+    def view(self, limit: int | None = None) -> tuple:
+        """
+        Return the entries newest first, without touching the disk.
+
+        The tuple is cached until the next change, so repeated calls
+        (e.g. every Home visit) are free.
+        """
+        with self._lock:
+            if self._view is None:
+                self._view = tuple(reversed(list(self._entries.values())))
+            view = self._view
+        return view if limit is None else view[:limit]
+
+    def flush(self):
+        """Write pending changes to disk atomically (no-op if nothing changed)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": STORE_VERSION, "files": list(self._entries.values())}
+            self._dirty = False
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _changed(self):
+        """Invalidate the cached view and mark the store dirty (caller holds the lock)."""
+        self._dirty = True
+        self._view = None
+        self.revision += 1
+
+    def _load(self):
+        """Read recent.json, accepting the old plain list-of-paths format."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, list):
+            # Legacy format: paths only, oldest first
+            for path in data:
+                key = os.path.abspath(path)
+                self._entries[key] = {
+                    "path": key,
+                    "name": os.path.basename(key),
+                    "page_count": 0,
+                    "file_size": 0,
+                    "last_opened": 0,
+                }
+            self._dirty = bool(data)  # rewrite in the new format on next flush
+        elif isinstance(data, dict) and data.get("version") == STORE_VERSION:
+            for entry in data.get("files", []):
+                self._entries[entry["path"]] = entry
@@ -0,0 +1,217 @@
+# ==========================================================
+#  Thumbnail Cache Module
+#  ----------------------
+#  Renders page thumbnails (PNG) with PyMuPDF and keeps them
+#  in a size-bounded, disk-backed LRU cache. Entries are keyed
+#  by the file's content hash and page number, so renamed or
+#  copied PDFs reuse the same thumbnail and edited PDFs get a
+#  new one. The (path, size, mtime) -> hash memo is saved in
+#  the cache folder, so after a restart known files are found
+#  without reading them again.
+# ==========================================================
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024   # 50 MB of thumbnails
+DEFAULT_WIDTH = 96                     # thumbnail width in pixels
+
+# File in cache_dir holding the content-hash memo
+HASH_INDEX_NAME = "hashes.json"
+
+# Bump when the structure of the hash index changes
+HASH_INDEX_VERSION = 1
+
+
+class ThumbnailCache:
+    """Disk-backed LRU cache of rendered PDF page thumbnails."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 width: int = DEFAULT_WIDTH):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Folder holding the PNG files.
+            max_bytes (int): Total size above which least recently used
+                             thumbnails are deleted.
+            width (int): Width of rendered thumbnails in pixels.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.width = width
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # file name -> size, oldest first
+        self._total_bytes = 0
+        self._hashes = {}               # (path, size, mtime) -> content hash
+        self._hashes_dirty = False
+        self._scan()
+        self._load_hashes()
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def lookup(self, file_path: str, page: int = 0) -> str | None:
+        """Return the cached thumbnail path, or None if it was never rendered."""
+        name = self._entry_name(file_path, page)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        path = os.path.join(self.cache_dir, name)
+        try:
+            os.utime(path)  # remember recency across restarts
+        except OSError:
+            with self._lock:
+                self._forget(name)
+            return None
+        return path
+
+    def peek(self, file_path: str, page: int = 0) -> str | None:
+        """
+        Like lookup(), but never reads the PDF to hash it.
+
+        Cheap enough for the UI thread: returns None unless the file's
+        content hash is already known from an earlier call.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if (os.path.abspath(file_path), stat.st_size, stat.st_mtime) not in self._hashes:
+            return None
+        return self.lookup(file_path, page)
+
+    def get_or_render(self, file_path: str, page: int = 0) -> str | None:
+        """
+        Return a thumbnail for `page` of `file_path`, rendering it if needed.
+
+        Meant to run on a worker thread. Returns None when the page cannot
+        be rendered (PyMuPDF missing, damaged file, page out of range).
+        """
+        cached = self.lookup(file_path, page)
+        if cached:
+            self.save()  # the file may just have been hashed
+            return cached
+
+        name = self._entry_name(file_path, page)
+        path = os.path.join(self.cache_dir, name)
+        if not self._render(file_path, page, path):
+            return None
+
+        with self._lock:
+            self._forget(name)
+            size = os.path.getsize(path)
+            self._entries[name] = size
+            self._total_bytes += size
+            self._evict()
+        self.save()
+        return path
+
+    def save(self):
+        """Write the content-hash memo to disk if it changed since the last save."""
+        with self._lock:
+            if not self._hashes_dirty:
+                return
+            # Only hashes that still have a thumbnail are worth remembering
+            digests = {name.split("_", 1)[0] for name in self._entries}
+            entries = [[path, size, mtime, digest]
+                       for (path, size, mtime), digest in self._hashes.items()
+                       if digest in digests]
+            self._hashes_dirty = False
+
+        index_path = os.path.join(self.cache_dir, HASH_INDEX_NAME)
+        tmp_path = f"{index_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": HASH_INDEX_VERSION, "entries": entries}, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Could not save thumbnail index: {e}")
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _scan(self):
+        """Rebuild the LRU order from the files already on disk (by mtime)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".png"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _load_hashes(self):
+        """Load the content-hash memo saved by an earlier run (missing / corrupt: start empty)."""
+        try:
+            with open(os.path.join(self.cache_dir, HASH_INDEX_NAME), "r") as f:
+                data = json.load(f)
+            if data.get("version") == HASH_INDEX_VERSION:
+                for path, size, mtime, digest in data.get("entries", []):
+                    self._hashes[(path, size, mtime)] = digest
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def _evict(self):
+        """Delete least recently used thumbnails until under max_bytes (caller holds the lock)."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, _ = next(iter(self._entries.items()))
+            self._forget(name)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def _forget(self, name):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _entry_name(self, file_path: str, page: int) -> str:
+        return f"{self._content_hash(file_path)}_p{page}_w{self.width}.png"
+
+    def _content_hash(self, file_path: str) -> str:
+        """SHA-1 of the file content, memoized per (path, size, mtime)."""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+        digest = self._hashes.get(key)
+        if digest is None:
+            sha = hashlib.sha1()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            with self._lock:
+                digest = self._hashes[key] = sha.hexdigest()
+                self._hashes_dirty = True
+        return digest
+
+    def _render(self, file_path: str, page: int, out_path: str) -> bool:
+        """Render one page to PNG with PyMuPDF; False if that is not possible."""
+        try:
+            import fitz
+        except ImportError:
+            return False
+
+        try:
+            with fitz.open(file_path) as doc:
+                if page >= doc.page_count:
+                    return False
+                pdf_page = doc[page]
+                zoom = self.width / max(pdf_page.rect.width, 1)
+                pixmap = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                # Write under a temp name so readers never see half a PNG
+                tmp_path = f"{out_path}.{threading.get_ident()}.tmp"
+                pixmap.save(tmp_path, output="png")
+                os.replace(tmp_path, out_path)
+            return True
+        except Exception as e:
+            print(f"Could not render thumbnail for {file_path}: {e}")
+            return False
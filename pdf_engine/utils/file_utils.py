@@ -0,0 +1,302 @@
+# ==========================================================
+#  File Utilities
+#  --------------
+#  FolderIndex: scans a folder of PDFs once, then detects
+#  added / removed / modified files incrementally by
+#  comparing sizes and mtimes, and notifies subscribers
+#  with the diff instead of making them re-list everything.
+#
+#  AtomicOutput: every generated PDF is written through a
+#  large buffer to a temp file in the target folder, fsynced
+#  and only then moved into place under a name that no
+#  other file has, so concurrent jobs never overwrite each
+#  other and a crash never leaves a truncated PDF behind.
+# ==========================================================
+
+import itertools
+import os
+import threading
+import uuid
+
+
+class FolderIndex:
+    """Incremental index of the PDF files in one folder."""
+
+    def __init__(self, folder: str, extension: str = ".pdf"):
+        """
+        Create the folder if needed and take the initial snapshot.
+
+        Args:
+            folder (str): Folder to watch.
+            extension (str): Only files ending with this are indexed.
+        """
+        self.folder = folder
+        self.extension = extension
+        self._lock = threading.Lock()
+        self._subscribers = []
+        os.makedirs(folder, exist_ok=True)
+        self._snapshot = self._scan()
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def files(self) -> list[str]:
+        """Return the paths of the indexed files, sorted by name."""
+        with self._lock:
+            return [os.path.join(self.folder, name) for name in sorted(self._snapshot)]
+
+    def subscribe(self, callback):
+        """
+        Register callback(events) for changes found by poll().
+
+        `events` is a list of (kind, path) tuples with kind one of
+        "added", "removed" or "modified".
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def poll(self) -> list[tuple]:
+        """
+        Rescan the folder, notify subscribers of any changes and return them.
+
+        Only directory entries are stat'ed; no file is opened.
+        """
+        current = self._scan()
+        with self._lock:
+            previous, self._snapshot = self._snapshot, current
+
+        events = []
+        for name in sorted(current.keys() - previous.keys()):
+            events.append(("added", os.path.join(self.folder, name)))
+        for name in sorted(previous.keys() - current.keys()):
+            events.append(("removed", os.path.join(self.folder, name)))
+        for name in sorted(current.keys() & previous.keys()):
+            if current[name] != previous[name]:
+                events.append(("modified", os.path.join(self.folder, name)))
+
+        if events:
+            for callback in list(self._subscribers):
+                callback(events)
+        return events
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _scan(self) -> dict:
+        """Return {file name: (size, mtime_ns)} for matching files."""
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(self.extension):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # removed while scanning
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            os.makedirs(self.folder, exist_ok=True)
+        return snapshot
+
+
+# One index per folder, shared by every screen
+_indexes = {}
+
+
+def get_folder_index(folder: str) -> FolderIndex:
+    """Return the process-wide FolderIndex for `folder`."""
+    key = os.path.abspath(folder)
+    if key not in _indexes:
+        _indexes[key] = FolderIndex(folder)
+    return _indexes[key]
+
+
+# ==========================================================
+#  Output files
+# ==========================================================
+# Write buffer for generated PDFs (few large writes instead of many small ones)
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Windows needs O_BINARY for os.open; elsewhere it does not exist
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+class AtomicOutput:
+    """
+    Binary output file that only appears at its final path once complete.
+
+    Example:
+        output = AtomicOutput("out/merged.pdf")
+        with output as f:
+            writer.write(f)
+        output.path  # "out/merged.pdf", or "out/merged (1).pdf" if that was taken
+
+    On a clean exit the data is flushed, fsynced and published (see
+    publish_file); on an exception the temp file is deleted and nothing
+    is published.
+    """
+
+    def __init__(self, path: str, overwrite: bool = False,
+                 buffer_size: int = OUTPUT_BUFFER_SIZE, publish: bool = True):
+        """
+        Args:
+            path (str): Wanted output path.
+            overwrite (bool): Atomically replace an existing file at `path`
+                              instead of picking a free name next to it.
+            buffer_size (int): Size of the write buffer in bytes.
+            publish (bool): Publish on a clean exit. When False the finished
+                            temp file is kept until publish() or discard().
+        """
+        self.target = path
+        self.overwrite = overwrite
+        self.buffer_size = buffer_size
+        self.auto_publish = publish
+        self.path = None       # final path, set once published
+        self.temp_path = None
+        self._file = None
+
+    def __enter__(self):
+        # Same folder as the target, so the final rename never crosses filesystems
+        folder = os.path.dirname(os.path.abspath(self.target))
+        os.makedirs(folder, exist_ok=True)
+        while True:
+            self.temp_path = os.path.join(
+                folder, f".{os.path.basename(self.target)}.{uuid.uuid4().hex[:12]}.tmp")
+            try:
+                # 0o666 filtered by the umask, like a plain open(path, "wb")
+                fd = os.open(self.temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | _O_BINARY, 0o666)
+                break
+            except FileExistsError:
+                continue
+        self._file = os.fdopen(fd, "wb", buffering=self.buffer_size)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+        except BaseException:
+            os.remove(self.temp_path)
+            raise
+        if exc_type is not None:
+            os.remove(self.temp_path)
+            return False
+        if self.auto_publish:
+            self.publish()
+        return False
+
+    def publish(self) -> str:
+        """Move the finished temp file into place; it is deleted if that fails."""
+        try:
+            self.path = publish_file(self.temp_path, self.target, self.overwrite)
+        except BaseException:
+            self.discard()
+            raise
+        return self.path
+
+    def discard(self):
+        """Delete the temp file of an output that will not be published."""
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class AppendOutput:
+    """
+    Existing binary file opened for appending, all or nothing.
+
+    Example:
+        with AppendOutput("out/binder.pdf") as f:
+            f.write(update)
+
+    The file is positioned at its end (original length in .size). On a
+    clean exit the new data is flushed and fsynced; on an exception the
+    file is truncated back to its original length, so a failed or
+    cancelled append leaves it exactly as it was.
+    """
+
+    def __init__(self, path: str, buffer_size: int = OUTPUT_BUFFER_SIZE):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.size = None       # length before the append
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "r+b", buffering=self.buffer_size)
+        self.size = self._file.seek(0, os.SEEK_END)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        f = self._file
+        try:
+            try:
+                f.flush()
+            except OSError:
+                if exc_type is None:
+                    raise
+            if exc_type is not None:
+                os.ftruncate(f.fileno(), self.size)
+            os.fsync(f.fileno())
+        except BaseException:
+            os.ftruncate(f.fileno(), self.size)
+            raise
+        finally:
+            f.close()
+        return False
+
+
+def publish_file(temp_path: str, path: str, overwrite: bool = False) -> str:
+    """
+    Move a finished file into place and return its final path.
+
+    Without `overwrite` an existing file is never replaced: the first free
+    name of "name.pdf", "name (1).pdf", "name (2).pdf", ... is taken. The
+    name is claimed atomically (hard link, or O_EXCL where links are not
+    supported), so two jobs publishing at once always get different names.
+    """
+    if overwrite:
+        os.replace(temp_path, path)
+        _fsync_folder(path)
+        return path
+
+    stem, ext = os.path.splitext(path)
+    for n in itertools.count():
+        candidate = path if n == 0 else f"{stem} ({n}){ext}"
+        try:
+            os.link(temp_path, candidate)  # fails if the name exists
+        except FileExistsError:
+            continue
+        except OSError:
+            # No hard links here (e.g. FAT or Android shared storage):
+            # reserve the name, then replace the empty placeholder
+            try:
+                fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            os.replace(temp_path, candidate)
+        else:
+            os.remove(temp_path)
+        _fsync_folder(candidate)
+        return candidate
+
+
+def _fsync_folder(path: str):
+    """Persist the rename itself (POSIX; a no-op where folders cannot be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,53 @@
+# ==========================================================
+#  Memory Utilities
+#  ----------------
+#  Small helpers to sample the resident set size (RSS) of
+#  the current process without third-party dependencies.
+# ==========================================================
+
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss() -> int:
+    """
+    Return the current resident set size in bytes.
+
+    Uses /proc/self/statm where available (Linux, Android) and falls
+    back to the lifetime peak from getrusage() elsewhere. Returns 0
+    when neither is available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """
+    Return the peak RSS of the process in bytes (0 if unknown).
+
+    Prefers VmHWM from /proc/self/status, which starts fresh in a newly
+    exec'd process; getrusage()'s ru_maxrss can carry over the parent's
+    peak into spawned children.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
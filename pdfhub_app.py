@@ -0,0 +1,152 @@
+# ==========================================================
+# pdfhub_app.py
+# ==========================================================
+# The PDFhub Kivy application, started by main.py
+# Handles:
+#   • App initialization
+#   • ScreenManager setup (screens other than Home load lazily)
+#   • Loads KV and controller
+#   • Cold-start timing report
+# ==========================================================
+
+import json
+import os
+import time
+
+from kivy.app import App
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.logger import Logger
+from kivy.uix.boxlayout import BoxLayout
+
+# Import controller and the landing screen; PDF engines (PyPDF2, PyMuPDF)
+# and plyer are only imported once a screen or action needs them
+from app_controller import AppController
+from ui.screens.home_screen import HomeScreen
+from pdf_engine.pdf_backend import set_default_backend
+
+# Screens created on first visit: name -> (class, module)
+LAZY_SCREENS = {
+    "edit": ("EditScreen", "ui.screens.edit_screen"),
+    "split": ("SplitScreen", "ui.screens.split_screen"),
+    "merge": ("MergeScreen", "ui.screens.merge_screen"),
+    "settings": ("SettingsScreen", "ui.screens.settings_screen"),
+}
+for _class_name, _module in LAZY_SCREENS.values():
+    Factory.register(_class_name, module=_module)
+
+
+class StartupTimer:
+    """Records cold-start milestones and reports them after the first frame."""
+
+    # Number of runs kept in startup_times.jsonl
+    HISTORY = 100
+
+    def __init__(self, start: float):
+        self.start = start
+        self.marks = []  # (stage, seconds since start)
+
+    def mark(self, stage: str):
+        self.marks.append((stage, time.perf_counter() - self.start))
+
+    def report(self, folder: str | None = None) -> dict:
+        """
+        Log the duration of every stage and append the run to
+        <folder>/startup_times.jsonl so cold start can be tracked over time.
+        """
+        stages, previous = {}, 0.0
+        for stage, elapsed in self.marks:
+            stages[stage] = round(elapsed - previous, 4)
+            previous = elapsed
+        result = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "total_s": round(previous, 4), "stages_s": stages}
+
+        Logger.info("Startup: " + ", ".join(f"{k} {v:.3f}s" for k, v in stages.items())
+                    + f" (total {previous:.3f}s)")
+
+        if folder:
+            path = os.path.join(folder, "startup_times.jsonl")
+            try:
+                lines = []
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        lines = f.readlines()[-(self.HISTORY - 1):]
+                lines.append(json.dumps(result) + "\n")
+                with open(path, "w") as f:
+                    f.writelines(lines)
+            except OSError as e:
+                Logger.warning(f"Startup: could not save timings: {e}")
+        return result
+
+
+class PDFhubRoot(BoxLayout):
+    """
+    Root container with bottom navigation and ScreenManager.
+    Screen switching handled by controller methods.
+    """
+
+    def switch_tab(self, tab_name):
+        """Switch to a specific tab, building its screen on first visit."""
+        manager = self.ids.screen_manager
+        if not manager.has_screen(tab_name):
+            class_name, _ = LAZY_SCREENS[tab_name]
+            manager.add_widget(Factory.get(class_name)(name=tab_name))
+        manager.current = tab_name
+
+
+class PDFhubApp(App):
+    """Main application controller for PDFhub."""
+
+    def __init__(self, startup_timer: StartupTimer, **kwargs):
+        self.startup_timer = startup_timer
+        super().__init__(**kwargs)
+
+    def build_config(self, config):
+        """Default values for pdfhub.ini."""
+        config.setdefaults("engine", {"backend": "auto"})
+
+    def build(self):
+        self.title = "PDFhub"
+        set_default_backend(self.config.get("engine", "backend"))
+        self.controller = AppController(app=self)
+        root = PDFhubRoot()
+        # Return first — so self.root exists
+        self.root = root
+        # Now safe to create folder and show banner
+        self.controller.ensure_pdfhub_folder()
+        self.startup_timer.mark("build")
+        return root
+
+    def on_start(self):
+        from kivy.core.window import Window
+
+        # on_flip fires once a frame has actually been shown
+        def on_first_frame(*args):
+            Window.unbind(on_flip=on_first_frame)
+            self.startup_timer.mark("first_frame")
+            self.startup_timer.report(self.controller.user_pdf_dir)
+
+        Window.bind(on_flip=on_first_frame)
+
+    def on_stop(self):
+        # Persist anything still waiting for a batched write
+        self.controller.flush_recent()
+
+
+def run(start: float):
+    """
+    Load the KV layout and run the app.
+
+    Args:
+        start (float): time.perf_counter() taken by main.py before any
+                       import, so the cold-start report includes imports.
+    """
+    startup_timer = StartupTimer(start)
+    startup_timer.mark("imports")
+
+    # Load KV layout
+    Builder.load_file("ui/main.kv")
+    startup_timer.mark("kv_load")
+
+    PDFhubApp(startup_timer).run()
+
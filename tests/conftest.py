@@ -0,0 +1,71 @@
+# ==========================================================
+#  Shared test fixtures
+#  --------------------
+#  Small PDFs are generated per test with PyMuPDF, so no
+#  sample files are committed. Every page carries a label
+#  ("<name> p<N>") that tests use to check page order.
+# ==========================================================
+
+import os
+import re
+import sys
+
+import pytest
+
+# Run from the repository root without installing anything
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+fitz = pytest.importorskip("fitz")
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """
+    Factory writing a labelled PDF into tmp_path and returning its path.
+
+    make_pdf(name, pages, xref_stream=False, updates=0, short_eol=False):
+        xref_stream: save with an xref stream and object streams instead
+                     of a classic xref table.
+        updates: number of incremental updates appended afterwards, each
+                 adding one more page (so the file has /Prev chains).
+        short_eol: rewrite classic xref entries with a 1-byte EOL
+                   ("... n\\n", 19 bytes) instead of the 2-byte " \\n"
+                   (single-section files only: later offsets would shift).
+    """
+    def factory(name, pages, xref_stream=False, updates=0, short_eol=False):
+        path = str(tmp_path / f"{name}.pdf")
+        doc = fitz.open()
+        for i in range(pages):
+            doc.new_page(width=200, height=200).insert_text((20, 40), f"{name} p{i + 1}")
+        doc.save(path, use_objstms=int(xref_stream), garbage=1)
+        doc.close()
+
+        for i in range(updates):
+            doc = fitz.open(path)
+            doc.new_page(width=200, height=200).insert_text((20, 40), f"{name} p{pages + i + 1}")
+            doc.saveIncr()
+            doc.close()
+
+        if short_eol:
+            assert not updates, "short_eol would shift the offsets of later sections"
+            with open(path, "rb") as f:
+                data = f.read()
+            # The xref sections come after every object they point at, and
+            # startxref points at their start, so no offset changes
+            data = re.sub(rb"(\d{10} \d{5} [nf]) (\r|\n)", rb"\1\n", data)
+            with open(path, "wb") as f:
+                f.write(data)
+        return path
+
+    return factory
+
+
+
+@pytest.fixture
+def page_labels():
+    """Function returning the label of every page of a PDF, read with PyMuPDF."""
+    def read(path):
+        with fitz.open(path) as doc:
+            return [page.get_text().strip() for page in doc]
+
+    return read
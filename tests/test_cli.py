@@ -0,0 +1,93 @@
+"""Tests of the headless CLI and manifest runner (python -m pdf_engine)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pdf_engine.cli import load_manifest, main, parse_entry_arg, run_jobs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def manifest(make_pdf, tmp_path):
+    """A JSON manifest next to its inputs, using relative paths and defaults."""
+    make_pdf("a", 2)
+    make_pdf("b", 3)
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps({
+        "defaults": {"backend": "pypdf2"},
+        "jobs": [
+            {"op": "merge", "inputs": ["a.pdf", "b.pdf"], "output": "out/merged.pdf"},
+            {"op": "split", "input": "b.pdf", "ranges": "1,2-", "output_dir": "parts"},
+            {"op": "info", "inputs": ["a.pdf"]},
+            {"op": "split", "input": "missing.pdf", "at": 1},
+        ],
+    }))
+    return str(path)
+
+
+def test_load_manifest_applies_defaults_and_resolves_paths(manifest, tmp_path):
+    jobs = load_manifest(manifest)
+
+    assert [job["op"] for job in jobs] == ["merge", "split", "info", "split"]
+    assert all(job["backend"] == "pypdf2" for job in jobs)
+    assert jobs[0]["inputs"] == [str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")]
+    assert jobs[0]["output"] == str(tmp_path / "out" / "merged.pdf")
+    assert jobs[1]["output_dir"] == str(tmp_path / "parts")
+
+
+def test_run_jobs_reports_each_job_in_order(manifest, page_labels, tmp_path):
+    merge, split, info, missing = run_jobs(load_manifest(manifest), workers=1)
+
+    assert merge["error"] is None
+    assert page_labels(merge["outputs"][0]) == ["a p1", "a p2", "b p1", "b p2", "b p3"]
+    assert [page_labels(p) for p in split["outputs"]] == [["b p1"], ["b p2", "b p3"]]
+    assert info["info"][str(tmp_path / "a.pdf")]["page_count"] == 2
+    assert missing["outputs"] == [] and missing["error"]
+
+
+def test_main_run_exit_code_and_output(manifest, capsys):
+    assert main(["run", manifest, "--jobs", "1"]) == 1  # the missing input fails
+
+    captured = capsys.readouterr()
+    results = json.loads(captured.out)
+    assert [r["error"] is None for r in results] == [True, True, True, False]
+    assert "error (split)" in captured.err
+
+
+def test_manifest_on_worker_processes(manifest):
+    # A real spawn pool, started the way users run it; no Kivy is loaded
+    script = ("import json, sys; from pdf_engine.cli import load_manifest, run_jobs; "
+              "results = run_jobs(load_manifest(sys.argv[1]), workers=2); "
+              "print(json.dumps({'results': [[r['error'] is None, len(r['outputs'])] "
+              "for r in results], 'kivy': 'kivy' in sys.modules}))")
+    result = subprocess.run([sys.executable, "-c", script, manifest], cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["results"] == [[True, 1], [True, 2], [True, 0], [False, 0]]
+    assert report["kivy"] is False
+
+
+def test_main_merge_prints_output_path(make_pdf, tmp_path, capsys):
+    output = str(tmp_path / "merged.pdf")
+
+    assert main(["merge", "-o", output, make_pdf("a", 1), make_pdf("b", 1)]) == 0
+
+    assert capsys.readouterr().out.strip() == output
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a.pdf", {"source": "a.pdf", "pages": None, "rotate": 0}),
+    ("a.pdf:3-5", {"source": "a.pdf", "pages": "3-5", "rotate": 0}),
+    ("c.pdf:10:90", {"source": "c.pdf", "pages": "10", "rotate": 90}),
+    ("b.pdf::180", {"source": "b.pdf", "pages": None, "rotate": 180}),
+    (r"C:\docs\a.pdf:2-end", {"source": r"C:\docs\a.pdf", "pages": "2-end", "rotate": 0}),
+])
+def test_parse_entry_arg(text, expected):
+    assert parse_entry_arg(text) == expected
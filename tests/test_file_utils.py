@@ -0,0 +1,91 @@
+"""Tests of the atomic, collision-free output helpers in pdf_engine.utils.file_utils."""
+
+import os
+import threading
+
+import pytest
+
+from pdf_engine.utils import file_utils
+from pdf_engine.utils.file_utils import AtomicOutput, publish_file
+
+
+def write(path, data, **options):
+    output = AtomicOutput(str(path), **options)
+    with output as f:
+        f.write(data)
+    return output
+
+
+def test_atomic_output_publishes_on_success(tmp_path):
+    output = write(tmp_path / "out.pdf", b"data")
+
+    assert output.path == str(tmp_path / "out.pdf")
+    assert os.listdir(tmp_path) == ["out.pdf"]
+
+
+def test_atomic_output_publishes_nothing_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with AtomicOutput(str(tmp_path / "out.pdf")) as f:
+            f.write(b"half")
+            raise RuntimeError("boom")
+
+    assert os.listdir(tmp_path) == []  # no output and no temp file
+
+
+def test_existing_files_are_never_overwritten(tmp_path):
+    (tmp_path / "out.pdf").write_bytes(b"first")
+
+    paths = [write(tmp_path / "out.pdf", str(i).encode()).path for i in range(2)]
+
+    assert [os.path.basename(p) for p in paths] == ["out (1).pdf", "out (2).pdf"]
+    assert (tmp_path / "out.pdf").read_bytes() == b"first"
+    assert (tmp_path / "out (2).pdf").read_bytes() == b"1"
+
+
+def test_overwrite_replaces_in_place(tmp_path):
+    (tmp_path / "out.pdf").write_bytes(b"old")
+
+    output = write(tmp_path / "out.pdf", b"new", overwrite=True)
+
+    assert output.path == str(tmp_path / "out.pdf")
+    assert os.listdir(tmp_path) == ["out.pdf"]
+    assert (tmp_path / "out.pdf").read_bytes() == b"new"
+
+
+def test_deferred_publish(tmp_path):
+    output = write(tmp_path / "out.pdf", b"data", publish=False)
+    assert output.path is None
+    assert os.listdir(tmp_path) == [os.path.basename(output.temp_path)]
+
+    assert output.publish() == str(tmp_path / "out.pdf")
+    assert os.listdir(tmp_path) == ["out.pdf"]
+
+    discarded = write(tmp_path / "other.pdf", b"data", publish=False)
+    discarded.discard()
+    assert os.listdir(tmp_path) == ["out.pdf"]
+
+
+@pytest.mark.parametrize("links", [True, False], ids=["hard-links", "no-links"])
+def test_concurrent_publishers_get_distinct_names(tmp_path, monkeypatch, links):
+    if not links:
+        # e.g. FAT or Android shared storage: names are reserved with O_EXCL
+        def no_link(src, dst):
+            raise OSError("links not supported")
+        monkeypatch.setattr(file_utils.os, "link", no_link)
+
+    temps = []
+    for i in range(8):
+        temp = tmp_path / f".tmp{i}"
+        temp.write_bytes(str(i).encode())
+        temps.append(str(temp))
+    results = []
+    threads = [threading.Thread(target=lambda t=t: results.append(
+        publish_file(t, str(tmp_path / "out.pdf")))) for t in temps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 8
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in results)
+    assert sorted(open(p, "rb").read() for p in results) == [str(i).encode() for i in range(8)]
@@ -0,0 +1,33 @@
+"""Tests of the app entry point (main.py) as seen by spawned worker processes."""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+
+def test_spawned_workers_do_not_load_kivy():
+    # A "spawn" worker re-runs the parent's main file as __mp_main__ before
+    # running any job; pretend the parent is the app started from main.py
+    script = textwrap.dedent(f"""
+        import multiprocessing
+        import sys
+        from concurrent.futures import ProcessPoolExecutor
+
+        sys.modules["__main__"].__file__ = {MAIN!r}
+
+        if __name__ == "__main__":
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                loaded = pool.submit(eval, "sorted(m for m in __import__('sys').modules"
+                                           " if m.split('.')[0] in ('kivy', 'pdfhub_app'))")
+                print(loaded.result())
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
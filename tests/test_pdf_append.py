@@ -0,0 +1,108 @@
+"""Tests of the incremental-update append mode (PDFMerger.merge(append=True))."""
+
+import fitz
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_engine.cancellation import CancelToken, OperationCancelled
+from pdf_engine.pdf_loader import probe_pdf
+from pdf_engine.pdf_merger import PDFMerger
+from pdf_engine.utils.file_utils import AppendOutput
+
+
+def page_labels(path):
+    """Return the label of every page of `path`, read with PyMuPDF."""
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
+
+
+def strict_labels(path):
+    """Return the page labels as read by a strict PdfReader."""
+    reader = PdfReader(path, strict=True)
+    return [page.extract_text().strip() for page in reader.pages]
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+@pytest.mark.parametrize("profile", ["fast", "compact"])
+@pytest.mark.parametrize("xref_stream", [False, True], ids=["table", "stream"])
+def test_repeated_appends(make_pdf, backend, profile, xref_stream):
+    binder = make_pdf("binder", 2, xref_stream=xref_stream)
+    expected = page_labels(binder)
+
+    for day in range(1, 4):
+        before = read_bytes(binder)
+        log = make_pdf(f"day{day}", day)
+
+        merger = PDFMerger([log], backend=backend, profile=profile)
+        assert merger.merge(output_path=binder, append=True) == binder
+        expected += [f"day{day} p{i + 1}" for i in range(day)]
+
+        # An incremental update never touches the existing bytes
+        assert read_bytes(binder).startswith(before)
+        assert page_labels(binder) == expected
+        assert strict_labels(binder) == expected
+        assert probe_pdf(binder)["page_count"] == len(expected)
+        with fitz.open(binder) as doc:
+            assert not doc.is_repaired
+
+
+def test_append_several_inputs_in_one_update(make_pdf):
+    binder = make_pdf("binder", 1)
+    inputs = [make_pdf("a", 2), make_pdf("b", 1, xref_stream=True)]
+
+    PDFMerger(inputs, backend="pypdf2").merge(output_path=binder, append=True)
+
+    assert strict_labels(binder) == ["binder p1", "a p1", "a p2", "b p1"]
+
+
+def test_append_to_merged_output(make_pdf, tmp_path):
+    output = str(tmp_path / "merged.pdf")
+    PDFMerger([make_pdf("a", 2), make_pdf("b", 1)], backend="pypdf2").merge(output_path=output)
+
+    PDFMerger([make_pdf("c", 1)], backend="pymupdf").merge(output_path=output, append=True)
+    PDFMerger([make_pdf("d", 1)], backend="pypdf2").merge(output_path=output, append=True)
+
+    assert strict_labels(output) == ["a p1", "a p2", "b p1", "c p1", "d p1"]
+    assert page_labels(output) == strict_labels(output)
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+def test_cancelled_append_leaves_file_unchanged(make_pdf, backend):
+    binder = make_pdf("binder", 2, updates=1)
+    before = read_bytes(binder)
+    token = CancelToken()
+
+    def on_progress(file_index, file_count, page_index, page_count):
+        if file_index == 0 and page_index == page_count:
+            # Stops at the next page; PyPDF2 has written the first input
+            # after the original end by then, so it must be cut off again
+            token.cancel()
+
+    merger = PDFMerger([make_pdf("a", 3), make_pdf("b", 3)], backend=backend,
+                       cancel_token=token)
+    with pytest.raises(OperationCancelled):
+        merger.merge(on_progress, output_path=binder, append=True)
+
+    assert read_bytes(binder) == before
+    assert strict_labels(binder) == ["binder p1", "binder p2", "binder p3"]
+
+
+def test_append_output_truncates_on_error(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"original")
+
+    with pytest.raises(RuntimeError):
+        with AppendOutput(str(path)) as f:
+            f.write(b"x" * 100_000)  # more than the write buffer
+            raise RuntimeError("boom")
+
+    assert path.read_bytes() == b"original"
+
+    with AppendOutput(str(path)) as f:
+        f.write(b" + update")
+    assert path.read_bytes() == b"original + update"
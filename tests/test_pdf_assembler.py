@@ -0,0 +1,63 @@
+"""Tests of PDFAssembler: one output from pages of several inputs."""
+
+import os
+
+import fitz
+import pytest
+
+from pdf_engine.cancellation import CancelToken, OperationCancelled
+from pdf_engine.pdf_assembler import PDFAssembler, parse_entry
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ("a.pdf", ("a.pdf", None, 0)),
+    (("a.pdf", "3-5,10"), ("a.pdf", "3-5,10", 0)),
+    (("a.pdf", 7, 90), ("a.pdf", 7, 90)),
+    (("a.pdf", None, -90), ("a.pdf", None, 270)),
+    ({"source": "a.pdf", "pages": "2-end", "rotate": 180}, ("a.pdf", "2-end", 180)),
+])
+def test_parse_entry(entry, expected):
+    assert parse_entry(entry) == expected
+
+
+@pytest.mark.parametrize("entry", [("a.pdf", 1, 45), (), ("a.pdf", 1, 0, "x")])
+def test_parse_entry_rejects_bad_entries(entry):
+    with pytest.raises(ValueError):
+        parse_entry(entry)
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+def test_assemble_pages_from_several_inputs(make_pdf, page_labels, tmp_path, backend):
+    a, b = make_pdf("a", 4), make_pdf("b", 2, xref_stream=True)
+    assembler = PDFAssembler([(a, "3-4"), b, (a, 1, 90), (b, "2", 180)], backend=backend,
+                             collect_metrics=True)
+
+    output = assembler.assemble(str(tmp_path / "out.pdf"))
+
+    assert page_labels(output) == ["a p3", "a p4", "b p1", "b p2", "a p1", "b p2"]
+    with fitz.open(output) as doc:
+        assert [page.rotation for page in doc] == [0, 0, 0, 0, 90, 180]
+    # Each distinct source is opened once, however often it is used
+    assert assembler.metrics["counters"]["files"] == 2
+
+
+def test_assemble_bad_range_names_the_source(make_pdf, tmp_path):
+    output = tmp_path / "out.pdf"
+    assembler = PDFAssembler([make_pdf("a", 2), (make_pdf("b", 2), "2-5")], backend="pypdf2")
+
+    with pytest.raises(ValueError, match="b.pdf"):
+        assembler.assemble(str(output))
+
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+def test_cancelled_assembly_leaves_no_output(make_pdf, tmp_path, backend):
+    token = CancelToken()
+    token.cancel()
+    assembler = PDFAssembler([make_pdf("a", 2)], backend=backend, cancel_token=token)
+
+    with pytest.raises(OperationCancelled):
+        assembler.assemble(str(tmp_path / "out" / "assembled.pdf"))
+
+    assert os.listdir(tmp_path / "out") == []
@@ -0,0 +1,35 @@
+"""Tests of the PDF backends in pdf_engine.pdf_backend."""
+
+import mmap
+import os
+
+import pytest
+
+from pdf_engine.pdf_backend import get_backend
+
+
+def test_pypdf2_close_unmaps_input(make_pdf):
+    backend = get_backend("pypdf2")
+    path = make_pdf("doc", 2)
+    doc = backend.open(path)
+    assert isinstance(doc.stream, mmap.mmap)
+
+    backend.close(doc)
+
+    assert doc.stream.closed
+    os.remove(path)  # no mapping keeps the file busy (matters on Windows)
+
+
+def test_pypdf2_close_accepts_writers():
+    backend = get_backend("pypdf2")
+    backend.close(backend.new_document())
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+def test_merge_after_inputs_are_closed(make_pdf, page_labels, tmp_path, backend):
+    inputs = [make_pdf("a", 2), make_pdf("b", 1)]
+
+    output = get_backend(backend).merge(inputs, str(tmp_path / "merged.pdf"))
+
+    # Pages were copied before each source was closed
+    assert page_labels(output) == ["a p1", "a p2", "b p1"]
@@ -0,0 +1,85 @@
+"""Tests of the page-count probe in pdf_engine.pdf_loader."""
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_engine.pdf_loader import _PdfProbe, open_input, probe_pdf
+
+LAYOUTS = {
+    "table": {},
+    "table-short-eol": {"short_eol": True},
+    "table-updates": {"updates": 2},
+    "stream": {"xref_stream": True},
+    "stream-updates": {"xref_stream": True, "updates": 2},
+}
+
+
+def xref_sections(path):
+    """Return the ("table" | "stream", ...) sections the probe reads, newest first."""
+    data = open_input(path)
+    try:
+        probe = _PdfProbe(data)
+        probe._read_xref_chain(probe._startxref())
+        return probe.sections
+    finally:
+        data.close()
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_probe_matches_pdf_reader(make_pdf, layout):
+    path = make_pdf(layout, 3, **LAYOUTS[layout])
+
+    info = probe_pdf(path)
+
+    assert info is not None, "probe fell back to a full parse"
+    assert info["page_count"] == len(PdfReader(path).pages)
+    assert info["page_count"] == 3 + LAYOUTS[layout].get("updates", 0)
+    assert info["encrypted"] is False
+
+
+def test_probe_reads_classic_table(make_pdf):
+    sections = xref_sections(make_pdf("doc", 2))
+
+    assert [kind for kind, _ in sections] == ["table"]
+    assert all(entry_len == 20 for _, _, _, entry_len in sections[0][1])
+
+
+def test_probe_reads_one_byte_eol_entries(make_pdf):
+    path = make_pdf("doc", 4, short_eol=True)
+
+    sections = xref_sections(path)
+
+    assert all(entry_len == 19 for _, _, _, entry_len in sections[0][1])
+    assert probe_pdf(path)["page_count"] == 4
+
+
+def test_probe_reads_xref_stream_and_object_streams(make_pdf):
+    path = make_pdf("doc", 5, xref_stream=True)
+
+    sections = xref_sections(path)
+
+    assert [kind for kind, _ in sections] == ["stream"]
+    # Objects stored in object streams are type 2 entries
+    assert any(entry[0] == 2 for entry in sections[0][1].values())
+    assert probe_pdf(path)["page_count"] == 5
+
+
+@pytest.mark.parametrize("xref_stream", [False, True])
+def test_probe_follows_incremental_chain(make_pdf, xref_stream):
+    path = make_pdf("doc", 2, xref_stream=xref_stream, updates=3)
+
+    sections = xref_sections(path)
+
+    assert len(sections) == 4
+    # The newest section wins: the /Count written by the last update
+    assert probe_pdf(path)["page_count"] == len(PdfReader(path).pages) == 5
+
+
+def test_probe_gives_up_on_damaged_file(make_pdf):
+    path = make_pdf("doc", 2)
+    with open(path, "r+b") as f:
+        data = f.read()
+        f.seek(data.rfind(b"startxref") + len(b"startxref\n"))
+        f.write(b"9")  # startxref now points at the wrong place
+
+    assert probe_pdf(path) is None
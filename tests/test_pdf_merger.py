@@ -0,0 +1,204 @@
+"""Tests of PDFMerger: plain, streaming and checkpointed merges."""
+
+import json
+import os
+import time
+
+import fitz
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_engine.cancellation import CancelToken, OperationCancelled
+from pdf_engine.pdf_merger import CHECKPOINT_MAX_AGE, PDFMerger
+
+
+def test_streaming_merge_keeps_page_order(make_pdf, page_labels, tmp_path):
+    inputs = [make_pdf("a", 2), make_pdf("b", 1, xref_stream=True), make_pdf("c", 2)]
+    merger = PDFMerger(inputs, backend="pypdf2")
+
+    output = merger.merge(streaming=True, output_path=str(tmp_path / "merged.pdf"))
+
+    assert page_labels(output) == ["a p1", "a p2", "b p1", "c p1", "c p2"]
+    assert PdfReader(output, strict=True).pages[4].extract_text().strip() == "c p2"
+    assert merger.peak_rss > 0
+
+
+def test_streaming_merge_over_memory_limit_leaves_no_output(make_pdf, tmp_path):
+    inputs = [make_pdf("a", 2), make_pdf("b", 2)]
+    output = tmp_path / "merged.pdf"
+
+    # 1 MB is below the interpreter's own footprint
+    with pytest.raises(MemoryError):
+        PDFMerger(inputs, backend="pypdf2").merge(memory_limit_mb=1, output_path=str(output))
+
+    assert not output.exists()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("options", [
+    {"streaming": True},
+    {"memory_limit_mb": 100_000},
+    {"checkpoint": True},
+], ids=["streaming", "memory_limit", "checkpoint"])
+def test_bounded_merge_streams_on_any_backend(make_pdf, page_labels, tmp_path, options):
+    inputs = [make_pdf("a", 2), make_pdf("b", 3)]
+    merger = PDFMerger(inputs, backend="pymupdf", collect_metrics=True)
+
+    output = merger.merge(output_path=str(tmp_path / "out" / "merged.pdf"), **options)
+
+    # PyMuPDF builds the output in memory, so the streaming writer runs instead
+    assert merger.metrics["backend"] == "pypdf2"
+    assert page_labels(output) == ["a p1", "a p2", "b p1", "b p2", "b p3"]
+
+
+def test_plain_merge_keeps_configured_backend(make_pdf, page_labels, tmp_path):
+    merger = PDFMerger([make_pdf("a", 1), make_pdf("b", 1)], backend="pymupdf",
+                       collect_metrics=True)
+
+    output = merger.merge(output_path=str(tmp_path / "merged.pdf"))
+
+    assert merger.metrics["backend"] == "pymupdf"
+    assert page_labels(output) == ["a p1", "b p1"]
+
+
+# ------------------------------------------------------
+# Checkpointed resume
+# ------------------------------------------------------
+def cancelled_after_first_input(inputs, output):
+    """Start a checkpointed merge and cancel it once the first input is written."""
+    token = CancelToken()
+
+    def on_progress(file_index, file_count, page_index, page_count):
+        if file_index == 0 and page_index == page_count:
+            token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        PDFMerger(inputs, backend="pypdf2", cancel_token=token).merge(
+            on_progress, output_path=output, checkpoint=True)
+    checkpoints = os.path.join(os.path.dirname(output), ".checkpoints")
+    return [os.path.join(checkpoints, name) for name in sorted(os.listdir(checkpoints))]
+
+
+def test_checkpointed_merge_resumes_after_cancel(make_pdf, page_labels, tmp_path):
+    inputs = [make_pdf("a", 2), make_pdf("b", 2), make_pdf("c", 1)]
+    output = str(tmp_path / "merged.pdf")
+    files = cancelled_after_first_input(inputs, output)
+    assert [os.path.splitext(path)[1] for path in files] == [".json", ".part"]
+    assert not os.path.exists(output)
+
+    merger = PDFMerger(inputs, backend="pymupdf", collect_metrics=True)
+    assert merger.merge(output_path=output, checkpoint=True) == output
+
+    assert merger.metrics["counters"]["resumed_files"] == 1
+    assert page_labels(output) == ["a p1", "a p2", "b p1", "b p2", "c p1"]
+    assert not any(os.path.exists(path) for path in files)
+
+
+@pytest.mark.parametrize("content", [
+    '{"version": 2, "inputs": [',   # truncated write
+    "[]",
+    '{"version": 2}',
+    '{"version": 2, "inputs": null, "writer": {}}',
+], ids=["truncated", "list", "missing-keys", "wrong-types"])
+def test_damaged_checkpoint_starts_over(make_pdf, page_labels, tmp_path, content):
+    inputs = [make_pdf("a", 2), make_pdf("b", 1)]
+    output = str(tmp_path / "merged.pdf")
+    checkpoint = cancelled_after_first_input(inputs, output)[0]
+    with open(checkpoint, "w") as f:
+        f.write(content)
+
+    merger = PDFMerger(inputs, backend="pypdf2", collect_metrics=True)
+    merger.merge(output_path=output, checkpoint=True)
+
+    assert merger.metrics["counters"]["resumed_files"] == 0
+    assert page_labels(output) == ["a p1", "a p2", "b p1"]
+
+
+def test_abandoned_checkpoints_are_pruned(make_pdf, tmp_path):
+    folder = tmp_path / ".checkpoints"
+    folder.mkdir()
+    old = [folder / "merge_0000000000000000.json", folder / "merge_0000000000000000.pdf.part"]
+    recent = [folder / "merge_1111111111111111.json", folder / "merge_1111111111111111.pdf.part"]
+    unrelated = folder / "notes.txt"
+    for path in old + recent + [unrelated]:
+        path.write_bytes(b"x")
+    expired = time.time() - CHECKPOINT_MAX_AGE - 60
+    for path in old + [unrelated]:
+        os.utime(path, (expired, expired))
+
+    PDFMerger([make_pdf("a", 1), make_pdf("b", 1)], backend="pypdf2").merge(
+        output_path=str(tmp_path / "merged.pdf"), checkpoint=True)
+
+    assert sorted(os.listdir(folder)) == sorted(p.name for p in recent + [unrelated])
+
+
+@pytest.mark.parametrize("key", ["writer", "output_path", "completed"])
+def test_checkpoint_missing_key_starts_over(make_pdf, page_labels, tmp_path, key):
+    inputs = [make_pdf("a", 2), make_pdf("b", 1)]
+    output = str(tmp_path / "merged.pdf")
+    checkpoint = cancelled_after_first_input(inputs, output)[0]
+    with open(checkpoint) as f:
+        state = json.load(f)
+    del state[key]  # same version and inputs, e.g. written by an older build
+    with open(checkpoint, "w") as f:
+        json.dump(state, f)
+
+    merger = PDFMerger(inputs, backend="pypdf2", collect_metrics=True)
+    merger.merge(output_path=output, checkpoint=True)
+
+    assert merger.metrics["counters"]["resumed_files"] == 0
+    assert page_labels(output) == ["a p1", "a p2", "b p1"]
+
+
+# ------------------------------------------------------
+# Shared-resource dedup
+# ------------------------------------------------------
+def with_logo(path, logo):
+    """Stamp the same image on every page of `path` (a letterhead, say)."""
+    with fitz.open(path) as doc:
+        for page in doc:
+            page.insert_image(fitz.Rect(100, 100, 164, 164), stream=logo)
+        doc.saveIncr()
+    return path
+
+
+def image_count(path):
+    """Number of image XObjects stored in `path`."""
+    with fitz.open(path) as doc:
+        return sum(doc.xref_get_key(xref, "Subtype") == ("name", "/Image")
+                   for xref in range(1, doc.xref_length()))
+
+
+@pytest.fixture
+def letterheads(make_pdf):
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    for x in range(64):
+        pixmap.set_pixel(x, x, (200, 30, 30))
+    logo = pixmap.tobytes("png")
+    return [with_logo(make_pdf(name, 2), logo) for name in ("a", "b", "c")]
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+def test_dedup_writes_shared_images_once(letterheads, page_labels, tmp_path, backend):
+    assert sum(image_count(path) for path in letterheads) == 3
+
+    plain = PDFMerger(letterheads, backend=backend).merge(
+        output_path=str(tmp_path / "plain.pdf"))
+    merger = PDFMerger(letterheads, backend=backend)
+    shared = merger.merge(dedup=True, output_path=str(tmp_path / "shared.pdf"))
+
+    assert image_count(plain) == 3
+    assert image_count(shared) == 1
+    assert os.path.getsize(shared) < os.path.getsize(plain)
+    assert page_labels(shared) == page_labels(plain)
+    if backend == "pypdf2":
+        assert merger.deduplicated >= 2
+
+
+def test_dedup_every_page_still_shows_the_image(letterheads, tmp_path):
+    output = PDFMerger(letterheads, backend="pypdf2").merge(
+        dedup=True, output_path=str(tmp_path / "shared.pdf"))
+
+    with fitz.open(output) as doc:
+        xrefs = {page.get_images()[0][0] for page in doc}
+    assert len(xrefs) == 1
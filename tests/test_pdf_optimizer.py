@@ -0,0 +1,107 @@
+"""Tests of the image optimizer (pdf_engine.pdf_optimizer)."""
+
+import os
+import random
+
+import fitz
+import pytest
+
+pytest.importorskip("PIL")
+
+from pdf_engine.pdf_merger import PDFMerger
+from pdf_engine.pdf_optimizer import ImageOptimizer, optimize_pdf
+
+
+def scan_image(size=600, seed=0):
+    """A noisy RGB bitmap, as a phone scan would be, encoded as PNG."""
+    noise = random.Random(seed).randbytes(size * size * 3)
+    samples = noise.translate(bytes(96 + b % 64 for b in range(256)))  # mid-gray noise
+    return fitz.Pixmap(fitz.csRGB, size, size, samples, False).tobytes("png")
+
+
+@pytest.fixture
+def make_scan(make_pdf):
+    """make_scan(name, pages): labelled 200 pt pages under a 600 px full-page image (216 dpi)."""
+    def factory(name, pages):
+        path = make_pdf(name, pages)
+        with fitz.open(path) as doc:
+            for number, page in enumerate(doc):
+                page.insert_image(page.rect, stream=scan_image(seed=number))
+            doc.saveIncr()
+        return path
+
+    return factory
+
+
+def image_widths(path):
+    with fitz.open(path) as doc:
+        return [doc.extract_image(image[0])["width"] for page in doc for image in page.get_images()]
+
+
+def test_optimize_in_place(make_scan, page_labels, tmp_path):
+    path = make_scan("scan", 2)
+    size = os.path.getsize(path)
+    progress = []
+
+    with ImageOptimizer(max_workers=1) as optimizer:
+        report = optimizer.optimize(path, path, lambda *p: progress.append(p))
+
+    assert report["output_path"] == path
+    assert report["images"] == report["optimized"] == 2
+    assert report["bytes_before"] == size
+    assert report["bytes_after"] == os.path.getsize(path) < size
+    assert image_widths(path) == [417, 417]  # 200 pt = 2.78 inches at 150 dpi
+    assert page_labels(path) == ["scan p1", "scan p2"]
+    assert progress == [(0, 2, 1, 1), (1, 2, 1, 1)]
+    assert os.listdir(tmp_path) == ["scan.pdf"]  # no temp file left
+    os.remove(path)  # the input mapping was released
+
+
+def test_optimize_to_new_file_keeps_input(make_scan):
+    path = make_scan("scan", 1)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    report = optimize_pdf(path, dpi=100, quality=60, max_workers=1)
+
+    assert report["output_path"] == path.replace("scan.pdf", "scan_optimized.pdf")
+    assert image_widths(report["output_path"]) == [278]
+    with open(path, "rb") as f:
+        assert f.read() == original
+
+
+def test_optimize_on_worker_processes(make_scan):
+    path = make_scan("scan", 3)
+
+    report = optimize_pdf(path, path, max_workers=2)
+
+    assert report["optimized"] == 3
+    assert image_widths(path) == [417, 417, 417]
+
+
+def test_optimize_without_images_leaves_file_untouched(make_pdf):
+    path = make_pdf("text", 2)
+    stat = os.stat(path)
+
+    report = optimize_pdf(path, path, max_workers=1)
+
+    assert report["images"] == report["optimized"] == report["bytes_saved"] == 0
+    assert os.stat(path).st_mtime_ns == stat.st_mtime_ns
+
+
+@pytest.mark.parametrize("options", [{"dpi": 0}, {"quality": 0}, {"quality": 96}])
+def test_optimize_rejects_bad_options(options):
+    with pytest.raises(ValueError):
+        ImageOptimizer(**options)
+
+
+def test_merge_with_optimize(make_scan, page_labels, tmp_path):
+    merger = PDFMerger([make_scan("a", 1), make_scan("b", 1)], backend="pypdf2",
+                       optimize={"max_workers": 1})
+
+    output = merger.merge(output_path=str(tmp_path / "merged.pdf"))
+
+    assert merger.optimization["optimized"] == 2
+    assert merger.optimization["bytes_saved"] > 0
+    assert image_widths(output) == [417, 417]
+    assert page_labels(output) == ["a p1", "b p1"]
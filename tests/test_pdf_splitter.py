@@ -0,0 +1,103 @@
+"""Tests of PDFSplitter and parse_page_ranges."""
+
+import pytest
+
+from pdf_engine.pdf_splitter import PDFSplitter, parse_page_ranges
+
+
+# ------------------------------------------------------
+# parse_page_ranges
+# ------------------------------------------------------
+@pytest.mark.parametrize("spec, expected", [
+    ("1-3,4-10", [[0, 1, 2], list(range(3, 10))]),
+    ("7", [[6]]),
+    ("11-end", [[10, 11]]),
+    ("3-", [list(range(2, 12))]),           # open end means the last page
+    (" 2 - 3 , 12- ", [[1, 2], [11]]),
+    ("end", [[11]]),
+    ("1-2,,5", [[0, 1], [4]]),              # empty chunks are skipped
+    ("2-4,3-5", [[1, 2, 3], [2, 3, 4]]),    # overlaps are allowed
+])
+def test_parse_page_ranges(spec, expected):
+    assert parse_page_ranges(spec, 12) == expected
+
+
+@pytest.mark.parametrize("spec", ["0-2", "5-13", "13", "6-4", "-3", "a-b", "1-x"])
+def test_parse_page_ranges_rejects_bad_ranges(spec):
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec, 12)
+
+
+@pytest.mark.parametrize("spec", ["", " ", ",,"])
+def test_parse_page_ranges_needs_a_range(spec):
+    with pytest.raises(ValueError, match="at least one page range"):
+        parse_page_ranges(spec, 12)
+
+
+# ------------------------------------------------------
+# Split modes
+# ------------------------------------------------------
+@pytest.fixture(params=["pypdf2", "pymupdf"])
+def backend(request):
+    return request.param
+
+
+def test_split_at_page(make_pdf, page_labels, tmp_path, backend):
+    splitter = PDFSplitter(make_pdf("doc", 5), backend, output_dir=str(tmp_path / "out"))
+
+    first, second = splitter.split(2)
+
+    assert page_labels(first) == ["doc p1", "doc p2"]
+    assert page_labels(second) == ["doc p3", "doc p4", "doc p5"]
+
+
+def test_split_ranges(make_pdf, page_labels, tmp_path, backend):
+    splitter = PDFSplitter(make_pdf("doc", 5), backend, output_dir=str(tmp_path / "out"))
+
+    parts = splitter.split_ranges("4-,1-2")
+
+    assert [page_labels(p) for p in parts] == [["doc p4", "doc p5"], ["doc p1", "doc p2"]]
+
+
+def test_split_every_and_burst(make_pdf, page_labels, tmp_path, backend):
+    path = make_pdf("doc", 5)
+
+    chunks = PDFSplitter(path, backend, output_dir=str(tmp_path / "every")).split_every(2)
+    pages = PDFSplitter(path, backend, output_dir=str(tmp_path / "burst")).burst()
+
+    assert [len(page_labels(p)) for p in chunks] == [2, 2, 1]
+    assert [page_labels(p) for p in pages] == [[f"doc p{i}"] for i in range(1, 6)]
+    assert [p.rsplit("_", 1)[1] for p in pages] == [f"page{i}.pdf" for i in range(1, 6)]
+
+
+@pytest.mark.parametrize("call", [
+    lambda s: s.split(0),
+    lambda s: s.split(3),
+    lambda s: s.split_ranges("2-9"),
+    lambda s: s.split_every(0),
+], ids=["page-0", "last-page", "range", "every-0"])
+def test_invalid_split_writes_nothing(make_pdf, tmp_path, call):
+    out = tmp_path / "out"
+    splitter = PDFSplitter(make_pdf("doc", 3), "pypdf2", output_dir=str(out),
+                           collect_metrics=True)
+
+    with pytest.raises(ValueError):
+        call(splitter)
+
+    assert not out.exists() or not list(out.iterdir())
+    assert splitter.metrics["error"]
+
+
+@pytest.mark.parametrize("profile", ["fast", "compact"])
+def test_failed_split_removes_written_parts(make_pdf, tmp_path, backend, profile):
+    out = tmp_path / "out"
+    splitter = PDFSplitter(make_pdf("doc", 4), backend, profile, output_dir=str(out))
+
+    def on_progress(part_index, part_count, page_index, page_count):
+        if part_index == 2:
+            raise RuntimeError("disk full")  # after two parts were written
+
+    with pytest.raises(RuntimeError):
+        splitter.burst(on_progress)
+
+    assert list(out.iterdir()) == []
@@ -0,0 +1,126 @@
+"""Tests of StreamingPDFWriter: object streams, xref streams and stream compression."""
+
+import os
+
+import fitz
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_engine.pdf_loader import _PdfProbe, open_input, open_reader, probe_pdf
+from pdf_engine.pdf_merger import PDFMerger
+from pdf_engine.pdf_stream_writer import StreamingPDFWriter
+
+
+def write(path, inputs, **options):
+    """Copy every page of `inputs` to `path` with a StreamingPDFWriter."""
+    with open(path, "wb") as f:
+        writer = StreamingPDFWriter(f, **options)
+        for source in inputs:
+            writer.add_pages(open_reader(source))
+        writer.close()
+    return path
+
+
+def xref_kinds(path):
+    data = open_input(path)
+    try:
+        probe = _PdfProbe(data)
+        probe._read_xref_chain(probe._startxref())
+        return [kind for kind, _ in probe.sections]
+    finally:
+        data.close()
+
+
+def object_stream_count(path):
+    with fitz.open(path) as doc:
+        return sum(doc.xref_get_key(xref, "Type") == ("name", "/ObjStm")
+                   for xref in range(1, doc.xref_length()))
+
+
+def content_filters(path):
+    with fitz.open(path) as doc:
+        return {doc.xref_get_key(xref, "Filter")[1] for page in doc for xref in page.get_contents()}
+
+
+def check_readable(path, labels, page_labels):
+    """Strict PyPDF2 and PyMuPDF (without repair) both read `labels` back."""
+    reader = PdfReader(path, strict=True)
+    assert [page.extract_text().strip() for page in reader.pages] == labels
+    assert page_labels(path) == labels
+    with fitz.open(path) as doc:
+        assert not doc.is_repaired
+    assert probe_pdf(path)["page_count"] == len(labels)
+
+
+def with_ruling(path):
+    """Add ruled lines to every page as an uncompressed (and compressible) content stream."""
+    ruling = b"".join(b"10 %d m 190 %d l S\n" % (y, y) for y in range(60, 200, 2))
+    with fitz.open(path) as doc:
+        for page in doc:
+            xref = doc.get_new_xref()
+            doc.update_object(xref, "<<>>")
+            doc.update_stream(xref, ruling, compress=False)
+            contents = page.get_contents() + [xref]
+            doc.xref_set_key(page.xref, "Contents",
+                             "[" + " ".join(f"{x} 0 R" for x in contents) + "]")
+        doc.saveIncr()
+    return path
+
+
+@pytest.fixture
+def inputs(make_pdf):
+    return [with_ruling(make_pdf("a", 3)), with_ruling(make_pdf("b", 2, xref_stream=True))]
+
+
+LABELS = ["a p1", "a p2", "a p3", "b p1", "b p2"]
+
+
+def test_plain_output_uses_xref_table(inputs, page_labels, tmp_path):
+    path = write(str(tmp_path / "out.pdf"), inputs)
+
+    check_readable(path, LABELS, page_labels)
+    assert xref_kinds(path) == ["table"]
+    assert object_stream_count(path) == 0
+    assert content_filters(path) == {"null"}  # copied as they are
+
+
+def test_object_streams_and_xref_stream(inputs, page_labels, tmp_path):
+    path = write(str(tmp_path / "out.pdf"), inputs, object_streams=True)
+
+    check_readable(path, LABELS, page_labels)
+    assert xref_kinds(path) == ["stream"]
+    assert object_stream_count(path) >= 1
+    with open(path, "rb") as f:
+        assert f.read(8) == b"%PDF-1.5"  # object streams need PDF 1.5
+
+
+@pytest.mark.parametrize("recompress", [False, True])
+def test_compressed_streams(inputs, page_labels, tmp_path, recompress):
+    plain = write(str(tmp_path / "plain.pdf"), inputs)
+    path = write(str(tmp_path / "out.pdf"), inputs, compress_streams=True, recompress=recompress)
+
+    check_readable(path, LABELS, page_labels)
+    # Streams too short to shrink (the labels) stay as they are
+    assert "/FlateDecode" in content_filters(path)
+    assert xref_kinds(path) == ["table"]
+    assert os.path.getsize(path) < os.path.getsize(plain)
+
+
+def test_all_options_together(inputs, page_labels, tmp_path):
+    path = write(str(tmp_path / "out.pdf"), inputs + inputs, dedup=True, compress_streams=True,
+                 recompress=True, object_streams=True)
+
+    check_readable(path, LABELS + LABELS, page_labels)
+    assert xref_kinds(path) == ["stream"]
+
+
+@pytest.mark.parametrize("backend", ["pypdf2", "pymupdf"])
+@pytest.mark.parametrize("profile", ["compact", "max-compress"])
+def test_merge_profiles(inputs, page_labels, tmp_path, backend, profile):
+    fast = PDFMerger(inputs, backend=backend).merge(output_path=str(tmp_path / "fast.pdf"))
+    path = PDFMerger(inputs, backend=backend, profile=profile).merge(
+        output_path=str(tmp_path / "out.pdf"))
+
+    check_readable(path, LABELS, page_labels)
+    assert xref_kinds(path) == ["stream"]
+    assert os.path.getsize(path) < os.path.getsize(fast)
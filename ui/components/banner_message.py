@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.animation import Animation
@@ -5,6 +7,17 @@ from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle
 
 
+# Messages posted within this many seconds are shown as one banner
+COALESCE_DELAY = 0.15
+
+# Distinct messages listed in one banner before "+N more"
+MAX_PARTS = 4
+
+# When messages of different types are merged, the banner takes the
+# color of the most severe one
+SEVERITY = {"success": 0, "info": 1, "error": 2}
+
+
 class BannerMessage(BoxLayout):
     """
     A reusable professional banner notification that slides down from the top.
@@ -12,6 +25,10 @@ class BannerMessage(BoxLayout):
 
     Example:
         BannerMessage.show(self, "✅ Split complete!", msg_type="success")
+
+    Only one banner widget exists: show() goes through the
+    NotificationManager, which queues and merges messages and reuses
+    the same banner, so bursts of messages never stack overlays.
     """
 
     # Predefined message colors (RGBA)
@@ -21,12 +38,11 @@ class BannerMessage(BoxLayout):
         "info": (0.2, 0.5, 0.9, 1),       # blue
     }
 
-    def __init__(self, message, msg_type="info", duration=4, **kwargs):
+    def __init__(self, message="", msg_type="info", **kwargs):
         """
-        Create a banner with text and color style.
+        Create a (hidden) banner with text and color style.
         - message: text to show
         - msg_type: one of ("error", "success", "info")
-        - duration: how many seconds to stay visible
         """
         super().__init__(**kwargs)
         self.size_hint_y = None
@@ -36,50 +52,160 @@ class BannerMessage(BoxLayout):
         self.pos_hint = {"top": 1.05}  # starts slightly above the screen
         self.spacing = 10
         self.padding = [10, 8]
-
-        # Choose background color based on type
-        color = self.COLORS.get(msg_type, self.COLORS["info"])
+        self.visible = False  # True from slide_in() until dismiss() starts
 
         # --- Background setup ---
         with self.canvas.before:
-            self.bg_color = Color(*color)
+            self.bg_color = Color(*self.COLORS["info"])
             self.bg_rect = Rectangle(pos=self.pos, size=self.size)
         self.bind(pos=self._update_rect, size=self._update_rect)
 
         # --- Label setup ---
         self.label = Label(
-            text=message,
             color=(1, 1, 1, 1),  # white text
             font_size=16,
             halign="center",
             valign="middle"
         )
+        # Wrap long (merged) messages and grow the banner to fit them
+        self.label.bind(width=lambda lbl, w: setattr(lbl, "text_size", (w - 20, None)))
+        self.label.bind(texture_size=self._fit_height)
         self.add_widget(self.label)
+        self.set_message(message, msg_type)
 
-        # --- Slide down animation (entry) ---
-        Animation(opacity=1, pos_hint={"top": 0.98}, d=0.35, t="out_quad").start(self)
-
-        # --- Schedule fade-out and removal ---
-        Clock.schedule_once(lambda dt: self.dismiss(), duration)
+    def set_message(self, message, msg_type="info"):
+        """Change the text and color in place (no new widget, no animation)."""
+        self.label.text = message
+        self.bg_color.rgba = self.COLORS.get(msg_type, self.COLORS["info"])
 
     # Keep background rectangle synced with widget position
     def _update_rect(self, *args):
         self.bg_rect.pos = self.pos
         self.bg_rect.size = self.size
 
+    def _fit_height(self, label, texture_size):
+        self.height = max(50, texture_size[1] + 16)
+
+    # Animate appearance (cancels a running disappearance)
+    def slide_in(self):
+        Animation.cancel_all(self)
+        self.visible = True
+        Animation(opacity=1, pos_hint={"top": 0.98}, d=0.35, t="out_quad").start(self)
+
     # Animate disappearance
     def dismiss(self):
+        Animation.cancel_all(self)
+        self.visible = False
         anim = Animation(opacity=0, pos_hint={"top": 1.05}, d=0.35, t="in_quad")
-        anim.bind(on_complete=lambda *_: self.parent.remove_widget(self))
+        anim.bind(on_complete=lambda *_: self.parent and self.parent.remove_widget(self))
         anim.start(self)
 
     # --- Static method to make usage easy ---
     @staticmethod
-    def show(parent, message, msg_type="info", duration=4):
+    def show(parent, message, msg_type="info", duration=4, summary=None):
         """
         Display a banner message on the given parent widget.
         Example:
             BannerMessage.show(self, "✅ Done!", msg_type="success")
+
+        Messages sharing the same `summary` (a format string with {n})
+        are counted instead of listed, e.g. summary="{n} failed".
         """
-        banner = BannerMessage(message, msg_type=msg_type, duration=duration)
-        parent.add_widget(banner, index=0)
+        get_notifier().post(parent, message, msg_type=msg_type, duration=duration,
+                            summary=summary)
+
+
+class NotificationManager:
+    """
+    Queues banner messages and shows them on one pooled BannerMessage.
+
+    Messages posted in quick succession are merged into a single banner
+    ("✅ 12 file(s) split, 1 failed"). While the banner is visible, new
+    messages are merged into it and only its text changes, so there is
+    never more than one banner animation running.
+    """
+
+    def __init__(self):
+        self._banner = None        # created on first use
+        self._pending = []         # (parent, message, msg_type, duration, summary)
+        self._shown = OrderedDict()  # part key -> [message, msg_type, summary, count]
+        self._duration = 0
+        self._dismiss_event = None
+        self._flush_trigger = Clock.create_trigger(self._flush, COALESCE_DELAY)
+
+    def post(self, parent, message, msg_type="info", duration=4, summary=None):
+        """Queue a message; it is shown with the others posted around it."""
+        self._pending.append((parent, message, msg_type, duration, summary))
+        self._flush_trigger()
+
+    # ------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------
+    def _flush(self, *_):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        parent = pending[-1][0]
+
+        banner = self._banner
+        if banner is None:
+            banner = self._banner = BannerMessage()
+        if not banner.visible:
+            self._shown.clear()
+            self._duration = 0
+
+        for _, message, msg_type, duration, summary in pending:
+            key = summary or message
+            part = self._shown.get(key)
+            if part is None:
+                self._shown[key] = [message, msg_type, summary, 1]
+            else:
+                part[0] = message
+                part[3] += 1
+            self._duration = max(self._duration, duration)
+
+        banner.set_message(self._text(), self._msg_type())
+        if banner.parent is not parent:
+            if banner.parent is not None:
+                banner.parent.remove_widget(banner)
+            parent.add_widget(banner, index=0)
+        if not banner.visible:
+            banner.slide_in()
+
+        # Keep the banner up for the longest duration, counted from now
+        if self._dismiss_event is not None:
+            self._dismiss_event.cancel()
+        self._dismiss_event = Clock.schedule_once(self._dismiss, self._duration)
+
+    def _dismiss(self, *_):
+        self._dismiss_event = None
+        self._banner.dismiss()
+
+    def _text(self) -> str:
+        parts = []
+        for message, _, summary, count in self._shown.values():
+            if count == 1:
+                parts.append(message)
+            elif summary:
+                parts.append(summary.format(n=count))
+            else:
+                parts.append(f"{message} (×{count})")
+        if len(parts) > MAX_PARTS:
+            parts = parts[:MAX_PARTS] + [f"+{len(parts) - MAX_PARTS} more"]
+        return ", ".join(parts)
+
+    def _msg_type(self) -> str:
+        types = [msg_type for _, msg_type, _, _ in self._shown.values()]
+        return max(types, key=lambda t: SEVERITY.get(t, SEVERITY["info"]))
+
+
+# Shared manager so every screen uses the same banner
+_default_notifier = None
+
+
+def get_notifier() -> NotificationManager:
+    """Return the process-wide NotificationManager instance."""
+    global _default_notifier
+    if _default_notifier is None:
+        _default_notifier = NotificationManager()
+    return _default_notifier
@@ -1,42 +1,46 @@
 # ==========================================================
 #  Draggable Row Component
 #  -----------------------
-#  Reusable Kivy widget that allows dragging a BoxLayout
-#  to reorder PDF items in the Merge list.
+#  Recycled row for the Merge list. The RecycleView creates
+#  only as many rows as are visible and rebinds them to
+#  entries of its data list while scrolling. Dragging the
+#  handle icon onto another row reorders the data list.
 # ==========================================================
 
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.behaviors import DragBehavior
-from kivy.properties import ObjectProperty, BooleanProperty
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import ObjectProperty, BooleanProperty, StringProperty
 
 
-class DraggableRow(DragBehavior, BoxLayout):
+class DraggableRow(RecycleDataViewBehavior, BoxLayout):
     """
     Represents a single draggable row in the Merge screen.
-    The user can drag this row (using a handle icon) to
-    reorder the PDF list visually.
+    The user can drag this row (using a handle icon) onto
+    another row to reorder the PDF list.
+
+    Data keys: file_path, text, icon, owner (the MergeScreen).
     """
 
     # Store the file path linked to this row
     file_path = ObjectProperty(None)
+    text = StringProperty("")
+    icon = StringProperty("assets/icons/pdf_icon.png")
+
+    # Screen that owns the data list (handles remove / move)
+    owner = ObjectProperty(None)
 
     # Track whether this row is currently being dragged
     is_dragged = BooleanProperty(False)
 
     def __init__(self, **kwargs):
-        """
-        Initialize row behavior and appearance.
-        """
         super().__init__(**kwargs)
+        self.index = None  # position in the RecycleView data
 
-        # --- Configure drag behavior ---
-        self.drag_distance = 5       # Start drag after 5px movement
-        self.drag_timeout = 999999   # Disable long-press delay
-        self.size_hint_y = None      # Fixed row height
-        self.height = 50
-        self.spacing = 10
-        self.padding = 5
-        self.handle = None           # Will hold the drag handle widget
+    def refresh_view_attrs(self, rv, index, data):
+        """Rebind this recycled widget to data[index]."""
+        self.index = index
+        self.is_dragged = False
+        return super().refresh_view_attrs(rv, index, data)
 
     # ------------------------------------------------------
     #                 TOUCH BEHAVIOR EVENTS
@@ -45,13 +49,21 @@ class DraggableRow(DragBehavior, BoxLayout):
         """
         Start dragging only when the user presses the handle icon.
         """
-        if self.handle and self.handle.collide_point(*touch.pos):
+        if self.ids.handle.collide_point(*touch.pos):
             self.is_dragged = True
+            touch.ud["drag_index"] = self.index
+            return True
         return super().on_touch_down(touch)
 
     def on_touch_up(self, touch):
         """
-        Stop dragging when the user releases the mouse/finger.
+        Drop a dragged row onto this one, then stop dragging.
         """
         self.is_dragged = False
+        drag_index = touch.ud.get("drag_index")
+        if drag_index is not None and self.collide_point(*touch.pos):
+            touch.ud["drag_index"] = None
+            if drag_index != self.index and self.owner:
+                self.owner.move_row(drag_index, self.index)
+            return True
         return super().on_touch_up(touch)
@@ -0,0 +1,47 @@
+# ==========================================================
+#  Split Row Component
+#  -------------------
+#  Recycled row for the Split list: checkbox, icon, label and
+#  page input. Edits are written straight back into the
+#  RecycleView data, so they survive the widget being reused
+#  for another file while scrolling.
+# ==========================================================
+
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
+
+
+class SplitRow(RecycleDataViewBehavior, GridLayout):
+    """
+    One PDF in the Split screen.
+
+    Data keys: file_path, text, hint, max_page, selected, page_text.
+    """
+
+    file_path = StringProperty("")
+    text = StringProperty("")
+    hint = StringProperty("Page #")
+    max_page = NumericProperty(0)
+    selected = BooleanProperty(False)
+    page_text = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.index = None
+        self.rv = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Rebind this recycled widget to data[index]."""
+        self.index = index
+        self.rv = rv
+        return super().refresh_view_attrs(rv, index, data)
+
+    def set_field(self, key, value):
+        """Store a user edit (checkbox / page input) in the data model."""
+        # Keep the row property in step with the widget too: when this row
+        # is recycled for an item with the same value as the old property,
+        # Kivy fires no change and a stale tick / text would stay on screen
+        setattr(self, key, value)
+        if self.rv is not None and self.index is not None and self.index < len(self.rv.data):
+            self.rv.data[self.index][key] = value
@@ -1,9 +1,15 @@
 # ui/screens/__init__.py
-from .home_screen import HomeScreen
-from .split_screen import SplitScreen
-from .merge_screen import MergeScreen
-from .edit_screen import EditScreen
-from .settings_screen import SettingsScreen
+# Screens are imported on first access (PEP 562), so importing one
+# screen does not drag in the PDF engines used by the others.
+from importlib import import_module
+
+_MODULES = {
+    "HomeScreen": ".home_screen",
+    "SplitScreen": ".split_screen",
+    "MergeScreen": ".merge_screen",
+    "EditScreen": ".edit_screen",
+    "SettingsScreen": ".settings_screen",
+}
 
 __all__ = [
     "HomeScreen",
@@ -12,3 +18,9 @@ __all__ = [
     "EditScreen",
     "SettingsScreen",
 ]
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        return getattr(import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
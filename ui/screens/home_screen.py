@@ -3,7 +3,7 @@
 # ==========================================================
 # Home screen — Displays quick access, recent PDFs, and actions
 #   • Shows the app logo or branding area
-#   • Displays list of recent files (from recent.json)
+#   • Displays list of recent files (cached by AppController)
 #   • Buttons: Open PDF, Open Folder
 # ==========================================================
 
@@ -17,7 +17,6 @@ from kivy.metrics import dp
 
 from ui.components.banner_message import BannerMessage
 import os
-import json
 
 
 class HomeScreen(Screen):
@@ -28,12 +27,21 @@ class HomeScreen(Screen):
       - Buttons for quick actions (Open PDF, Open Folder)
     """
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._built = False
+        self._recent_grid = None
+        self._recent_rows = {}        # path -> row widget, reused across refreshes
+        self._recent_key = None       # (store, revision) last rendered
+
     def on_pre_enter(self):
-        """Refresh recent files list when entering the Home tab."""
-        self.build_ui()
+        """Build the layout once, then refresh the recent list only if it changed."""
+        if not self._built:
+            self.build_ui()
+        self.refresh_recent()
 
     def build_ui(self):
-        """Create the home screen layout dynamically."""
+        """Create the static home screen layout (called once)."""
         self.clear_widgets()
         layout = BoxLayout(orientation="vertical", padding=dp(20), spacing=dp(15))
 
@@ -51,40 +59,10 @@ class HomeScreen(Screen):
 
         grid = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
         grid.bind(minimum_height=grid.setter("height"))
-
-        recent_path = os.path.join(os.path.expanduser("~"), "Documents", "PDFHub", "recent.json")
-        if os.path.exists(recent_path):
-            with open(recent_path, "r") as f:
-                recent_files = json.load(f)
-        else:
-            recent_files = []
-
-        if not recent_files:
-            grid.add_widget(Label(text="No recent files found.",
+        self._recent_grid = grid
+        self._empty_label = Label(text="No recent files found.",
                                   color=(0.4, 0.4, 0.4, 1),
-                                  size_hint_y=None, height=dp(40)))
-        else:
-            for pdf_path in reversed(recent_files[-5:]):
-                filename = os.path.basename(pdf_path)
-                row = BoxLayout(orientation="horizontal", size_hint_y=None, height=dp(40), spacing=dp(10))
-
-                label = Label(text=filename, color=(0, 0, 0, 1), halign="left", valign="middle")
-                label.bind(size=label.setter("text_size"))
-
-                open_btn = Button(text="Edit", size_hint_x=None, width=dp(70))
-                split_btn = Button(text="Add to Split", size_hint_x=None, width=dp(100))
-                merge_btn = Button(text="Add to Merge", size_hint_x=None, width=dp(110))
-
-                open_btn.bind(on_release=lambda x, path=pdf_path: self.open_in_editor(path))
-                split_btn.bind(on_release=lambda x, path=pdf_path: self.add_to_split(path))
-                merge_btn.bind(on_release=lambda x, path=pdf_path: self.add_to_merge(path))
-
-                row.add_widget(label)
-                row.add_widget(open_btn)
-                row.add_widget(split_btn)
-                row.add_widget(merge_btn)
-                grid.add_widget(row)
-
+                                  size_hint_y=None, height=dp(40))
         layout.add_widget(grid)
 
         # --- Bottom Buttons ---
@@ -96,6 +74,70 @@ class HomeScreen(Screen):
         layout.add_widget(button_row)
 
         self.add_widget(layout)
+        self._built = True
+        self._recent_key = None
+
+    def refresh_recent(self):
+        """
+        Update the recent-files rows to match the controller's store.
+
+        Does nothing if the store has not changed since the last call.
+        Rows for files still in the list are reused; only new files get
+        new widgets.
+        """
+        if not self._built:
+            return
+        controller = self.manager.app.controller
+        store = controller.recent
+        key = (id(store), store.revision if store is not None else 0)
+        if key == self._recent_key:
+            return
+        self._recent_key = key
+
+        grid = self._recent_grid
+        recent_files = controller.load_recent_files()
+        grid.clear_widgets()
+
+        if not recent_files:
+            self._recent_rows.clear()
+            grid.add_widget(self._empty_label)
+            return
+
+        rows = {}
+        for entry in recent_files:
+            row = self._recent_rows.get(entry["path"]) or self._make_recent_row(entry["path"])
+            row.label.text = self._recent_text(entry)
+            rows[entry["path"]] = row
+            grid.add_widget(row)
+        self._recent_rows = rows
+
+    @staticmethod
+    def _recent_text(entry):
+        if entry["page_count"]:
+            return f"{entry['name']} ({entry['page_count']} pages)"
+        return entry["name"]
+
+    def _make_recent_row(self, pdf_path):
+        """Create the widgets for one recent file."""
+        row = BoxLayout(orientation="horizontal", size_hint_y=None, height=dp(40), spacing=dp(10))
+
+        label = Label(color=(0, 0, 0, 1), halign="left", valign="middle")
+        label.bind(size=label.setter("text_size"))
+
+        open_btn = Button(text="Edit", size_hint_x=None, width=dp(70))
+        split_btn = Button(text="Add to Split", size_hint_x=None, width=dp(100))
+        merge_btn = Button(text="Add to Merge", size_hint_x=None, width=dp(110))
+
+        open_btn.bind(on_release=lambda x, path=pdf_path: self.open_in_editor(path))
+        split_btn.bind(on_release=lambda x, path=pdf_path: self.add_to_split(path))
+        merge_btn.bind(on_release=lambda x, path=pdf_path: self.add_to_merge(path))
+
+        row.add_widget(label)
+        row.add_widget(open_btn)
+        row.add_widget(split_btn)
+        row.add_widget(merge_btn)
+        row.label = label
+        return row
 
     # ------------------------------------------------------
     # Helper actions
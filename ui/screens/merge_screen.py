@@ -2,80 +2,180 @@
 # ui/screens/merge_screen.py
 # ==========================================================
 # Merge screen — Combine multiple PDFs in custom order
-#   • Displays draggable list of PDFs
+#   • Displays draggable list of PDFs (virtualized RecycleView)
 #   • Allows removing and reordering
 #   • Uses PDFMerger for combining files
 # ==========================================================
 
 import os
 from kivy.uix.screenmanager import Screen
-from kivy.uix.image import Image
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from PyPDF2 import PdfReader
 
 from ui.components.banner_message import BannerMessage
-from ui.components.draggable_row import DraggableRow
+from ui.components.draggable_row import DraggableRow  # registers the RecycleView viewclass
 from pdf_engine.pdf_merger import PDFMerger
+from pdf_engine.pdf_loader import get_loader
+from pdf_engine.job_executor import get_background_executor, get_executor
+from pdf_engine.cancellation import CancelToken, OperationCancelled
+from pdf_engine.utils.file_utils import get_folder_index
+
+SAMPLES_DIR = "assets/samples"
 
 
 class MergeScreen(Screen):
     """Allows user to drag, remove, and merge PDFs."""
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._loaded = False
+        self._cancel_token = None  # set while a merge is running
+        self._index = get_folder_index(SAMPLES_DIR)
+        self._index.subscribe(self._on_folder_changes)
+
     def on_pre_enter(self):
-        """Load available sample PDFs."""
-        self.ids.merge_list.clear_widgets()
+        """Load sample PDFs on first entry, then only apply folder changes."""
+        if not self._loaded:
+            # The index is shared with the other screen and may be stale;
+            # events of this poll are ignored since _loaded is still False
+            self._index.poll()
+            items = [self._make_item(path) for path in self._index.files()]
+            get_loader().save()
+            self.ids.merge_rv.data = items
+            self._loaded = True
+        else:
+            self._index.poll()  # changes arrive through _on_folder_changes
 
-        folder = "assets/samples"
-        os.makedirs(folder, exist_ok=True)
-        pdf_files = [f for f in os.listdir(folder) if f.endswith(".pdf")]
+        data = self.ids.merge_rv.data
+        self.ids.merge_btn.disabled = len(data) < 2
+        if not data:
+            BannerMessage.show(self, f"No PDFs found in {SAMPLES_DIR}", msg_type="error")
 
-        if not pdf_files:
-            BannerMessage.show(self, "No PDFs found in assets/samples", msg_type="error")
+    def _on_folder_changes(self, events):
+        """Apply added / removed / modified files to the list data."""
+        if not self._loaded:
             return
+        data = self.ids.merge_rv.data
+        loader = get_loader()
+        for kind, path in events:
+            if kind == "added":
+                data.append(self._make_item(path))
+                continue
+            for i, item in enumerate(data):
+                if item["file_path"] == path:
+                    if kind == "removed":
+                        loader.forget(path)
+                        data.pop(i)
+                    else:
+                        data[i] = self._make_item(path)
+                    break
+        loader.save()
+        self.ids.merge_btn.disabled = len(data) < 2
+
+    def _make_item(self, file_path):
+        """Build the RecycleView data entry for one PDF."""
+        file_name = os.path.basename(file_path)
+        try:
+            info = get_loader().get_info(file_path)
+            num_pages = info["page_count"]
+            if info["error"]:
+                print(f"Error reading {file_name}: {info['error']}")
+        except Exception as e:
+            num_pages = 0
+            print(f"Error reading {file_name}: {e}")
+
+        item = {
+            "file_path": file_path,
+            "text": f"{file_name} ({num_pages} pages)",
+            "icon": "assets/icons/pdf_icon.png",
+            "owner": self,
+        }
+        self._load_thumbnail(item)
+        return item
+
+    def _load_thumbnail(self, item):
+        """Swap the generic icon for a first-page thumbnail once it is ready."""
+        thumbnails = self.manager.app.controller.thumbnails
+        if thumbnails is None:
+            return
+        cached = thumbnails.peek(item["file_path"])
+        if cached:
+            item["icon"] = cached  # set before the data reaches the RecycleView
+            return
+
+        def show(path):
+            if path and item in self.ids.merge_rv.data:
+                item["icon"] = path
+                self.ids.merge_rv.refresh_from_data()
+
+        # Own low-priority worker: never delays a merge the user started
+        get_background_executor().submit(thumbnails.get_or_render, item["file_path"],
+                                         on_done=show)
 
-        for file_name in pdf_files:
-            file_path = os.path.join(folder, file_name)
-            try:
-                reader = PdfReader(file_path)
-                num_pages = len(reader.pages)
-            except Exception as e:
-                num_pages = 0
-                print(f"Error reading {file_name}: {e}")
-
-            row = DraggableRow()
-            row.file_path = file_path
-
-            row.add_widget(Image(source="assets/icons/pdf_icon.png", size_hint_x=None, width=30))
-            row.add_widget(Label(text=f"{file_name} ({num_pages} pages)",
-                                 color=(0, 0, 0, 1), halign="left"))
-            remove_btn = Button(
-                background_normal="assets/icons/delete.png",
-                background_down="assets/icons/delete.png",
-                size_hint_x=None, width=32, background_color=(1, 0, 0, 0.1)
-            )
-            remove_btn.bind(on_press=lambda btn, r=row: self.remove_row(r))
-            row.add_widget(remove_btn)
-            self.ids.merge_list.add_widget(row)
-
-        self.ids.merge_btn.disabled = len(pdf_files) < 2
-
-    def remove_row(self, row):
-        """Remove a selected row from the merge list."""
-        self.ids.merge_list.remove_widget(row)
+    def remove_row(self, index):
+        """Remove the row at `index` from the merge list."""
+        data = self.ids.merge_rv.data
+        if index is None or index >= len(data):
+            return
+        data.pop(index)
         BannerMessage.show(self, "Removed PDF from list.", msg_type="info")
-        self.ids.merge_btn.disabled = len(self.ids.merge_list.children) < 2
+        self.ids.merge_btn.disabled = len(data) < 2
+
+    def move_row(self, from_index, to_index):
+        """Move the dragged row to the position of the row it was dropped on."""
+        data = self.ids.merge_rv.data
+        item = data.pop(from_index)
+        data.insert(to_index, item)
+        BannerMessage.show(self, "✅ Files reordered successfully.", msg_type="info")
 
     def merge_pdfs(self):
-        """Merge selected PDFs in current order."""
-        paths = [r.file_path for r in reversed(self.ids.merge_list.children)]
+        """Merge the PDFs in current order on a background worker, or cancel a running merge."""
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
+            self.ids.merge_btn.disabled = True  # until the worker has stopped
+            return
+
+        paths = [item["file_path"] for item in self.ids.merge_rv.data]
         if len(paths) < 2:
             BannerMessage.show(self, "Select at least two PDFs to merge.", msg_type="error")
             return
 
-        try:
-            merger = PDFMerger(paths)
-            output_path = merger.merge()
-            BannerMessage.show(self, f"Merged successfully!\nSaved at: {output_path}", msg_type="success")
-        except Exception as e:
-            BannerMessage.show(self, f"Merge failed: {e}", msg_type="error")
+        self._cancel_token = CancelToken()
+        self.ids.merge_btn.text = "Cancel"
+        self.ids.merge_progress.value = 0
+        merger = PDFMerger(paths, cancel_token=self._cancel_token)
+        # checkpoint: merging the same files again after a cancel or crash
+        # resumes; it streams on any engine chosen in Settings
+        get_executor().submit(
+            merger.merge,
+            streaming=True,
+            checkpoint=True,
+            on_progress=self._on_merge_progress,
+            on_done=self._on_merge_done,
+            on_error=self._on_merge_error,
+        )
+
+    def _merge_finished(self):
+        self._cancel_token = None
+        self.ids.merge_btn.text = "Merge PDFs"
+        self.ids.merge_btn.disabled = len(self.ids.merge_rv.data) < 2
+
+    # ------------------------------------------------------
+    # Background job callbacks (run on the main thread)
+    # ------------------------------------------------------
+    def _on_merge_progress(self, file_index, file_count, page_index, page_count):
+        """Advance the progress bar by file, then by page within the file."""
+        fraction = (file_index + page_index / max(page_count, 1)) / file_count
+        self.ids.merge_progress.value = fraction * 100
+
+    def _on_merge_done(self, output_path):
+        self.ids.merge_progress.value = 100
+        self._merge_finished()
+        BannerMessage.show(self, f"Merged successfully!\nSaved at: {output_path}", msg_type="success")
+
+    def _on_merge_error(self, error):
+        self.ids.merge_progress.value = 0
+        self._merge_finished()
+        if isinstance(error, OperationCancelled):
+            BannerMessage.show(self, "Merge cancelled. Merge the same files again to resume.",
+                               msg_type="info")
+            return
+        BannerMessage.show(self, f"Merge failed: {error}", msg_type="error")
@@ -1,12 +1,30 @@
 # ==========================================================
 # ui/screens/settings_screen.py
 # ==========================================================
-# Placeholder for Settings screen (theme, language, etc.)
+# Settings screen (theme, language, etc.)
+#   • PDF engine: choose the backend used for merge/split
 # ==========================================================
 
+from kivy.app import App
 from kivy.uix.screenmanager import Screen
 
+from pdf_engine.pdf_backend import set_default_backend
+from ui.components.banner_message import BannerMessage
+
 
 class SettingsScreen(Screen):
     """Settings screen — for app preferences, themes, etc."""
-    pass
+
+    def set_backend(self, name):
+        """Switch the default PDF backend and remember it in the app config."""
+        try:
+            set_default_backend(name)
+        except ValueError as e:
+            BannerMessage.show(self, str(e), msg_type="error")
+            return
+
+        config = App.get_running_app().config
+        if config.get("engine", "backend") != name:
+            config.set("engine", "backend", name)
+            config.write()
+            BannerMessage.show(self, f"PDF engine set to {name}", msg_type="info")
@@ -2,91 +2,189 @@
 # ui/screens/split_screen.py
 # ==========================================================
 # Split screen — Allows user to split PDFs by page number
-#   • Lists available PDFs
+#   • Lists available PDFs (virtualized RecycleView)
 #   • Lets users enter a split page number
 #   • Uses BannerMessage for feedback
 # ==========================================================
 
 import os
+from kivy.app import App
 from kivy.uix.screenmanager import Screen
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.label import Label
-from kivy.uix.image import Image
-from kivy.uix.checkbox import CheckBox
-from kivy.uix.textinput import TextInput
-from kivy.metrics import dp
-from PyPDF2 import PdfReader
 
 from ui.components.banner_message import BannerMessage
-from pdf_engine.pdf_splitter import PDFSplitter
+from ui.components.split_row import SplitRow  # registers the RecycleView viewclass
+from pdf_engine.pdf_splitter import parse_page_ranges, split_batch
+from pdf_engine.pdf_loader import get_loader
+from pdf_engine.job_executor import get_executor
+from pdf_engine.cancellation import CancelToken
+from pdf_engine.utils.file_utils import get_folder_index
+
+SAMPLES_DIR = "assets/samples"
 
 
 class SplitScreen(Screen):
     """Displays PDFs and allows splitting by page number."""
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._loaded = False
+        self._cancel_token = None  # set while a batch is running
+        self._index = get_folder_index(SAMPLES_DIR)
+        self._index.subscribe(self._on_folder_changes)
+
     def on_pre_enter(self):
-        """Rebuild grid of sample PDFs when entering Split tab."""
-        self.ids.split_grid.clear_widgets()
+        """Load sample PDFs on first entry, then only apply folder changes."""
+        if not self._loaded:
+            # The index is shared with the other screen and may be stale;
+            # events of this poll are ignored since _loaded is still False
+            self._index.poll()
+            items = [self._make_item(path) for path in self._index.files()]
+            get_loader().save()
+            self.ids.split_rv.data = items
+            self._loaded = True
+        else:
+            self._index.poll()  # changes arrive through _on_folder_changes
 
-        folder = "assets/samples"
-        os.makedirs(folder, exist_ok=True)
-        pdf_files = [f for f in os.listdir(folder) if f.endswith(".pdf")]
+        self.ids.split_empty.text = "" if self.ids.split_rv.data else "No PDF files found."
 
-        if not pdf_files:
-            self.ids.split_grid.add_widget(Label(text="No PDF files found.", color=(0.2, 0.2, 0.2, 1)))
+    def _on_folder_changes(self, events):
+        """Apply added / removed / modified files to the list data."""
+        if not self._loaded:
             return
+        data = self.ids.split_rv.data
+        loader = get_loader()
+        for kind, path in events:
+            if kind == "added":
+                data.append(self._make_item(path))
+                continue
+            for i, item in enumerate(data):
+                if item["file_path"] == path:
+                    if kind == "removed":
+                        loader.forget(path)
+                        data.pop(i)
+                    else:
+                        # Keep the user's selection and input for changed files
+                        fresh = self._make_item(path)
+                        fresh["selected"] = item["selected"]
+                        fresh["page_text"] = item["page_text"]
+                        data[i] = fresh
+                    break
+        loader.save()
+        self.ids.split_empty.text = "" if data else "No PDF files found."
 
-        for pdf_file in pdf_files:
-            path = os.path.join(folder, pdf_file)
-            try:
-                reader = PdfReader(path)
-                num_pages = len(reader.pages)
-            except Exception as e:
-                num_pages = 0
-                print(f"⚠️ Error reading {pdf_file}: {e}")
-
-            row = GridLayout(cols=4, size_hint_y=None, height=dp(60), spacing=dp(10))
-
-            checkbox = CheckBox(size_hint_x=None, width=dp(30))
-            icon = Image(source="assets/icons/pdf_icon.png", size_hint_x=None, width=dp(28))
-            label = Label(text=f"{pdf_file} ({num_pages} pages)", color=(0, 0, 0, 1), halign="left")
-            textbox = TextInput(
-                hint_text=f"1–{num_pages}" if num_pages else "Page #",
-                input_filter="int",
-                size_hint_x=None,
-                width=dp(80)
-            )
-            textbox.max_page = num_pages
-
-            row.add_widget(checkbox)
-            row.add_widget(icon)
-            row.add_widget(label)
-            row.add_widget(textbox)
-            self.ids.split_grid.add_widget(row)
+    @staticmethod
+    def _make_item(path):
+        """Build the RecycleView data entry for one PDF."""
+        pdf_file = os.path.basename(path)
+        try:
+            info = get_loader().get_info(path)
+            num_pages = info["page_count"]
+            if info["error"]:
+                print(f"⚠️ Error reading {pdf_file}: {info['error']}")
+        except Exception as e:
+            num_pages = 0
+            print(f"⚠️ Error reading {pdf_file}: {e}")
+
+        return {
+            "file_path": path,
+            "text": f"{pdf_file} ({num_pages} pages)",
+            "hint": f"1–{num_pages}" if num_pages else "Page #",
+            "max_page": num_pages,
+            "selected": False,
+            "page_text": "",
+        }
 
     def process_split(self):
-        """Split selected PDFs based on page input."""
+        """Split selected PDFs based on page input in the background, or cancel the running batch."""
+        if self._cancel_token is not None:
+            # Files already being split finish; the rest are skipped
+            self._cancel_token.cancel()
+            self.ids.split_btn.disabled = True
+            return
+
         selected = 0
+        jobs = []
 
-        for row in self.ids.split_grid.children:
-            widgets = row.children[::-1]  # Keep order: checkbox, icon, label, textbox
-            checkbox, icon, label, textbox = widgets
-            if checkbox.active:
+        for item in self.ids.split_rv.data:
+            if item["selected"]:
                 selected += 1
-                filename = label.text.split(" (")[0]
-                pdf_path = os.path.join("assets/samples", filename)
+                filename = os.path.basename(item["file_path"])
+                pdf_path = item["file_path"]
                 try:
-                    if not textbox.text.strip():
+                    text = item["page_text"].strip()
+                    if not text:
                         raise ValueError("Please enter a page number.")
-                    page = int(textbox.text.strip())
-                    max_page = getattr(textbox, "max_page", 0)
-                    if page <= 0 or page >= max_page:
-                        raise ValueError(f"Page must be between 1 and {max_page - 1}.")
-                    splitter = PDFSplitter(pdf_path)
-                    splitter.split(page)
-                    BannerMessage.show(self, f"✅ {filename} split successfully!", msg_type="success")
+                    max_page = item["max_page"]
+                    if text.isdigit():
+                        # Single page number: split into two parts at that page
+                        page = int(text)
+                        if page <= 0 or page >= max_page:
+                            raise ValueError(f"Page must be between 1 and {max_page - 1}.")
+                        jobs.append((filename, pdf_path, page))
+                    else:
+                        # Range spec such as "1-3,4-10,11-end"
+                        parse_page_ranges(text, max_page)
+                        jobs.append((filename, pdf_path, text))
                 except Exception as e:
-                    BannerMessage.show(self, str(e), msg_type="error")
+                    BannerMessage.show(self, f"{filename}: {e}", msg_type="error",
+                                       summary="{n} file(s) need a valid page")
 
         if selected == 0:
             BannerMessage.show(self, "Please select at least one PDF.", msg_type="error")
+            return
+        if not jobs:
+            return
+
+        self._cancel_token = CancelToken()
+        self.ids.split_btn.text = "Cancel"
+        self.ids.split_progress.value = 0
+        # split_batch runs in spawned worker processes, which never see
+        # set_default_backend(): the Settings engine is passed explicitly
+        backend = App.get_running_app().config.get("engine", "backend")
+        get_executor().submit(
+            split_batch,
+            [(pdf_path, spec) for _, pdf_path, spec in jobs],
+            backend=backend,
+            cancel_token=self._cancel_token,
+            on_progress=self._on_split_progress,
+            on_done=self._on_split_done,
+            on_error=self._on_split_error,
+        )
+
+    def _split_finished(self):
+        self._cancel_token = None
+        self.ids.split_btn.text = "Process Split"
+        self.ids.split_btn.disabled = False
+
+    # ------------------------------------------------------
+    # Background job callbacks (run on the main thread)
+    # ------------------------------------------------------
+    def _on_split_progress(self, file_index, file_count, page_index, page_count):
+        """Advance the progress bar by file, then by page within the file."""
+        fraction = (file_index + page_index / max(page_count, 1)) / file_count
+        self.ids.split_progress.value = fraction * 100
+
+    def _on_split_done(self, results):
+        """Report the batch as one banner, e.g. "✅ 12 file(s) split, 3 failed"."""
+        self.ids.split_progress.value = 100
+        self._split_finished()
+
+        skipped = [r for r in results if r["error"] == "Operation cancelled"]
+        failed = [r for r in results if r["error"] and r not in skipped]
+        succeeded = len(results) - len(failed) - len(skipped)
+        if succeeded:
+            BannerMessage.show(self, f"✅ {succeeded} file(s) split", msg_type="success")
+        # The banner merges these into "N failed" (or the error itself for one file)
+        for result in failed:
+            filename = os.path.basename(result["file_path"])
+            BannerMessage.show(self, f"{filename}: {result['error']}", msg_type="error",
+                               summary="{n} failed")
+        if skipped:
+            BannerMessage.show(self, f"split cancelled, {len(skipped)} file(s) skipped",
+                               msg_type="info")
+
+    def _on_split_error(self, error):
+        """Reset the screen when split_batch itself raises (per-file errors go to _on_split_done)."""
+        self.ids.split_progress.value = 0
+        self._split_finished()
+        BannerMessage.show(self, f"Split failed: {error}", msg_type="error")